@@ -1,11 +1,12 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import geopandas as gpd
+from fontes_dados import DadosIndisponiveis, ler_csv
+from geografia import sigla_uf
+from malha_uf import malha_estados
+from mapa_coropletico import MapaCoropletico
 
 try:
-    df = pd.read_csv("../datasets/nascidos_vivos_limpo.csv", encoding='latin1')
+    df = ler_csv('nascidos_vivos_limpo')
     print("Dataset nascidos vivos encontrado com sucesso!")
-except FileNotFoundError:
+except DadosIndisponiveis:
     print("Dataset nascidos vivos não encontrado!")
 
 #média de consultas prenatal por gestante por UF
@@ -14,31 +15,15 @@ media_por_uf.columns = ["UF", "Media_Consultas"]
 print("Média de consultas por estado:")
 print(media_por_uf.sort_values(by="Media_Consultas", ascending=False))
 
-#Código por unidade federativa
-codigo_uf_ibge = {
-    12: "Acre", 27: "Alagoas", 13: "Amazonas", 16: "Amapá", 29: "Bahia", 23: "Ceará",
-    53: "Distrito Federal", 32: "Espírito Santo", 52: "Goiás", 21: "Maranhão",
-    31: "Minas Gerais", 50: "Mato Grosso do Sul", 51: "Mato Grosso", 15: "Pará",
-    25: "Paraíba", 26: "Pernambuco", 22: "Piauí", 41: "Paraná", 33: "Rio de Janeiro",
-    24: "Rio Grande do Norte", 43: "Rio Grande do Sul", 11: "Rondônia", 14: "Roraima",
-    42: "Santa Catarina", 28: "Sergipe", 35: "São Paulo", 17: "Tocantins"
-}
-
 # Mapa Temático por Estado
-# Carrega a malha geográfica de estados do IBGE
-# Fonte alternativa: https://github.com/codeforamerica/click_that_hood/blob/master/public/data/brazil-states.geojson
-url = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson"
-ufs = gpd.read_file(url)
-
-# Cria a coluna com nome do estado no dataframe de média
-media_por_uf["Estado"] = media_por_uf["UF"].map(codigo_uf_ibge)
+# Malha dos estados do IBGE já preparada (ver malha_uf.py); o modelo do mapa é montado uma vez
+# e só pintado com a métrica (ver mapa_coropletico.py)
+mapa = MapaCoropletico(malha_estados(), figsize=(12, 10), cmap="YlGnBu", edgecolor='black', siglas=False)
 
-# Mescla com os dados da geografia
-mapa = ufs.merge(media_por_uf, how="left", left_on="name", right_on="Estado")
+# Cria a coluna com a sigla do estado (chave da malha) no dataframe de média
+media_por_uf["Sigla"] = sigla_uf(media_por_uf["UF"])
 
-# Plota o mapa
-plt.figure(figsize=(12, 10))
-mapa.plot(column="Media_Consultas", cmap="YlGnBu", legend=True, edgecolor='black')
-plt.title("Média de Consultas de \nPré-Natal de nascidos vivos por gestante por Estado (Brasil)", fontsize=15)
-plt.axis("off")
-plt.show()
+# Pinta o mapa
+mapa.pintar(media_por_uf.set_index("Sigla")["Media_Consultas"],
+            titulo="Média de Consultas de \nPré-Natal de nascidos vivos por gestante por Estado (Brasil)", fontsize=15)
+mapa.mostrar('sinasc_mapa_media_consultas_por_uf')
@@ -1,12 +1,12 @@
-import pandas as pd
-from dbfread import DBF
+from leitor_dbf import ler_dbf
 
 # Caminho do sisnasc
 arquivo_dbf = '../datasets/nascidos_vivos_2014.dbf'
 
-# Carrega extenção DBF
-dbf = DBF(arquivo_dbf, encoding='latin1')
-df = pd.DataFrame(iter(dbf))
-df = df[['CODMUNRES', 'CONSPRENAT', 'IDANOMAL', 'IDADEMAE', 'ESCMAE', 'RACACOR', 'ESTCIVMAE']]
+# Colunas usadas nas análises (7 das ~60 do SINASC)
+colunas = ['CODMUNRES', 'CONSPRENAT', 'IDANOMAL', 'IDADEMAE', 'ESCMAE', 'RACACOR', 'ESTCIVMAE']
+
+# Carrega extenção DBF (leitura vetorizada, só decodifica as colunas usadas, códigos já nos tipos do esquema)
+df = ler_dbf(arquivo_dbf, encoding='latin1', columns=colunas, esquema='sinasc')
 
 df.to_csv('nascidos_vivos_limpo.csv')
\ No newline at end of file
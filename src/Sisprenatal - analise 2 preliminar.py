@@ -5,18 +5,19 @@ Created on segunda, 03/Abril 23:50:00 2025
 Data da atualização: 05/Abril 2025 "VERSÃO COM ICONES" para ficar bonitinho no Jupyter :)"
 """
 
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import geopandas as gpd
+
+from figuras import mostrar
+from fontes_dados import ler_csv
+from geografia import sigla_uf
+from malha_uf import malha_estados
+from mapa_coropletico import MapaCoropletico
 
 # Carrega os dados
-try:
-    df = pd.read_csv("sisprenatal_limpo.csv")
-    print("📁 Dados carregados do arquivo local.")
-except FileNotFoundError:
-    df = pd.read_csv("https://raw.githubusercontent.com/GrupoMackenzie/ProjetoAplicado01-DataScience-Mackenzie-2025/main/datasets/sisprenatal_limpo.csv")
-    print("🌐 Dados carregados do GitHub.")
+# (cache local; se não houver, baixa do GitHub ou usa datasets/sisprenatal_limpo.csv)
+df = ler_csv('sisprenatal_limpo')
+print("📁 Dados carregados.")
 
 # Inf. gerais
 print("🔍 Dimensões do dataset:", df.shape)
@@ -47,7 +48,7 @@ plt.title("Boxplot da Quantidade de Consultas")
 plt.xlabel("QT_CONSULT")
 
 plt.tight_layout()
-plt.show()
+mostrar('sisprenatal_consultas_distribuicao')
 
 # Média de consultas por Unidade Federativa
 media_por_uf = df.groupby("CO_UF_IBGE")["QT_CONSULT"].mean().round(2).reset_index()
@@ -56,30 +57,15 @@ print("\n📍 Média de consultas por estado:")
 print(media_por_uf.sort_values(by="Media_Consultas", ascending=False))
 
 # Mapa Temático por Estado
-# Carrega a malha geográfica de estados do IBGE
-# Fonte alternativa: https://github.com/codeforamerica/click_that_hood/blob/master/public/data/brazil-states.geojson
-url = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson"
-ufs = gpd.read_file(url)
-
-# Ajustei para merge
-codigo_uf_ibge = {
-    12: "Acre", 27: "Alagoas", 13: "Amazonas", 16: "Amapá", 29: "Bahia", 23: "Ceará",
-    53: "Distrito Federal", 32: "Espírito Santo", 52: "Goiás", 21: "Maranhão",
-    31: "Minas Gerais", 50: "Mato Grosso do Sul", 51: "Mato Grosso", 15: "Pará",
-    25: "Paraíba", 26: "Pernambuco", 22: "Piauí", 41: "Paraná", 33: "Rio de Janeiro",
-    24: "Rio Grande do Norte", 43: "Rio Grande do Sul", 11: "Rondônia", 14: "Roraima",
-    42: "Santa Catarina", 28: "Sergipe", 35: "São Paulo", 17: "Tocantins"
-}
-
-# Cria a coluna com nome do estado no dataframe de média
-media_por_uf["Estado"] = media_por_uf["UF"].map(codigo_uf_ibge)
+# Malha dos estados do IBGE já preparada (ver malha_uf.py); o modelo do mapa é montado uma vez
+# e só pintado com a métrica (ver mapa_coropletico.py)
+mapa = MapaCoropletico(malha_estados(), figsize=(12, 10), cmap="YlGnBu", edgecolor='black', siglas=False)
 
-# Mescla com os dados da geografia
-mapa = ufs.merge(media_por_uf, how="left", left_on="name", right_on="Estado")
+# Cria a coluna com a sigla do estado (chave da malha) no dataframe de média
+# (sigla pelo código da UF, ver geografia.py)
+media_por_uf["Sigla"] = sigla_uf(media_por_uf["UF"])
 
-# Plota o mapa temático solicitado na atividade
-plt.figure(figsize=(12, 10))
-mapa.plot(column="Media_Consultas", cmap="YlGnBu", legend=True, edgecolor='black')
-plt.title("Média de Consultas de Pré-Natal por Estado (Brasil)", fontsize=15)
-plt.axis("off")
-plt.show()
+# Pinta o mapa temático solicitado na atividade
+mapa.pintar(media_por_uf.set_index("Sigla")["Media_Consultas"],
+            titulo="Média de Consultas de Pré-Natal por Estado (Brasil)", fontsize=15)
+mapa.mostrar('sisprenatal_mapa_media_consultas_por_uf')
@@ -3,8 +3,8 @@ Criado na Sexta Feira 04 de Abril de 2025 às 01:44:00
 @author1: Alberto Nagem
 """
 
-import pandas as pd
+from fontes_dados import ler_csv
 
-df = pd.read_csv("https://raw.githubusercontent.com/GrupoMackenzie/ProjetoAplicado01-DataScience-Mackenzie-2025/main/datasets/sisprenatal_limpo.csv", encoding="latin1")
+df = ler_csv('sisprenatal_limpo')
 print(df.columns)
 print(df.head())
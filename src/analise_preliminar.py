@@ -1,1111 +1,1082 @@
+import argparse
+
 import pandas as pd
-import geopandas as gpd
 import matplotlib.pyplot as plt
 
+from classificadores import GRUPO_POR_CATEGORIA, GRUPOS_PRENATAL
+from colunas_derivadas import COLUNAS_DERIVADAS, ler_derivado
+from cubo_contingencia import Cubo, proporcao_por_linha
+from figuras import ativar, finalizar, mostrar
+from pipeline import Pipeline
+from pontuacao_risco import marcar_criterios, pontuar
+from geografia import CATEGORIAS_REGIAO, REGIAO_DA_SIGLA, REGIAO_IGNORADA, codigo_municipio_6
+from malha_municipios import malha_municipios as preparar_malha_municipios
+from malha_uf import malha_estados as preparar_malha_estados
+from mapa_coropletico import MapaCoropletico
+import planilhas
+from planilhas import guardar
+
+# Cada bloco (BL.0 a BL.21, e os gráficos BL.x.1...) é uma etapa do pipeline (ver pipeline.py),
+# com as entradas que usa (df, cubo...) e as saídas que produz. Rodar só alguns blocos:
+#     python analise_preliminar.py --blocos BL.21            (carrega os dados e roda só o BL.21)
+#     python analise_preliminar.py --blocos BL.2,BL.9 --workers 4
+#     python analise_preliminar.py --listar
+#     python analise_preliminar.py --figuras saida/figuras --formatos png,svg   (grava os gráficos, ver figuras.py)
+#     python analise_preliminar.py --tabelas saida/tabelas.xlsx   (grava as tabelas dos blocos e uma aba por UF;
+#                                    ou .csv.zip / .parquet.zip, ver planilhas.py)
+# Em um notebook/console: pipeline.executar(['BL.21']) e, depois, outros blocos reaproveitam o
+# df e o cubo já calculados (pipeline.memo).
+pipeline = Pipeline()
+
+# Ordens usadas em mais de um bloco
+faixa_ordenada = ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41', 'N/I']
+ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
+grupos_raciais_validos = ['Brancos e Amarelos', 'Pretos e Pardos', 'Indígenas']
+
+
 # Caminho SINASC - Limpo
-df = pd.read_csv("https://raw.githubusercontent.com/GrupoMackenzie/ProjetoAplicado01-DataScience-Mackenzie-2025/refs/heads/main/datasets/nascidos_vivos_limpo.csv", encoding='latin1')
+# (baixado do GitHub na primeira vez; depois vem do cache local, ver fontes_dados.py)
+# Os códigos já chegam como inteiros compactos (Int8/Int32, com NA nos campos em branco; ver esquemas.py)
+# O df já vem com o CODMUNRES de 7 dígitos do IBGE (Int32, com o dígito verificador; ver geografia.py),
+# UF, REGIAO e as colunas derivadas (CATEGORIA_PRENATAL, GRUPO_PRENATAL, FAIXA_ETARIA, ESCMAE_LABEL,
+# GRUPO_RACIAL e GRUPO_ESTCIVIL, ver classificadores.py):
+# na primeira execução são calculadas e gravadas em Arrow; depois o arquivo é só mapeado em memória
+# (ver colunas_derivadas.py).
+@pipeline.etapa('dados', saidas=['df'])
+def carregar_dados():
+    return {'df': ler_derivado('nascidos_vivos_limpo')}
 
-# Corrigindo para garantir 6 dígitos e adicionar "0" ao final para formar 7 na Tabulação conforme dicionário do datasus
-df['CODMUNRES'] = df['CODMUNRES'].astype(str).str.zfill(6) + "0"
 
-# Para transformar N em siglas
-uf_siglas = {
-    '11': 'RO', '12': 'AC', '13': 'AM', '14': 'RR', '15': 'PA', '16': 'AP', '17': 'TO',
-    '21': 'MA', '22': 'PI', '23': 'CE', '24': 'RN', '25': 'PB', '26': 'PE', '27': 'AL', '28': 'SE', '29': 'BA',
-    '31': 'MG', '32': 'ES', '33': 'RJ', '35': 'SP',
-    '41': 'PR', '42': 'SC', '43': 'RS',
-    '50': 'MS', '51': 'MT', '52': 'GO', '53': 'DF'
-}
+# Malha dos estados já simplificada (resolução 'media') e com a posição das siglas (ver malha_uf.py)
+@pipeline.etapa('malha_estados', saidas=['malha_estados'])
+def carregar_malha_estados():
+    return {'malha_estados': preparar_malha_estados('media')}
+
+
+# Malha dos 5.570 municípios (mapas .MAP do TabWin, resolução 'media'; ver malha_municipios.py)
+@pipeline.etapa('malha_municipios', saidas=['malha_municipios'])
+def carregar_malha_municipios():
+    return {'malha_municipios': preparar_malha_municipios('media')}
+
 
 # -----------------------------
 # BL.0 Análise inicial de colunas
 # -----------------------------
-print(df[['CONSPRENAT', 'IDANOMAL', 'IDADEMAE', 'ESCMAE', 'RACACOR', 'ESTCIVMAE']].describe())
-
-# Contagem de valores NA
-print(df.isna().sum().sort_values(ascending=False))
-
-# Outliers via IQR
-colunas_numericas = df.select_dtypes(include=['int64', 'float64']).columns
-for coluna in colunas_numericas:
-    serie = df[coluna].dropna()
-    if len(serie) < 10:
-        continue
-    Q1 = serie.quantile(0.25)
-    Q3 = serie.quantile(0.75)
-    IQR = Q3 - Q1
-    limite_inferior = Q1 - 1.5 * IQR
-    limite_superior = Q3 + 1.5 * IQR
-    outliers = serie[(serie < limite_inferior) | (serie > limite_superior)]
-    print(f"{coluna} — {len(outliers)} outliers encontrados ({round(len(outliers)/len(serie)*100, 2)}% dos dados)")
-
-# Variância entre colunas
-print(df.var(numeric_only=True))
-
-# Criar coluna UF com base no código do município
-df['UF'] = df['CODMUNRES'].str[:2].map(uf_siglas)
+@pipeline.etapa('BL.0', entradas=['df'])
+def analise_inicial(df):
+    # Só as colunas do arquivo (sem as derivadas)
+    df = df.drop(columns=COLUNAS_DERIVADAS)
+    # O CODMUNRES é inteiro mas é código, não medida: fica fora dos outliers e da variância
+    medidas = df.drop(columns=['CODMUNRES'])
+
+    descricao = df[['CONSPRENAT', 'IDANOMAL', 'IDADEMAE', 'ESCMAE', 'RACACOR', 'ESTCIVMAE']].describe()
+    print(descricao)
+    guardar('BL.0 Estatísticas descritivas', descricao.rename_axis('Estatística'))
+
+    # Contagem de valores NA
+    ausentes = df.isna().sum().sort_values(ascending=False)
+    print(ausentes)
+    guardar('BL.0 Valores ausentes', ausentes.rename('Ausentes').rename_axis('Coluna'))
+
+    # Outliers via IQR
+    colunas_numericas = medidas.select_dtypes(include='number').columns
+    for coluna in colunas_numericas:
+        serie = medidas[coluna].dropna()
+        if len(serie) < 10:
+            continue
+        Q1 = serie.quantile(0.25)
+        Q3 = serie.quantile(0.75)
+        IQR = Q3 - Q1
+        limite_inferior = Q1 - 1.5 * IQR
+        limite_superior = Q3 + 1.5 * IQR
+        outliers = serie[(serie < limite_inferior) | (serie > limite_superior)]
+        print(f"{coluna} — {len(outliers)} outliers encontrados ({round(len(outliers)/len(serie)*100, 2)}% dos dados)")
+
+    # Variância entre colunas
+    variancia = medidas.var(numeric_only=True)
+    print(variancia)
+    guardar('BL.0 Variância', variancia.rename('Variância').rename_axis('Coluna'))
+
+
+# Cubo de contagens por UF x categoria de pré-natal x faixa etária x grupo racial x escolaridade x
+# estado civil x anomalia (ver cubo_contingencia.py).
+# As tabelas dos blocos abaixo são somas e fatias do cubo, sem varrer o df de novo.
+@pipeline.etapa('cubo', entradas=['df'], saidas=['cubo', 'cubo_grupo'])
+def montar_cubo(df):
+    cubo = Cubo.do_df(df)
+    cubo_grupo = cubo.agrupar('CATEGORIA_PRENATAL', 'GRUPO_PRENATAL', GRUPO_POR_CATEGORIA, GRUPOS_PRENATAL)
+
+    return {'cubo': cubo, 'cubo_grupo': cubo_grupo}
+
 
 # -----------------------------
 # BL.1 Total de nascidos vivos
 # -----------------------------
-total_nacional = len(df)
-total_por_estado = df['UF'].value_counts().sort_index()
-
-print("\n📌 Total nacional de nascidos vivos:", total_nacional)
-print("\n📊 Nascidos vivos por estado (UF) com percentual sobre o total nacional:")
-percentuais_estado = (total_por_estado / total_nacional * 100).round(2)
-for uf in total_por_estado.index:
-    total = total_por_estado[uf]
-    perc = percentuais_estado[uf]
-    print(f"{uf:<3} {total:>7}  ({perc:.2f}%)")
+@pipeline.etapa('BL.1', entradas=['cubo'])
+def total_nascidos(cubo):
+    total_nacional = cubo.total()
+    total_por_estado = cubo.contar('UF')
+
+    print("\n📌 Total nacional de nascidos vivos:", total_nacional)
+    print("\n📊 Nascidos vivos por estado (UF) com percentual sobre o total nacional:")
+    percentuais_estado = (total_por_estado / total_nacional * 100).round(2)
+    for uf in total_por_estado.index:
+        total = total_por_estado[uf]
+        perc = percentuais_estado[uf]
+        print(f"{uf:<3} {total:>7}  ({perc:.2f}%)")
+    guardar('BL.1 Nascidos vivos por UF', pd.DataFrame({'Nascidos Vivos': total_por_estado,
+                                                         'Percentual (%)': percentuais_estado}))
 
 
 # 1.1. – Mapa dos nascidos vivos por UF (Brasil) – com siglas corrigidas manualmente
+@pipeline.etapa('BL.1.1', entradas=['cubo', 'malha_estados'], grafico=True)
+def mapa_nascidos_por_uf(cubo, malha_estados):
+    print("\n🗺️ [BRASIL] Mapa de calor: total de nascidos vivos por estado:")
+
+    # Modelo do mapa: polígonos, siglas (posições já calculadas na malha, ver malha_uf.py) e barra
+    # de legenda montados uma vez; a contagem só pinta os estados (ver mapa_coropletico.py)
+    mapa = MapaCoropletico(malha_estados, cmap='YlOrRd', legenda='extremos',
+                           rotulo_legenda='Índice de nascidos vivos')
+    mapa.pintar(cubo.contar('UF'), titulo='Mapa de calor de Nascidos Vivos por Estado (Brasil)',
+                fontsize=18, pad=20)
+
+    # Ajuste do layout
+    xmin, _, xmax, _ = malha_estados.total_bounds
+    mapa.ax.set_xlim(xmin - 200000, xmax + 1000000)
+    mapa.fig.tight_layout()
+    mapa.mostrar('BL.1.1_mapa_nascidos_por_uf')
 
-print("\n🗺️ [BRASIL] Mapa de calor: total de nascidos vivos por estado:")
-
-# Configurações iniciais
-geobr_path = 'https://raw.githubusercontent.com/GrupoMackenzie/ProjetoAplicado01-DataScience-Mackenzie-2025/main/src/br_estados.geojson'
-gdf = gpd.read_file(geobr_path).to_crs(epsg=5880)
-nascimentos_por_uf = df['UF'].value_counts().rename_axis('UF').reset_index(name='NASCIDOS')
-gdf['UF'] = gdf['sigla'] if 'sigla' in gdf.columns else gdf['UF']
-gdf = gdf.merge(nascimentos_por_uf, on='UF', how='left')
-
-# Plotar o mapa
-fig, ax = plt.subplots(1, 1, figsize=(15, 15))
-gdf.plot(column='NASCIDOS', cmap='YlOrRd', linewidth=0.8, edgecolor='gray', ax=ax)
-plt.title('Mapa de calor de Nascidos Vivos por Estado (Brasil)', fontsize=18, pad=20)
-plt.axis('off')
-
-# Configurações das siglas (conforme ajustes anteriores)
-siglas_config = {
-    'DF': {'offset': (1200000, -200000), 'linewidth': 0.8},
-    'SE': {'offset': (600000, -100000), 'linewidth': 0.6},
-    'AL': {'offset': (700000, -150000), 'linewidth': 0.6},
-    'ES': {'offset': (600000, 0), 'linewidth': 0.6},
-    'RJ': {'offset': (600000, -100000), 'linewidth': 0.6},
-    'PB': {'offset': (600000, 100000), 'linewidth': 0.6},
-    'RN': {'offset': (600000, 150000), 'linewidth': 0.6}
-}
-
-for idx, row in gdf.iterrows():
-    uf = row['UF']
-    centroid = row['geometry'].centroid.coords[0]
-
-    if uf in siglas_config:
-        cfg = siglas_config[uf]
-        text_pos = (centroid[0] + cfg['offset'][0], centroid[1] + cfg['offset'][1])
-
-        ax.plot([centroid[0], text_pos[0]], [centroid[1], text_pos[1]],
-                color='gray', linestyle='--', linewidth=cfg['linewidth'], alpha=0.7)
-
-        ax.text(text_pos[0], text_pos[1], uf,
-                ha='center', va='center',
-                fontsize=11, color='black', weight='bold',
-                bbox=dict(
-                    facecolor='white',
-                    alpha=0.9,
-                    edgecolor='gray',
-                    boxstyle='round,pad=0.3',
-                    linewidth=0.5
-                ))
-    else:
-        ax.text(centroid[0], centroid[1], uf,
-                ha='center', va='center',
-                fontsize=11, color='black', weight='bold',
-                bbox=dict(
-                    facecolor='white',
-                    alpha=0.9,
-                    edgecolor='gray',
-                    boxstyle='round,pad=0.3',
-                    linewidth=0.5
-                ))
-
-# BARRA DE LEGENDA
-sm = plt.cm.ScalarMappable(cmap='YlOrRd', norm=plt.Normalize(vmin=gdf['NASCIDOS'].min(), vmax=gdf['NASCIDOS'].max()))
-cbar = fig.colorbar(sm, orientation="vertical", fraction=0.04, pad=0.02, ax=ax)
-cbar.set_ticks([])
-
-# Elementos da legenda
-cbar.ax.plot([1.05, 1.10], [0.01, 0.01], color='black', transform=cbar.ax.transAxes)
-cbar.ax.text(1.12, 0.01, 'Menor', va='center', fontsize=11, weight='normal',
-             transform=cbar.ax.transAxes)  # Aumentado e negrito
-cbar.ax.plot([1.05, 1.10], [0.99, 0.99], color='black', transform=cbar.ax.transAxes)
-cbar.ax.text(1.12, 0.99, 'Maior', va='center', fontsize=11, weight='normal',
-             transform=cbar.ax.transAxes)  # Aumentado e negrito
-cbar.ax.text(-0.3, 0.5, 'Índice de nascidos vivos', va='center', ha='center',  # -0.3 para aproximar
-             rotation=90, fontsize=12, weight='normal', transform=cbar.ax.transAxes)  # Aumentado e negrito
-
-# Ajuste do layout
-ax.set_xlim(gdf.total_bounds[0] - 200000, gdf.total_bounds[2] + 1000000)
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.2 Classificação de pré-natal
 # -----------------------------
-def classificar_consultas(valor):
-    try:
-        v = float(valor)
-    except:
-        v = 0
-    if v == 0:
-        return 'Nenhum'
-    elif 1 <= v <= 5:
-        return 'Inadequado'
-    elif 6 <= v <= 7:
-        return 'Mínimo'
-    elif 8 <= v <= 14:
-        return 'Adequado'
-    elif v > 14:
-        return 'Incomum'
-    else:
-        return 'Nenhum'
-
-df['CATEGORIA_PRENATAL'] = df['CONSPRENAT'].apply(classificar_consultas)
+# Categorias pelo número de consultas (CATEGORIA_PRENATAL, ver classificadores.py)
+@pipeline.etapa('BL.2', entradas=['cubo'])
+def classificacao_prenatal(cubo):
+    # Nacional
+    print("\n📊 Classificação nacional de pré-natal:")
+    nacional = cubo.contar('CATEGORIA_PRENATAL').sort_values(ascending=False)
+    print(nacional)
+    guardar('BL.2 Classificação nacional', nacional.rename('Nascidos Vivos'))
+
+    # Por estado
+    print("\n📊 Classificação de pré-natal por estado (UF):")
+    por_uf = cubo.tabela('UF', 'CATEGORIA_PRENATAL')
+    print(por_uf)
+    guardar('BL.2 Classificação por UF', por_uf)
 
-# Nacional
-print("\n📊 Classificação nacional de pré-natal:")
-print(df['CATEGORIA_PRENATAL'].value_counts())
-
-# Por estado
-print("\n📊 Classificação de pré-natal por estado (UF):")
-print(df.groupby(['UF', 'CATEGORIA_PRENATAL']).size().unstack().fillna(0).astype(int))
 
 # 2.1 Gráfico de Classificação de pré-natal por região
+@pipeline.etapa('BL.2.1', entradas=['cubo_grupo'], grafico=True)
+def grafico_prenatal_por_regiao(cubo_grupo):
+    print("\n📊 [BRASIL] Distribuição da qualidade do pré-natal por região:")
+
+    # Agrupa as UFs por região do IBGE ('Ignorado' se a UF for desconhecida) e as categorias em Ruim, Bom, Ótimo
+    cubo_regiao = cubo_grupo.agrupar('UF', 'REGIAO', {**REGIAO_DA_SIGLA, None: REGIAO_IGNORADA}, CATEGORIAS_REGIAO)
+
+    # Criar tabela de distribuição percentual por região
+    tabela = cubo_regiao.tabela('REGIAO', 'GRUPO_PRENATAL')[['Ruim', 'Bom', 'Ótimo']]
+
+    # Normalizar para obter percentual
+    tabela_pct = (tabela.T / tabela.sum(axis=1)).T * 100
+    tabela_pct = tabela_pct[['Ruim', 'Bom', 'Ótimo']]  # ordem desejada
+    tabela_pct = tabela_pct.round(2)
+
+    # Plotar gráfico
+    tabela_pct.plot(kind='bar', figsize=(10, 6), stacked=False, color=['red', 'gold', 'green'])
+    plt.title('Classificação do Pré-Natal por Região do Brasil')
+    plt.ylabel('Percentual de Gestantes (%)')
+    plt.xlabel('Região')
+    plt.xticks(rotation=0)
+    plt.legend(title='Qualidade do Acompanhamento')
+    plt.tight_layout()
+    mostrar('BL.2.1_prenatal_por_regiao')
+
+
+# 2.2 Mapa do pré-natal Ótimo por município de residência
+@pipeline.etapa('BL.2.2', entradas=['df', 'malha_municipios', 'malha_estados'], grafico=True)
+def mapa_prenatal_por_municipio(df, malha_municipios, malha_estados):
+    print("\n🗺️ [BRASIL] Mapa: percentual de pré-natal Ótimo por município de residência:")
+
+    # Junção com a malha pelo código do IBGE com 6 dígitos (int), sem passar por texto
+    municipio = pd.Series(codigo_municipio_6(df['CODMUNRES']), index=df.index, name='CODMUN')
+    otimo = (df['GRUPO_PRENATAL'] == 'Ótimo').groupby(municipio).agg(['sum', 'size'])
+    otimo = otimo.reindex(malha_municipios['CODMUN'], fill_value=0)
+
+    # Municípios com menos de 30 nascidos vivos ficam sem cor (percentual instável)
+    otimo = otimo[otimo['size'] >= 30]
+    pct_otimo = (otimo['sum'] / otimo['size'] * 100).round(2)
+    print(f"Municípios com pelo menos 30 nascidos vivos: {len(pct_otimo)} de {len(malha_municipios)}")
+    print(f"Mediana entre os municípios: {pct_otimo.median():.2f}% com pré-natal Ótimo")
+    guardar('BL.2.2 Pré-natal Ótimo por município', otimo.set_axis(['Ótimo', 'Nascidos Vivos'], axis=1)
+            .assign(**{'Percentual (%)': pct_otimo}))
+
+    # Modelo do mapa montado uma vez (ver mapa_coropletico.py), com as divisas dos estados por cima
+    mapa = MapaCoropletico(malha_municipios, chave='CODMUN', cmap='RdYlGn', linewidth=0.05,
+                           siglas=False, rotulo_legenda='Pré-natal Ótimo (%)', cor_sem_dado='lightgray')
+    malha_estados.boundary.plot(ax=mapa.ax, color='black', linewidth=0.5)
+    mapa.pintar(pct_otimo, titulo='Pré-natal Ótimo por Município de Residência (Brasil)', fontsize=18, pad=20)
+    mapa.fig.tight_layout()
+    mapa.mostrar('BL.2.2_prenatal_otimo_por_municipio')
 
-print("\n📊 [BRASIL] Distribuição da qualidade do pré-natal por região:")
-
-# Mapeando estados por região
-regioes = {
-    'Norte':     ['AC', 'AP', 'AM', 'PA', 'RO', 'RR', 'TO'],
-    'Nordeste':  ['AL', 'BA', 'CE', 'MA', 'PB', 'PE', 'PI', 'RN', 'SE'],
-    'Centro-Oeste': ['DF', 'GO', 'MT', 'MS'],
-    'Sudeste':   ['ES', 'MG', 'RJ', 'SP'],
-    'Sul':       ['PR', 'RS', 'SC']
-}
-
-# Cria coluna 'REGIAO'
-def mapear_regiao(uf):
-    for regiao, ufs in regioes.items():
-        if uf in ufs:
-            return regiao
-    return 'Ignorado'
-
-df['REGIAO'] = df['UF'].apply(mapear_regiao)
-
-# Para agrupa categorias
-def classificar_grupo(cat):
-    if cat in ['Nenhum', 'Inadequado']:
-        return 'Ruim'
-    elif cat == 'Mínimo':
-        return 'Bom'
-    elif cat in ['Adequado', 'Incomum']:
-        return 'Ótimo'
-    else:
-        return 'Ignorado'
-
-df['GRUPO_PRENATAL'] = df['CATEGORIA_PRENATAL'].apply(classificar_grupo)
-
-# Criar tabela de distribuição percentual por região
-tabela = df[df['GRUPO_PRENATAL'] != 'Ignorado'].groupby(['REGIAO', 'GRUPO_PRENATAL']).size().unstack().fillna(0)
-
-# Normalizar para obter percentual
-tabela_pct = (tabela.T / tabela.sum(axis=1)).T * 100
-tabela_pct = tabela_pct[['Ruim', 'Bom', 'Ótimo']]  # ordem desejada
-tabela_pct = tabela_pct.round(2)
-
-# Plotar gráfico
-tabela_pct.plot(kind='bar', figsize=(10, 6), stacked=False, color=['red', 'gold', 'green'])
-plt.title('Classificação do Pré-Natal por Região do Brasil')
-plt.ylabel('Percentual de Gestantes (%)')
-plt.xlabel('Região')
-plt.xticks(rotation=0)
-plt.legend(title='Qualidade do Acompanhamento')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.3 Anomalias fetais por 10.000 gestantes
 # -----------------------------
-df_anom = df[df['IDANOMAL'].astype(str).isin(['1', '2'])]
-anomalias_nacional = (df_anom['IDANOMAL'].astype(str) == '1').sum()
-total_validos_anomalia = len(df_anom)
-taxa_nacional = round((anomalias_nacional / total_validos_anomalia) * 10000, 2) if total_validos_anomalia > 0 else 0.0
+@pipeline.etapa('BL.3', entradas=['cubo'])
+def taxa_anomalias(cubo):
+    # Só os registros com anomalia informada (Sim/Não)
+    contagem_anomalia = cubo.contar('ANOMALIA')
+    anomalias_nacional = contagem_anomalia['Sim']
+    total_validos_anomalia = contagem_anomalia['Sim'] + contagem_anomalia['Não']
+    taxa_nacional = round((anomalias_nacional / total_validos_anomalia) * 10000, 2) if total_validos_anomalia > 0 else 0.0
+
+    print("\n📌 Taxa nacional de anomalias fetais (por 10.000 gestantes):", taxa_nacional)
 
-print("\n📌 Taxa nacional de anomalias fetais (por 10.000 gestantes):", taxa_nacional)
+    print("\n📊 Taxa de anomalias por estado (UF) – por 10.000 gestantes:")
+    anomalia_uf = cubo.tabela('UF', 'ANOMALIA')
+    validos_uf = anomalia_uf['Sim'] + anomalia_uf['Não']
+    anomalia_por_uf = (anomalia_uf['Sim'] / validos_uf * 10000)[validos_uf > 0].round(2).rename('IDANOMAL')
+    print(anomalia_por_uf)
+    guardar('BL.3 Anomalias por UF', anomalia_por_uf.rename('Anomalias por 10.000'))
 
-print("\n📊 Taxa de anomalias por estado (UF) – por 10.000 gestantes:")
-anomalia_por_uf = df_anom.groupby('UF')['IDANOMAL'].apply(
-    lambda x: round((x.astype(str) == '1').sum() / len(x) * 10000, 2)
-)
-print(anomalia_por_uf)
 
 # -----------------------------
 # BL.4 Faixa etária das gestantes
 # -----------------------------
-def classificar_idade(idade):
-    try:
-        idade = int(idade)
-        if idade <= 13:
-            return '<=13'
-        elif 14 <= idade <= 18:
-            return '14-18'
-        elif 19 <= idade <= 30:
-            return '19-30'
-        elif 31 <= idade <= 35:
-            return '31-35'
-        elif 36 <= idade <= 40:
-            return '36-40'
-        elif idade >= 41:
-            return '>=41'
-        else:
-            return 'N/I'
-    except:
-        return 'N/I'
+@pipeline.etapa('BL.4', entradas=['cubo'])
+def faixa_etaria(cubo):
+    # Nacional
+    print("\n📊 Faixa etária das gestantes (Brasil) – número e percentual:")
+    contagem_nacional = cubo.contar('FAIXA_ETARIA').reindex(faixa_ordenada, fill_value=0)
+    percentual_nacional = contagem_nacional / contagem_nacional.sum() * 100
+    faixa_nacional = pd.DataFrame({
+        'Gestantes': contagem_nacional,
+        'Percentual (%)': percentual_nacional.round(2)
+    })
+    print(faixa_nacional)
+    guardar('BL.4 Faixa etária nacional', faixa_nacional)
+
+    # Por estado
+    print("\n📊 Número absoluto de gestantes por faixa etária e estado:")
+    contagem_uf = cubo.tabela('UF', 'FAIXA_ETARIA').reindex(columns=faixa_ordenada)
+    print(contagem_uf)
+    guardar('BL.4 Faixa etária por UF', contagem_uf)
+
+    print("\n📊 Percentual de gestantes por faixa etária e estado:")
+    percentual_uf = proporcao_por_linha(contagem_uf) * 100
+    print(percentual_uf.round(2).astype(str) + ' %')
+    guardar('BL.4 Faixa etária por UF (%)', percentual_uf.round(2))
 
-faixa_ordenada = ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41', 'N/I']
-df['FAIXA_ETARIA'] = df['IDADEMAE'].apply(classificar_idade)
-
-# Nacional
-print("\n📊 Faixa etária das gestantes (Brasil) – número e percentual:")
-contagem_nacional = df['FAIXA_ETARIA'].value_counts().reindex(faixa_ordenada, fill_value=0)
-percentual_nacional = df['FAIXA_ETARIA'].value_counts(normalize=True).reindex(faixa_ordenada, fill_value=0) * 100
-faixa_nacional = pd.DataFrame({
-    'Gestantes': contagem_nacional,
-    'Percentual (%)': percentual_nacional.round(2)
-})
-print(faixa_nacional)
-
-# Por estado
-print("\n📊 Número absoluto de gestantes por faixa etária e estado:")
-contagem_uf = df.groupby('UF')['FAIXA_ETARIA'].value_counts().unstack().fillna(0).reindex(columns=faixa_ordenada).astype(int)
-print(contagem_uf)
-
-print("\n📊 Percentual de gestantes por faixa etária e estado:")
-percentual_uf = df.groupby('UF')['FAIXA_ETARIA'].value_counts(normalize=True).unstack().fillna(0).reindex(columns=faixa_ordenada) * 100
-print(percentual_uf.round(2).astype(str) + ' %')
 
 # 4.1 Gráfico Faixa etária das gestantes (Brasil)
+@pipeline.etapa('BL.4.1', entradas=['cubo'], grafico=True)
+def grafico_faixa_etaria(cubo):
+    print("\n📊 [BRASIL] Gráfico de distribuição por faixa etária das gestantes:")
 
-print("\n📊 [BRASIL] Gráfico de distribuição por faixa etária das gestantes:")
+    # Filtrar faixas válidas
+    faixas_validas = ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41']
+    contagem_faixas = cubo.contar('FAIXA_ETARIA').reindex(faixas_validas, fill_value=0)
 
-# Filtrar faixas válidas
-faixas_validas = ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41']
-contagem_faixas = df['FAIXA_ETARIA'].value_counts().reindex(faixas_validas, fill_value=0)
+    # Plotar
+    plt.figure(figsize=(8, 5))
+    bars = plt.bar(contagem_faixas.index, contagem_faixas.values, color='steelblue')
+    plt.title('Número de Gestantes por Faixa Etária (Brasil)')
+    plt.xlabel('Faixa Etária da Mãe')
+    plt.ylabel('Número de Gestantes')
 
-# Plotar
-plt.figure(figsize=(8, 5))
-bars = plt.bar(contagem_faixas.index, contagem_faixas.values, color='steelblue')
-plt.title('Número de Gestantes por Faixa Etária (Brasil)')
-plt.xlabel('Faixa Etária da Mãe')
-plt.ylabel('Número de Gestantes')
+    # Para rótular
+    for bar in bars:
+        altura = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2, altura + 2000, f'{int(altura)}', ha='center')
 
-# Para rótular
-for bar in bars:
-    altura = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, altura + 2000, f'{int(altura)}', ha='center')
+    plt.tight_layout()
+    mostrar('BL.4.1_faixa_etaria')
 
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.5 Detalhamento final por UF: categoria pré-natal mais anomalias absolutas por nascidos
 # -----------------------------
-print("\n📊 Detalhamento por UF – distribuição percentual da CATEGORIA_PRENATAL e anomalias totais por nascidos vivos:\n")
-ufs = sorted(df['UF'].dropna().unique())
-for uf in ufs:
-    df_uf = df[df['UF'] == uf]
-    total_uf = len(df_uf)
-    categorias = df_uf['CATEGORIA_PRENATAL'].value_counts().sort_index()
-    categorias_percentual = (categorias / total_uf * 100).round(2)
-    anomalias_abs = (df_uf['IDANOMAL'].astype(str) == '1').sum()
-    taxa_anomalias_total = round((anomalias_abs / total_uf) * 100, 2)
-    print(f"🗂️ {uf} — Total nascidos vivos: {total_uf}")
-    for cat in categorias.index:
-        qtd = categorias[cat]
-        perc = categorias_percentual[cat]
-        print(f"   {cat:<25}: {qtd:>7}  ({perc:.2f}%)")
-    print(f"   🧬 Anomalias fetais absolutas: {anomalias_abs}  → {taxa_anomalias_total:.2f}% do total de nascidos\n")
+@pipeline.etapa('BL.5', entradas=['cubo'])
+def detalhamento_por_uf(cubo):
+    print("\n📊 Detalhamento por UF – distribuição percentual da CATEGORIA_PRENATAL e anomalias totais por nascidos vivos:\n")
+    categorias_uf = cubo.tabela('UF', 'CATEGORIA_PRENATAL')
+    anomalias_uf = cubo.tabela('UF', 'ANOMALIA', remover_vazias=False)
+    ufs = categorias_uf.index
+    for uf in ufs:
+        categorias = categorias_uf.loc[uf]
+        total_uf = categorias.sum()
+        categorias_percentual = (categorias / total_uf * 100).round(2)
+        anomalias_abs = anomalias_uf.loc[uf, 'Sim']
+        taxa_anomalias_total = round((anomalias_abs / total_uf) * 100, 2)
+        print(f"🗂️ {uf} — Total nascidos vivos: {total_uf}")
+        for cat in categorias.index:
+            qtd = categorias[cat]
+            perc = categorias_percentual[cat]
+            print(f"   {cat:<25}: {qtd:>7}  ({perc:.2f}%)")
+        print(f"   🧬 Anomalias fetais absolutas: {anomalias_abs}  → {taxa_anomalias_total:.2f}% do total de nascidos\n")
+    total_por_uf = categorias_uf.sum(axis=1)
+    guardar('BL.5 Detalhamento por UF (%)', (proporcao_por_linha(categorias_uf) * 100).round(2).assign(**{
+        'Nascidos Vivos': total_por_uf,
+        'Anomalias': anomalias_uf.loc[ufs, 'Sim'],
+        'Anomalias (%)': (anomalias_uf.loc[ufs, 'Sim'] / total_por_uf * 100).round(2),
+    }))
+
 
 # -----------------------------
 # BL.6 Risco percentual de anomalias por faixa etária (Brasil)
 # -----------------------------
-print("\n📊 Risco percentual de anomalias fetais por faixa etária da mãe (considerando total de nascidos na faixa):")
+@pipeline.etapa('BL.6', entradas=['cubo'])
+def risco_anomalias_por_faixa(cubo):
+    print("\n📊 Risco percentual de anomalias fetais por faixa etária da mãe (considerando total de nascidos na faixa):")
 
-nascidos_por_faixa = df['FAIXA_ETARIA'].value_counts().reindex(faixa_ordenada, fill_value=0)
-anomalias = df[df['IDANOMAL'].astype(str) == '1']
-anomalias_por_faixa = anomalias['FAIXA_ETARIA'].value_counts().reindex(faixa_ordenada, fill_value=0)
+    nascidos_por_faixa = cubo.contar('FAIXA_ETARIA').reindex(faixa_ordenada, fill_value=0)
+    anomalias = cubo.selecionar(ANOMALIA='Sim')
+    anomalias_por_faixa = anomalias.contar('FAIXA_ETARIA').reindex(faixa_ordenada, fill_value=0)
 
-risco_faixa = pd.DataFrame({
-    'Nascidos Vivos': nascidos_por_faixa,
-    'Com Anomalia': anomalias_por_faixa
-}).fillna(0)
+    risco_faixa = pd.DataFrame({
+        'Nascidos Vivos': nascidos_por_faixa,
+        'Com Anomalia': anomalias_por_faixa
+    }).fillna(0)
 
-risco_faixa['Percentual (%)'] = ((risco_faixa['Com Anomalia'] / risco_faixa['Nascidos Vivos']) * 100).round(2)
+    risco_faixa['Percentual (%)'] = ((risco_faixa['Com Anomalia'] / risco_faixa['Nascidos Vivos']) * 100).round(2)
+
+    print("\n📊 Tabela de risco de anomalias por faixa etária (em % dos nascidos vivos da faixa):\n")
+    print(risco_faixa)
+    guardar('BL.6 Risco de anomalias por faixa', risco_faixa)
 
-print("\n📊 Tabela de risco de anomalias por faixa etária (em % dos nascidos vivos da faixa):\n")
-print(risco_faixa)
 
 # -----------------------------
 # BL.7 Distribuição percentual das categorias de pré-natal por faixa etária (Brasil)
 # -----------------------------
-print("\n📊 Distribuição percentual das categorias de pré-natal por faixa etária (considerando 100% como o total de cada faixa):")
+@pipeline.etapa('BL.7', entradas=['cubo'])
+def prenatal_por_faixa(cubo):
+    print("\n📊 Distribuição percentual das categorias de pré-natal por faixa etária (considerando 100% como o total de cada faixa):")
+
+    tabela_cruzada = cubo.tabela('FAIXA_ETARIA', 'CATEGORIA_PRENATAL')
+    tabela_percentual = (tabela_cruzada.T / tabela_cruzada.T.sum()).T * 100
+    tabela_percentual = tabela_percentual.round(2)
+    tabela_percentual = tabela_percentual.reindex(index=faixa_ordenada)
 
-tabela_cruzada = df.groupby(['FAIXA_ETARIA', 'CATEGORIA_PRENATAL']).size().unstack().fillna(0)
-tabela_percentual = (tabela_cruzada.T / tabela_cruzada.T.sum()).T * 100
-tabela_percentual = tabela_percentual.round(2)
-tabela_percentual = tabela_percentual.reindex(index=faixa_ordenada)
+    print("\n📊 Tabela percentual de acompanhamento pré-natal por faixa etária:\n")
+    print(tabela_percentual.astype(str) + ' %')
+    guardar('BL.7 Pré-natal por faixa (%)', tabela_percentual)
 
-print("\n📊 Tabela percentual de acompanhamento pré-natal por faixa etária:\n")
-print(tabela_percentual.astype(str) + ' %')
 
 # 7.1 Gráfico – Qualidade do pré-natal por UF (Brasil)
+@pipeline.etapa('BL.7.1', entradas=['cubo_grupo'], grafico=True)
+def grafico_prenatal_por_uf(cubo_grupo):
+    print("\n📊 [UF] Gráfico – Qualidade do pré-natal por estado (Ruim, Bom, Ótimo):")
+
+    # Tabela cruzada: UF x Grupo pré-natal
+    tabela_uf = cubo_grupo.tabela('UF', 'GRUPO_PRENATAL')
+
+    # Percentuais por UF
+    tabela_uf_pct = (tabela_uf.T / tabela_uf.sum(axis=1)).T * 100
+    tabela_uf_pct = tabela_uf_pct[['Ruim', 'Bom', 'Ótimo']].round(2)
+
+    # Plotar
+    tabela_uf_pct.plot(kind='bar', figsize=(14, 7), color=['red', 'gold', 'green'])
+    plt.title('Qualidade do Pré-Natal por Unidade da Federação (Brasil)', fontsize=13)
+    plt.ylabel('Percentual de Gestantes (%)')
+    plt.xlabel('UF')
+    plt.xticks(rotation=45)
+    plt.legend(title='Classificação')
+    plt.tight_layout()
+    mostrar('BL.7.1_prenatal_por_uf')
 
-print("\n📊 [UF] Gráfico – Qualidade do pré-natal por estado (Ruim, Bom, Ótimo):")
-
-# Classificação
-def classificar_pre_natal(cat):
-    if cat in ['Nenhum', 'Inadequado']:
-        return 'Ruim'
-    elif cat == 'Mínimo':
-        return 'Bom'
-    elif cat in ['Adequado', 'Incomum']:
-        return 'Ótimo'
-    return 'Ignorado'
-
-df['GRUPO_PRENATAL'] = df['CATEGORIA_PRENATAL'].apply(classificar_pre_natal)
-
-# Tabela cruzada: UF x Grupo pré-natal
-tabela_uf = df.groupby(['UF', 'GRUPO_PRENATAL']).size().unstack().fillna(0)
-
-# Percentuais por UF
-tabela_uf_pct = (tabela_uf.T / tabela_uf.sum(axis=1)).T * 100
-tabela_uf_pct = tabela_uf_pct[['Ruim', 'Bom', 'Ótimo']].round(2)
-
-# Plotar
-tabela_uf_pct.plot(kind='bar', figsize=(14, 7), color=['red', 'gold', 'green'])
-plt.title('Qualidade do Pré-Natal por Unidade da Federação (Brasil)', fontsize=13)
-plt.ylabel('Percentual de Gestantes (%)')
-plt.xlabel('UF')
-plt.xticks(rotation=45)
-plt.legend(title='Classificação')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.8 Risco percentual de anomalias por categoria de pré-natal
 # -----------------------------
-print("\n📊 Risco percentual de anomalias fetais por categoria de pré-natal (considerando total de nascidos da categoria):")
+@pipeline.etapa('BL.8', entradas=['cubo'])
+def risco_anomalias_por_categoria(cubo):
+    print("\n📊 Risco percentual de anomalias fetais por categoria de pré-natal (considerando total de nascidos da categoria):")
 
-total_por_categoria = df['CATEGORIA_PRENATAL'].value_counts().sort_index()
-anom_por_categoria = anomalias['CATEGORIA_PRENATAL'].value_counts().sort_index()
+    total_por_categoria = cubo.contar('CATEGORIA_PRENATAL')
+    anom_por_categoria = cubo.selecionar(ANOMALIA='Sim').contar('CATEGORIA_PRENATAL')
 
-risco_categoria = pd.DataFrame({
-    'Nascidos Vivos': total_por_categoria,
-    'Com Anomalia': anom_por_categoria
-}).fillna(0)
+    risco_categoria = pd.DataFrame({
+        'Nascidos Vivos': total_por_categoria,
+        'Com Anomalia': anom_por_categoria
+    }).fillna(0)
 
-risco_categoria['Risco (%)'] = ((risco_categoria['Com Anomalia'] / risco_categoria['Nascidos Vivos']) * 100).round(2)
+    risco_categoria['Risco (%)'] = ((risco_categoria['Com Anomalia'] / risco_categoria['Nascidos Vivos']) * 100).round(2)
+
+    print("\n📊 Tabela de risco de anomalias fetais por categoria de pré-natal:\n")
+    print(risco_categoria)
+    guardar('BL.8 Risco por categoria', risco_categoria)
 
-print("\n📊 Tabela de risco de anomalias fetais por categoria de pré-natal:\n")
-print(risco_categoria)
 
 # 8.1 Gráfico – Risco de anomalias por grupo de pré-natal por estado (UF)
+@pipeline.etapa('BL.8.1', entradas=['cubo_grupo'], grafico=True)
+def grafico_risco_por_grupo(cubo_grupo):
+    print("\n📊 [UF] Risco de anomalias fetais por grupo de pré-natal (Ruim, Bom, Ótimo):\n")
+
+    # Apenas registros válidos: nascidos e anomalias por UF e grupo
+    cubo_validos = cubo_grupo.selecionar(GRUPO_PRENATAL=['Ruim', 'Bom', 'Ótimo'])
+    total_grupo = cubo_validos.tabela('UF', 'GRUPO_PRENATAL')
+    anomalias_grupo = cubo_validos.selecionar(ANOMALIA='Sim').tabela('UF', 'GRUPO_PRENATAL', remover_vazias=False)
+
+    # Risco por UF e grupo (grupo sem nascidos = 0)
+    df_risco_pivot = (anomalias_grupo.loc[total_grupo.index] / total_grupo * 100).round(2).fillna(0.0)
+    df_risco_pivot = df_risco_pivot[['Ruim', 'Bom', 'Ótimo']]
+
+    # Plota o gráfico
+    df_risco_pivot.plot(kind='bar', figsize=(14, 7), color=['red', 'gold', 'green'])
+    plt.title('Risco de Anomalias Fetais por Grupo de Pré-Natal por Estado (UF)', fontsize=13)
+    plt.ylabel('Risco de Anomalia (%)')
+    plt.xlabel('Unidade da Federação')
+    plt.xticks(rotation=45)
+    plt.legend(title='Qualidade do Pré-Natal')
+    plt.tight_layout()
+    mostrar('BL.8.1_risco_anomalias_por_grupo')
 
-print("\n📊 [UF] Risco de anomalias fetais por grupo de pré-natal (Ruim, Bom, Ótimo):\n")
-
-# Classificar
-def classificar_pre_natal(cat):
-    if cat in ['Nenhum', 'Inadequado']:
-        return 'Ruim'
-    elif cat == 'Mínimo':
-        return 'Bom'
-    elif cat in ['Adequado', 'Incomum']:
-        return 'Ótimo'
-    return 'Ignorado'
-
-df['GRUPO_PRENATAL'] = df['CATEGORIA_PRENATAL'].apply(classificar_pre_natal)
-
-# Apenas registros válidos
-df_validos = df[(df['GRUPO_PRENATAL'] != 'Ignorado') & (df['UF'].notna())]
-
-# Estrutura para armazenar os resultados
-dados = []
-
-# Iterar por UF e grupo
-for uf in sorted(df_validos['UF'].unique()):
-    for grupo in ['Ruim', 'Bom', 'Ótimo']:
-        sub = df_validos[(df_validos['UF'] == uf) & (df_validos['GRUPO_PRENATAL'] == grupo)]
-        total = len(sub)
-        if total > 0:
-            anomalias = (sub['IDANOMAL'].astype(str) == '1').sum()
-            risco = round((anomalias / total) * 100, 2)
-        else:
-            risco = 0.0
-        dados.append({'UF': uf, 'Grupo': grupo, 'Risco (%)': risco})
-
-# Transformar
-df_risco = pd.DataFrame(dados)
-df_risco_pivot = df_risco.pivot(index='UF', columns='Grupo', values='Risco (%)')[['Ruim', 'Bom', 'Ótimo']]
-
-# Plota o gráfico
-df_risco_pivot.plot(kind='bar', figsize=(14, 7), color=['red', 'gold', 'green'])
-plt.title('Risco de Anomalias Fetais por Grupo de Pré-Natal por Estado (UF)', fontsize=13)
-plt.ylabel('Risco de Anomalia (%)')
-plt.xlabel('Unidade da Federação')
-plt.xticks(rotation=45)
-plt.legend(title='Qualidade do Pré-Natal')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.9 Risco de anomalias fetais por categoria de pré-natal – somente mães com 36 anos ou mais (Brasil)
 # -----------------------------
+@pipeline.etapa('BL.9', entradas=['cubo'])
+def risco_maes_36_mais(cubo):
+    print("\n📊 [BRASIL] Risco de anomalias fetais por categoria de pré-natal – mães com 36 anos ou mais:\n")
 
-print("\n📊 [BRASIL] Risco de anomalias fetais por categoria de pré-natal – mães com 36 anos ou mais:\n")
+    # Filtrar as faixas de risco
+    faixas_risco = ['36-40', '>=41']
+    cubo_risco_idade = cubo.selecionar(FAIXA_ETARIA=faixas_risco)
 
-# Filtrar as faixas de risco
-faixas_risco = ['36-40', '>=41']
-df_risco_idade = df[df['FAIXA_ETARIA'].isin(faixas_risco)]
+    # Separar anomalias confirmadas
+    cubo_risco_idade_anom = cubo_risco_idade.selecionar(ANOMALIA='Sim')
 
-# Separar anomalias confirmadas
-df_risco_idade_anom = df_risco_idade[df_risco_idade['IDANOMAL'].astype(str) == '1']
+    # Total de mães com mais de 36 por categoria de pré-natal
+    total_por_categoria = cubo_risco_idade.contar('CATEGORIA_PRENATAL')
 
-# Total de mães com mais de 36 por categoria de pré-natal
-total_por_categoria = df_risco_idade['CATEGORIA_PRENATAL'].value_counts().sort_index()
+    # Total de anomalias confirmadas por categoria
+    anomalias_por_categoria = cubo_risco_idade_anom.contar('CATEGORIA_PRENATAL')
 
-# Total de anomalias confirmadas por categoria
-anomalias_por_categoria = df_risco_idade_anom['CATEGORIA_PRENATAL'].value_counts().sort_index()
+    # Tabela de risco
+    tabela_risco = pd.DataFrame({
+        'Gestantes 36+': total_por_categoria,
+        'Com Anomalia': anomalias_por_categoria
+    }).fillna(0)
 
-# Tabela de risco
-tabela_risco = pd.DataFrame({
-    'Gestantes 36+': total_por_categoria,
-    'Com Anomalia': anomalias_por_categoria
-}).fillna(0)
+    tabela_risco['Risco (%)'] = (tabela_risco['Com Anomalia'] / tabela_risco['Gestantes 36+'] * 100).round(2)
 
-tabela_risco['Risco (%)'] = (tabela_risco['Com Anomalia'] / tabela_risco['Gestantes 36+'] * 100).round(2)
+    # Exibe essa tabela
+    tabela_risco = tabela_risco.astype({'Gestantes 36+': 'int', 'Com Anomalia': 'int', 'Risco (%)': 'float'})
+    print(tabela_risco)
+    guardar('BL.9 Risco 36+ (Brasil)', tabela_risco)
 
-# Exibe essa tabela
-print(tabela_risco.astype({'Gestantes 36+': 'int', 'Com Anomalia': 'int', 'Risco (%)': 'float'}))
+    # 9.1 Risco de anomalias fetais por categoria de pre-natal – mães com 36 anos ou mais (SP)
 
-# 9.1 Risco de anomalias fetais por categoria de pre-natal – mães com 36 anos ou mais (SP)
+    print("\n📊 [SP] Risco de anomalias fetais por categoria de pré-natal – mães com 36 anos ou mais:\n")
 
-print("\n📊 [SP] Risco de anomalias fetais por categoria de pré-natal – mães com 36 anos ou mais:\n")
+    # Filtrar São Paulo com faixas etárias de risco
+    cubo_sp_risco = cubo.selecionar(UF='SP', FAIXA_ETARIA=['36-40', '>=41'])
 
-# Filtrar São Paulo com faixas etárias de risco
-df_sp_risco = df[(df['UF'] == 'SP') & (df['FAIXA_ETARIA'].isin(['36-40', '>=41']))]
+    # Anomalias confirmadas
+    cubo_sp_risco_anom = cubo_sp_risco.selecionar(ANOMALIA='Sim')
 
-# Anomalias confirmadas
-df_sp_risco_anom = df_sp_risco[df_sp_risco['IDANOMAL'].astype(str) == '1']
+    # Contagem total nas categorias
+    total_sp_categoria = cubo_sp_risco.contar('CATEGORIA_PRENATAL')
 
-# Contagem total nas categorias
-total_sp_categoria = df_sp_risco['CATEGORIA_PRENATAL'].value_counts().sort_index()
+    # Contagem de anomalias nas categoria
+    anomalias_sp_categoria = cubo_sp_risco_anom.contar('CATEGORIA_PRENATAL')
 
-# Contagem de anomalias nas categoria
-anomalias_sp_categoria = df_sp_risco_anom['CATEGORIA_PRENATAL'].value_counts().sort_index()
+    # Construir a tabela de risco
+    tabela_sp_risco = pd.DataFrame({
+        'Gestantes 36+ (SP)': total_sp_categoria,
+        'Com Anomalia': anomalias_sp_categoria
+    }).fillna(0)
 
-# Construir a tabela de risco
-tabela_sp_risco = pd.DataFrame({
-    'Gestantes 36+ (SP)': total_sp_categoria,
-    'Com Anomalia': anomalias_sp_categoria
-}).fillna(0)
+    tabela_sp_risco['Risco (%)'] = (tabela_sp_risco['Com Anomalia'] / tabela_sp_risco['Gestantes 36+ (SP)'] * 100).round(2)
 
-tabela_sp_risco['Risco (%)'] = (tabela_sp_risco['Com Anomalia'] / tabela_sp_risco['Gestantes 36+ (SP)'] * 100).round(2)
+    # Exibi
+    tabela_sp_risco = tabela_sp_risco.astype({'Gestantes 36+ (SP)': 'int', 'Com Anomalia': 'int', 'Risco (%)': 'float'})
+    print(tabela_sp_risco)
+    guardar('BL.9 Risco 36+ (SP)', tabela_sp_risco)
 
-# Exibi
-print(tabela_sp_risco.astype({'Gestantes 36+ (SP)': 'int', 'Com Anomalia': 'int', 'Risco (%)': 'float'}))
 
 # 9.2 Gráfico de barras – Risco de anomalias em gestantes com mais de 36 anos (Brasil)
+@pipeline.etapa('BL.9.2', grafico=True)
+def grafico_risco_36_mais_brasil():
+    print("\n📊 [BRASIL] Comparação do risco de anomalias entre gestantes com mais de 36 anos por tipo de acompanhamento pré-natal (gráfico de barras):")
 
-print("\n📊 [BRASIL] Comparação do risco de anomalias entre gestantes com mais de 36 anos por tipo de acompanhamento pré-natal (gráfico de barras):")
+    # Dados
+    riscos_brasil = {
+        'Acompanhamento Adequado': 1575 / 156873 * 100,
+        'Acompanhamento Inadequado': 560 / 43968 * 100
+    }
 
-# Dados
-riscos_brasil = {
-    'Acompanhamento Adequado': 1575 / 156873 * 100,
-    'Acompanhamento Inadequado': 560 / 43968 * 100
-}
+    labels = list(riscos_brasil.keys())
+    values = list(riscos_brasil.values())
 
-labels = list(riscos_brasil.keys())
-values = list(riscos_brasil.values())
+    plt.figure(figsize=(6, 5))
+    bars = plt.bar(labels, values, color=['green', 'red'])
+    plt.title('Risco de Anomalias – Gestantes com mais de 36 anos (Brasil)')
+    plt.ylabel('Risco de Anomalia (%)')
 
-plt.figure(figsize=(6, 5))
-bars = plt.bar(labels, values, color=['green', 'red'])
-plt.title('Risco de Anomalias – Gestantes com mais de 36 anos (Brasil)')
-plt.ylabel('Risco de Anomalia (%)')
+    # Exibi valores nas barras
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2, height + 0.05, f'{height:.2f}%', ha='center')
 
-# Exibi valores nas barras
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, height + 0.05, f'{height:.2f}%', ha='center')
+    plt.ylim(0, max(values) * 1.3)
+    mostrar('BL.9.2_risco_36_mais_brasil')
 
-plt.ylim(0, max(values) * 1.3)
-plt.show()
 
 # 9.3 Gráfico de barras – Risco de anomalias em gestantes com mais de 36 anos (São Paulo)
+@pipeline.etapa('BL.9.3', grafico=True)
+def grafico_risco_36_mais_sp():
+    print("\n📊 [SP] Comparação do risco de anomalias entre gestantes com mais de 36 anos por tipo de acompanhamento pré-natal (gráfico de barras):")
 
-print("\n📊 [SP] Comparação do risco de anomalias entre gestantes com mais de 36 anos por tipo de acompanhamento pré-natal (gráfico de barras):")
+    riscos_sp = {
+        'Acompanhamento Adequado': 657 / 47893 * 100,
+        'Acompanhamento Inadequado': 155 / 7556 * 100
+    }
 
-riscos_sp = {
-    'Acompanhamento Adequado': 657 / 47893 * 100,
-    'Acompanhamento Inadequado': 155 / 7556 * 100
-}
+    labels = list(riscos_sp.keys())
+    values = list(riscos_sp.values())
 
-labels = list(riscos_sp.keys())
-values = list(riscos_sp.values())
+    plt.figure(figsize=(6, 5))
+    bars = plt.bar(labels, values, color=['green', 'red'])
+    plt.title('Risco de Anomalias – Gestantes com mais de 36 anos (São Paulo)')
+    plt.ylabel('Risco de Anomalia (%)')
 
-plt.figure(figsize=(6, 5))
-bars = plt.bar(labels, values, color=['green', 'red'])
-plt.title('Risco de Anomalias – Gestantes com mais de 36 anos (São Paulo)')
-plt.ylabel('Risco de Anomalia (%)')
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2, height + 0.05, f'{height:.2f}%', ha='center')
 
-for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2, height + 0.05, f'{height:.2f}%', ha='center')
+    plt.ylim(0, max(values) * 1.3)
+    mostrar('BL.9.3_risco_36_mais_sp')
 
-plt.ylim(0, max(values) * 1.3)
-plt.show()
 
 # -----------------------------
 # BL.10 Distribuição percentual das categorias de pré-natal por escolaridade (Brasil e por UF)
 # -----------------------------
 
-# Para mapear escolaridade
-escolaridade_dict = {
-    '1': '0 anos',
-    '2': '1-3 anos',
-    '3': '4-7 anos',
-    '4': '8-11 anos',
-    '5': '12+ anos',
-    '9': 'N/I'
-}
-df['ESCMAE_LABEL'] = df['ESCMAE'].astype(str).map(escolaridade_dict).fillna('N/I')
+# Escolaridade: código ESCMAE -> anos de estudo, sem informação -> 'N/I' (ESCMAE_LABEL)
+@pipeline.etapa('BL.10', entradas=['cubo'])
+def prenatal_por_escolaridade(cubo):
+    # 📊 Nacional — distribuição de categorias de pré-natal dentro de cada faixa de escolaridade
+    print("\n📊 Distribuição percentual das categorias de pré-natal dentro de cada faixa de escolaridade (Brasil):")
 
-ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
+    tabela_nacional = proporcao_por_linha(cubo.tabela('ESCMAE_LABEL', 'CATEGORIA_PRENATAL')).round(4) * 100
+
+    tabela_nacional = tabela_nacional.reindex(index=ordem_escolaridade)
+    print(tabela_nacional.round(2).astype(str) + " %")
+    guardar('BL.10 Pré-natal por escolaridade (%)', tabela_nacional.round(2))
+
+    # 📊 Por estado (UF)
+    print("\n📊 Distribuição percentual das categorias de pré-natal dentro de cada faixa de escolaridade (por estado):")
+
+    tabela_uf = proporcao_por_linha(cubo.tabela(['UF', 'ESCMAE_LABEL'], 'CATEGORIA_PRENATAL')).round(4) * 100
+
+    ufs = tabela_uf.index.unique(level='UF')
+    for uf in ufs:
+        print(f"\n📌 {uf} — Distribuição % das categorias de pré-natal por escolaridade:")
+        tabela_estado = tabela_uf.loc[uf].reindex(index=ordem_escolaridade)
+        print(tabela_estado.round(2).astype(str) + " %")
+    guardar('BL.10 Pré-natal por UF e escolaridade (%)', tabela_uf.round(2))
 
-# 📊 Nacional — distribuição de categorias de pré-natal dentro de cada faixa de escolaridade
-print("\n📊 Distribuição percentual das categorias de pré-natal dentro de cada faixa de escolaridade (Brasil):")
-
-tabela_nacional = (
-    df.groupby('ESCMAE_LABEL')['CATEGORIA_PRENATAL']
-    .value_counts(normalize=True)
-    .unstack()
-    .fillna(0)
-    .round(4) * 100
-)
-
-tabela_nacional = tabela_nacional.reindex(index=ordem_escolaridade)
-print(tabela_nacional.round(2).astype(str) + " %")
-
-# 📊 Por estado (UF)
-print("\n📊 Distribuição percentual das categorias de pré-natal dentro de cada faixa de escolaridade (por estado):")
-
-tabela_uf = (
-    df.groupby(['UF', 'ESCMAE_LABEL'])['CATEGORIA_PRENATAL']
-    .value_counts(normalize=True)
-    .unstack()
-    .fillna(0)
-    .round(4) * 100
-)
-
-ufs = sorted(df['UF'].dropna().unique())
-for uf in ufs:
-    print(f"\n📌 {uf} — Distribuição % das categorias de pré-natal por escolaridade:")
-    tabela_estado = tabela_uf.loc[uf].reindex(index=ordem_escolaridade)
-    print(tabela_estado.round(2).astype(str) + " %")
 
 # 10.1 Gráfico – Qualidade do pré-natal por escolaridade (Brasil)
+@pipeline.etapa('BL.10.1', entradas=['cubo_grupo'], grafico=True)
+def grafico_prenatal_por_escolaridade(cubo_grupo):
+    print("\n📊 [BRASIL] Gráfico – Qualidade do pré-natal por escolaridade (Ruim, Bom, Ótimo):")
+
+    # Remover registros dos N/I
+    ordem_escolaridade_sem_ni = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos']
+    cubo_validos = cubo_grupo.selecionar(ESCMAE_LABEL=ordem_escolaridade_sem_ni, GRUPO_PRENATAL=['Ruim', 'Bom', 'Ótimo'])
+
+    # Agrupa e calcula os percentuais
+    tabela_esc = cubo_validos.tabela('ESCMAE_LABEL', 'GRUPO_PRENATAL')
+    tabela_esc = tabela_esc.reindex(index=ordem_escolaridade_sem_ni)
+
+    tabela_pct = (tabela_esc.T / tabela_esc.sum(axis=1)).T * 100
+    tabela_pct = tabela_pct[['Ruim', 'Bom', 'Ótimo']].round(2)
+
+    # Plota
+    tabela_pct.plot(kind='bar', figsize=(10, 6), color=['red', 'gold', 'green'])
+    plt.title('Qualidade do Pré-Natal por Escolaridade (Brasil)', fontsize=13)
+    plt.ylabel('Percentual de Gestantes (%)')
+    plt.xlabel('Anos de estudo da mãe')
+    plt.xticks(rotation=0)
+    plt.legend(title='Classificação')
+    plt.tight_layout()
+    mostrar('BL.10.1_prenatal_por_escolaridade')
 
-print("\n📊 [BRASIL] Gráfico – Qualidade do pré-natal por escolaridade (Ruim, Bom, Ótimo):")
-
-# Classificação em grupos
-def classificar_pre_natal(cat):
-    if cat in ['Nenhum', 'Inadequado']:
-        return 'Ruim'
-    elif cat == 'Mínimo':
-        return 'Bom'
-    elif cat in ['Adequado', 'Incomum']:
-        return 'Ótimo'
-    return 'Ignorado'
-
-df['GRUPO_PRENATAL'] = df['CATEGORIA_PRENATAL'].apply(classificar_pre_natal)
-
-# Remover registros dos N/I
-df_validos = df[(df['ESCMAE_LABEL'] != 'N/I') & (df['GRUPO_PRENATAL'] != 'Ignorado')]
-
-# Agrupa e calcula os percentuais
-ordem_escolaridade_sem_ni = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos']
-tabela_esc = df_validos.groupby(['ESCMAE_LABEL', 'GRUPO_PRENATAL']).size().unstack().fillna(0)
-tabela_esc = tabela_esc.reindex(index=ordem_escolaridade_sem_ni)
-
-tabela_pct = (tabela_esc.T / tabela_esc.sum(axis=1)).T * 100
-tabela_pct = tabela_pct[['Ruim', 'Bom', 'Ótimo']].round(2)
-
-# Plota
-tabela_pct.plot(kind='bar', figsize=(10, 6), color=['red', 'gold', 'green'])
-plt.title('Qualidade do Pré-Natal por Escolaridade (Brasil)', fontsize=13)
-plt.ylabel('Percentual de Gestantes (%)')
-plt.xlabel('Anos de estudo da mãe')
-plt.xticks(rotation=0)
-plt.legend(title='Classificação')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.11 Distribuição racial das gestantes – Brasil e por estado (UF)
 # -----------------------------
-def agrupar_raca(valor):
-    try:
-        codigo = int(valor)
-        if codigo in [2, 4]:
-            return 'Pretos e Pardos'
-        elif codigo in [1, 3]:
-            return 'Brancos e Amarelos'
-        elif codigo == 5:
-            return 'Indígenas'
-        else:
-            return 'Ignorado'
-    except:
-        return 'Ignorado'
-
-df['GRUPO_RACIAL'] = df['RACACOR'].apply(agrupar_raca)
-df_validos_raca = df[df['GRUPO_RACIAL'] != 'Ignorado']
-
-# Nacional
-contagem_racial = df_validos_raca['GRUPO_RACIAL'].value_counts().sort_index()
-percentual_racial = (contagem_racial / len(df_validos_raca)) * 100
-
-print("\n📊 Distribuição racial das gestantes (Brasil):\n")
-for grupo in contagem_racial.index:
-    total = contagem_racial[grupo]
-    perc = percentual_racial[grupo]
-    print(f"{grupo:<22} {total:>7}  ({perc:.2f}%)")
-
-# Por estado
-print("\n📊 Distribuição racial por estado (absoluto e percentual):\n")
-
-colunas_ordenadas = ['Brancos e Amarelos', 'Pretos e Pardos', 'Indígenas']
-
-tabela_abs = (
-    df_validos_raca.groupby(['UF', 'GRUPO_RACIAL'])
-    .size()
-    .unstack()
-    .reindex(columns=colunas_ordenadas, fill_value=0)
-    .astype(int)
-)
-
-tabela_pct = (
-    tabela_abs.div(tabela_abs.sum(axis=1), axis=0) * 100
-).round(2)
-
-# Formatação final da tabela
-tabela_final = tabela_abs.astype(str) + " (" + tabela_pct.astype(str) + "%)"
-print(tabela_final.to_string())
+@pipeline.etapa('BL.11', entradas=['cubo'], saidas=['contagem_racial'])
+def distribuicao_racial(cubo):
+    cubo_validos_raca = cubo.selecionar(GRUPO_RACIAL=grupos_raciais_validos)
+
+    # Nacional
+    contagem_racial = cubo_validos_raca.contar('GRUPO_RACIAL')
+    percentual_racial = (contagem_racial / contagem_racial.sum()) * 100
+
+    print("\n📊 Distribuição racial das gestantes (Brasil):\n")
+    for grupo in contagem_racial.index:
+        total = contagem_racial[grupo]
+        perc = percentual_racial[grupo]
+        print(f"{grupo:<22} {total:>7}  ({perc:.2f}%)")
+
+    # Por estado
+    print("\n📊 Distribuição racial por estado (absoluto e percentual):\n")
+
+    colunas_ordenadas = ['Brancos e Amarelos', 'Pretos e Pardos', 'Indígenas']
+
+    tabela_abs = cubo_validos_raca.tabela('UF', 'GRUPO_RACIAL').reindex(columns=colunas_ordenadas, fill_value=0)
+
+    tabela_pct = (
+        tabela_abs.div(tabela_abs.sum(axis=1), axis=0) * 100
+    ).round(2)
+
+    # Formatação final da tabela
+    tabela_final = tabela_abs.astype(str) + " (" + tabela_pct.astype(str) + "%)"
+    print(tabela_final.to_string())
+    guardar('BL.11 Distribuição racial por UF', tabela_abs.join(tabela_pct, rsuffix=' (%)'))
+
+    return {'contagem_racial': contagem_racial}
+
 
 # 11.1 Gráfico de pizza – Distribuição racial das gestantes (Brasil)
+@pipeline.etapa('BL.11.1', entradas=['contagem_racial'], grafico=True)
+def grafico_distribuicao_racial(contagem_racial):
+    print("\n📊 [BRASIL] Gráfico de pizza – Distribuição racial das gestantes (total nacional com raça informada):")
 
-print("\n📊 [BRASIL] Gráfico de pizza – Distribuição racial das gestantes (total nacional com raça informada):")
+    # Dados
+    labels = ['Pretos e Pardos', 'Brancos e Amarelos', 'Indígenas']
+    values = [contagem_racial.get(label, 0) for label in labels]
+    colors = ['#9467bd', '#1f77b4', '#ff7f0e']  # roxo, azul, laranja
 
-# Dados
-labels = ['Pretos e Pardos', 'Brancos e Amarelos', 'Indígenas']
-values = [contagem_racial.get(label, 0) for label in labels]
-colors = ['#9467bd', '#1f77b4', '#ff7f0e']  # roxo, azul, laranja
+    # Plot
+    plt.figure(figsize=(7, 7))
+    plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
+    plt.title('Distribuição Racial das Gestantes Brasileiras', fontsize=13)
+    plt.axis('equal')
+    plt.tight_layout()
+    mostrar('BL.11.1_distribuicao_racial')
 
-# Plot
-plt.figure(figsize=(7, 7))
-plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
-plt.title('Distribuição Racial das Gestantes Brasileiras', fontsize=13)
-plt.axis('equal')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.12 Distribuição do estado civil das gestantes – Brasil e por estado (UF)
 # -----------------------------
+@pipeline.etapa('BL.12', entradas=['cubo'], saidas=['contagem_civil'])
+def distribuicao_estado_civil(cubo):
+    cubo_validos_civil = cubo.selecionar(GRUPO_ESTCIVIL=['Não solo', 'Solo'])
+
+    # Nacional
+    contagem_civil = cubo_validos_civil.contar('GRUPO_ESTCIVIL')
+    percentual_civil = (contagem_civil / contagem_civil.sum()) * 100
+
+    print("\n📊 Distribuição do estado civil das gestantes (Brasil):\n")
+    for grupo in contagem_civil.index:
+        total = contagem_civil[grupo]
+        perc = percentual_civil[grupo]
+        print(f"{grupo:<20} {total:>7}  ({perc:.2f}%)")
+
+    # Por estado
+    print("\n📊 Distribuição por estado (absoluto e percentual):\n")
+
+    colunas_ordenadas = ['Não solo', 'Solo']
+
+    # Cálculo
+    tabela_abs = cubo_validos_civil.tabela('UF', 'GRUPO_ESTCIVIL').reindex(columns=colunas_ordenadas, fill_value=0)
+
+    tabela_pct = (
+        tabela_abs.div(tabela_abs.sum(axis=1), axis=0) * 100
+    ).round(2)
+
+    # Formatação final
+    tabela_final = tabela_abs.astype(str) + " (" + tabela_pct.astype(str) + "%)"
+    print(tabela_final.to_string())
+    guardar('BL.12 Estado civil por UF', tabela_abs.join(tabela_pct, rsuffix=' (%)'))
+
+    return {'contagem_civil': contagem_civil}
 
-def agrupar_estado_civil(valor):
-    try:
-        codigo = int(valor)
-        if codigo in [1, 2]:
-            return 'Não solo'
-        elif codigo in [3, 4, 5]:
-            return 'Solo'
-        else:
-            return 'N/I'
-    except:
-        return 'N/I'
-
-df['GRUPO_ESTCIVIL'] = df['ESTCIVMAE'].apply(agrupar_estado_civil)
-df_validos_civil = df[df['GRUPO_ESTCIVIL'] != 'N/I']
-
-# Nacional
-contagem_civil = df_validos_civil['GRUPO_ESTCIVIL'].value_counts().sort_index()
-percentual_civil = (contagem_civil / len(df_validos_civil)) * 100
-
-print("\n📊 Distribuição do estado civil das gestantes (Brasil):\n")
-for grupo in contagem_civil.index:
-    total = contagem_civil[grupo]
-    perc = percentual_civil[grupo]
-    print(f"{grupo:<20} {total:>7}  ({perc:.2f}%)")
-
-# Por estado
-print("\n📊 Distribuição por estado (absoluto e percentual):\n")
-
-colunas_ordenadas = ['Não solo', 'Solo']
-
-# Cálculo
-tabela_abs = (
-    df_validos_civil.groupby(['UF', 'GRUPO_ESTCIVIL'])
-    .size()
-    .unstack()
-    .reindex(columns=colunas_ordenadas, fill_value=0)
-    .astype(int)
-)
-
-tabela_pct = (
-    tabela_abs.div(tabela_abs.sum(axis=1), axis=0) * 100
-).round(2)
-
-# Formatação final
-tabela_final = tabela_abs.astype(str) + " (" + tabela_pct.astype(str) + "%)"
-print(tabela_final.to_string())
 
 # 12.1 Gráfico de pizza – Estado civil das gestantes (Brasil)
+@pipeline.etapa('BL.12.1', entradas=['contagem_civil'], grafico=True)
+def grafico_estado_civil(contagem_civil):
+    print("\n📊 [BRASIL] Gráfico de pizza – Estado civil das gestantes:")
 
-print("\n📊 [BRASIL] Gráfico de pizza – Estado civil das gestantes:")
+    labels = ['Não Solteiras', 'Solteiras']
+    values = [
+        contagem_civil.get('Não solo', 0),
+        contagem_civil.get('Solo', 0)
+    ]
+    colors = ['#1f77b4', '#ff7f0e']
 
-labels = ['Não Solteiras', 'Solteiras']
-values = [
-    contagem_civil.get('Não solo', 0),
-    contagem_civil.get('Solo', 0)
-]
-colors = ['#1f77b4', '#ff7f0e']
+    plt.figure(figsize=(7, 7))
+    plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
+    plt.title('Distribuição do Estado Civil das Gestantes no Brasil', fontsize=13)
+    plt.axis('equal')
+    plt.tight_layout()
+    mostrar('BL.12.1_estado_civil')
 
-plt.figure(figsize=(7, 7))
-plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors)
-plt.title('Distribuição do Estado Civil das Gestantes no Brasil', fontsize=13)
-plt.axis('equal')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.13 Distribuição das categorias de pré-natal por grupo racial – Brasil
 # -----------------------------
+@pipeline.etapa('BL.13', entradas=['cubo'])
+def prenatal_por_raca(cubo):
+    # para remover os ignorados
+    cubo_raca_prenatal = cubo.selecionar(GRUPO_RACIAL=grupos_raciais_validos)
 
-# para remover os ignorados
-df_raca_prenatal = df[df['GRUPO_RACIAL'] != 'Ignorado']
+    # Cruzamento
+    tabela_cruzada_raca = proporcao_por_linha(cubo_raca_prenatal.tabela('GRUPO_RACIAL', 'CATEGORIA_PRENATAL')).round(4) * 100
 
-# Cruzamento
-tabela_cruzada_raca = (
-    df_raca_prenatal.groupby('GRUPO_RACIAL')['CATEGORIA_PRENATAL']
-    .value_counts(normalize=True)
-    .unstack()
-    .fillna(0)
-    .round(4) * 100
-)
+    # Formatação para exibir com porcentagens
+    print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial (Brasil):\n")
+    print(tabela_cruzada_raca.round(2).astype(str) + " %")
+    guardar('BL.13 Pré-natal por grupo racial (%)', tabela_cruzada_raca.round(2))
 
-# Formatação para exibir com porcentagens
-print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial (Brasil):\n")
-print(tabela_cruzada_raca.round(2).astype(str) + " %")
 
 # 13.1 Gráfico – Qualidade do pré-natal por grupo racial (Brasil)
+@pipeline.etapa('BL.13.1', entradas=['cubo_grupo'], grafico=True)
+def grafico_prenatal_por_raca(cubo_grupo):
+    print("\n📊 [BRASIL] Gráfico – Qualidade do pré-natal por grupo racial (Ruim, Bom, Ótimo):")
+
+    # Apenas grupos raciais analisados no bloco 13
+    grupos_raciais = ['Pretos e Pardos', 'Brancos e Amarelos', 'Indígenas']
+    cubo_racial = cubo_grupo.selecionar(GRUPO_RACIAL=grupos_raciais)
+
+    # Tabela cruzada
+    tabela = cubo_racial.tabela('GRUPO_RACIAL', 'GRUPO_PRENATAL')
+
+    # Percentual por grupo racial
+    tabela_pct = (tabela.T / tabela.sum(axis=1)).T * 100
+    tabela_pct = tabela_pct[['Ruim', 'Bom', 'Ótimo']].round(2)
+
+    # Plotar
+    tabela_pct.plot(kind='bar', figsize=(9, 6), color=['red', 'gold', 'green'])
+    plt.title('Qualidade do Pré-Natal por Grupo Racial (Brasil)', fontsize=13)
+    plt.ylabel('Percentual de Gestantes (%)')
+    plt.xlabel('Grupo Racial')
+    plt.xticks(rotation=0)
+    plt.legend(title='Classificação')
+    plt.tight_layout()
+    mostrar('BL.13.1_prenatal_por_raca')
 
-print("\n📊 [BRASIL] Gráfico – Qualidade do pré-natal por grupo racial (Ruim, Bom, Ótimo):")
-
-# Categorias em grupos
-def classificar_pre_natal(cat):
-    if cat in ['Nenhum', 'Inadequado']:
-        return 'Ruim'
-    elif cat == 'Mínimo':
-        return 'Bom'
-    elif cat in ['Adequado', 'Incomum']:
-        return 'Ótimo'
-    return 'Ignorado'
-
-df['GRUPO_PRENATAL'] = df['CATEGORIA_PRENATAL'].apply(classificar_pre_natal)
-
-# Apenas grupos raciais analisados no bloco 13
-grupos_raciais = ['Pretos e Pardos', 'Brancos e Amarelos', 'Indígenas']
-df_racial = df[df['GRUPO_RACIAL'].isin(grupos_raciais)]
-
-# Tabela cruzada
-tabela = df_racial.groupby(['GRUPO_RACIAL', 'GRUPO_PRENATAL']).size().unstack().fillna(0)
-
-# Percentual por grupo racial
-tabela_pct = (tabela.T / tabela.sum(axis=1)).T * 100
-tabela_pct = tabela_pct[['Ruim', 'Bom', 'Ótimo']].round(2)
-
-# Plotar
-tabela_pct.plot(kind='bar', figsize=(9, 6), color=['red', 'gold', 'green'])
-plt.title('Qualidade do Pré-Natal por Grupo Racial (Brasil)', fontsize=13)
-plt.ylabel('Percentual de Gestantes (%)')
-plt.xlabel('Grupo Racial')
-plt.xticks(rotation=0)
-plt.legend(title='Classificação')
-plt.tight_layout()
-plt.show()
 
 # -----------------------------
 # BL.14 Distribuição das categorias de pré-natal por grupo racial e escolaridade – Brasil
 # -----------------------------
+@pipeline.etapa('BL.14', entradas=['cubo'])
+def prenatal_por_raca_escolaridade(cubo):
+    # Filtrar só válidos
+    cubo_raca_esc = cubo.selecionar(GRUPO_RACIAL=grupos_raciais_validos)
 
-# Filtrar só válidos
-df_raca_esc = df[
-    (df['GRUPO_RACIAL'] != 'Ignorado') &
-    (df['ESCMAE_LABEL'] != 'NL')
-]
+    # Ordem das faixas de escolaridade
+    ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
 
-# Ordem das faixas de escolaridade
-ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
+    # Agrupar: raça + escolaridade e categoria pré-natal
+    tabela_cruzada = proporcao_por_linha(
+        cubo_raca_esc.tabela(['GRUPO_RACIAL', 'ESCMAE_LABEL'], 'CATEGORIA_PRENATAL')
+    ).round(4) * 100
 
-# Agrupar: raça + escolaridade e categoria pré-natal
-tabela_cruzada = (
-    df_raca_esc
-    .groupby(['GRUPO_RACIAL', 'ESCMAE_LABEL'])['CATEGORIA_PRENATAL']
-    .value_counts(normalize=True)
-    .unstack()
-    .fillna(0)
-    .round(4) * 100
-)
+    # Precisou reordenar
+    tabela_cruzada = tabela_cruzada.reindex(index=ordem_escolaridade, level=1)
 
-# Precisou reordenar
-tabela_cruzada = tabela_cruzada.reindex(index=ordem_escolaridade, level=1)
+    # Exibe o formatado
+    print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial e escolaridade (Brasil):\n")
 
-# Exibe o formatado
-print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial e escolaridade (Brasil):\n")
+    # Separar por grupo racial
+    for grupo in sorted(tabela_cruzada.index.unique(level='GRUPO_RACIAL')):
+        print(f"\n📌 {grupo}:\n")
+        print(tabela_cruzada.loc[grupo].round(2).astype(str) + " %")
+    guardar('BL.14 Pré-natal por raça e escolaridade (%)', tabela_cruzada.round(2))
 
-# Separar por grupo racial
-for grupo in sorted(df_raca_esc['GRUPO_RACIAL'].unique()):
-    print(f"\n📌 {grupo}:\n")
-    print(tabela_cruzada.loc[grupo].round(2).astype(str) + " %")
 
 # -----------------------------
 # BL.15 Distribuição das categorias de pré-natal por grupo racial, escolaridade e estado civil – Brasil
 # -----------------------------
+@pipeline.etapa('BL.15', entradas=['cubo'])
+def prenatal_por_raca_escolaridade_estado_civil(cubo):
+    # Filtrar só válidos
+    cubo_raca_esc_civil = cubo.selecionar(GRUPO_RACIAL=grupos_raciais_validos, GRUPO_ESTCIVIL=['Não solo', 'Solo'])
+
+    # Ordem da escolaridade
+    ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
+
+    # Agrupar raça/escolaridade/prenatal/EstadoCivil
+    tabela_cruzada = proporcao_por_linha(
+        cubo_raca_esc_civil.tabela(['GRUPO_RACIAL', 'ESCMAE_LABEL', 'GRUPO_ESTCIVIL'], 'CATEGORIA_PRENATAL')
+    ).round(4) * 100
+
+    # Grupos raciais e estados civis presentes
+    grupos_presentes = sorted(tabela_cruzada.index.unique(level='GRUPO_RACIAL'))
+    estados_civis_presentes = sorted(tabela_cruzada.index.unique(level='GRUPO_ESTCIVIL'))
+
+    # Reordenar escolaridade dentro de cada grupo
+    tabela_cruzada = tabela_cruzada.reindex(index=pd.MultiIndex.from_product(
+        [
+            grupos_presentes,
+            ordem_escolaridade,
+            estados_civis_presentes
+        ],
+        names=['GRUPO_RACIAL', 'ESCMAE_LABEL', 'GRUPO_ESTCIVIL']
+    )).dropna(how='all')
+
+    # Exibir
+    print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial, escolaridade e estado civil (Brasil):\n")
+
+    # Iterar por grupo racial
+    for grupo_racial in grupos_presentes:
+        print(f"\n📌 {grupo_racial}:\n")
+        grupo_df = tabela_cruzada.loc[grupo_racial]
+        for estado_civil in estados_civis_presentes:
+            print(f"▶ Estado civil: {estado_civil}\n")
+            subtabela = grupo_df.xs(estado_civil, level='GRUPO_ESTCIVIL', drop_level=False)
+            print((subtabela.droplevel('GRUPO_ESTCIVIL').round(2).astype(str) + " %").to_string())
+    guardar('BL.15 Pré-natal por raça, escolaridade e estado civil (%)', tabela_cruzada.round(2))
 
-# Filtrar só válidos
-df_raca_esc_civil = df[
-    (df['GRUPO_RACIAL'] != 'Ignorado') &
-    (df['ESCMAE_LABEL'] != 'NL') &
-    (df['GRUPO_ESTCIVIL'] != 'N/I')
-]
-
-# Ordem da escolaridade
-ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
-
-# Agrupar raça/escolaridade/prenatal/EstadoCivil
-tabela_cruzada = (
-    df_raca_esc_civil
-    .groupby(['GRUPO_RACIAL', 'ESCMAE_LABEL', 'GRUPO_ESTCIVIL'])['CATEGORIA_PRENATAL']
-    .value_counts(normalize=True)
-    .unstack()
-    .fillna(0)
-    .round(4) * 100
-)
-
-# Reordenar escolaridade dentro de cada grupo
-tabela_cruzada = tabela_cruzada.reindex(index=pd.MultiIndex.from_product(
-    [
-        sorted(df_raca_esc_civil['GRUPO_RACIAL'].unique()),
-        ordem_escolaridade,
-        sorted(df_raca_esc_civil['GRUPO_ESTCIVIL'].unique())
-    ],
-    names=['GRUPO_RACIAL', 'ESCMAE_LABEL', 'GRUPO_ESTCIVIL']
-)).dropna(how='all')
-
-# Exibir
-print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial, escolaridade e estado civil (Brasil):\n")
-
-# Iterar por grupo racial
-for grupo_racial in sorted(df_raca_esc_civil['GRUPO_RACIAL'].unique()):
-    print(f"\n📌 {grupo_racial}:\n")
-    grupo_df = tabela_cruzada.loc[grupo_racial]
-    for estado_civil in sorted(df_raca_esc_civil['GRUPO_ESTCIVIL'].unique()):
-        print(f"▶ Estado civil: {estado_civil}\n")
-        subtabela = grupo_df.xs(estado_civil, level='GRUPO_ESTCIVIL', drop_level=False)
-        print((subtabela.droplevel('GRUPO_ESTCIVIL').round(2).astype(str) + " %").to_string())
 
 # -----------------------------
 # Bl.16 Distribuição percentual das categorias de pré-natal por grupo racial, escolaridade, estado civil e faixa etária (Brasil)
 # -----------------------------
+@pipeline.etapa('BL.16', entradas=['cubo'])
+def prenatal_por_perfil_e_faixa(cubo):
+    print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial, escolaridade, estado civil e faixa etária (Brasil):\n")
+
+    # Filtrar apenas registros válidos
+    cubo_validos_full = cubo.selecionar(
+        GRUPO_RACIAL=['Brancos e Amarelos', 'Pretos e Pardos', 'Indígenas'],
+        ESCMAE_LABEL=['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I'],
+        GRUPO_ESTCIVIL=['Solo', 'Não solo'],
+        FAIXA_ETARIA=['<=13', '14-18', '19-30', '31-35', '36-40', '>=41'],
+    )
+
+    # Defini a ordem fixa/escolaridade
+    ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
+
+    # Loop por grupo racial (os que aparecem nos dados)
+    contagem_grupos = cubo_validos_full.contar('GRUPO_RACIAL')
+    for grupo_racial in contagem_grupos[contagem_grupos > 0].index:
+        print(f"\n📌 {grupo_racial}:\n")
+        # Loop por estado civil
+        for estado_civil in ['Não solo', 'Solo']:
+            print(f"▶ Estado civil: {estado_civil}\n")
+            # Loop por faixa etária
+            for faixa in ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41']:
+                print(f"📎 Faixa etária: {faixa}\n")
+                # Filtrar dados
+                dados = cubo_validos_full.selecionar(
+                    GRUPO_RACIAL=grupo_racial, GRUPO_ESTCIVIL=estado_civil, FAIXA_ETARIA=faixa
+                )
+                if dados.total() == 0:
+                    print("❗ Sem dados para esta combinação.\n")
+                    continue
+                # Agrupa e calcula os percentuais
+                tabela_pct = proporcao_por_linha(dados.tabela('ESCMAE_LABEL', 'CATEGORIA_PRENATAL')).round(4) * 100
+                tabela_pct = tabela_pct.reindex(index=ordem_escolaridade)
+
+                # ✅ Corrigir para 2 casas decimais
+                tabela_pct = tabela_pct.astype(float).round(2).astype(str) + " %"
+
+                # Exibi
+                print(tabela_pct.to_string())
+                print()
+
+    # Todas as combinações numa tabela só, para a exportação
+    if planilhas.ativa():
+        tabela_completa = proporcao_por_linha(cubo_validos_full.tabela(
+            ['GRUPO_RACIAL', 'GRUPO_ESTCIVIL', 'FAIXA_ETARIA', 'ESCMAE_LABEL'], 'CATEGORIA_PRENATAL'))
+        guardar('BL.16 Pré-natal por perfil e faixa (%)', (tabela_completa.round(4) * 100).round(2))
 
-print("\n📊 Distribuição percentual das categorias de pré-natal por grupo racial, escolaridade, estado civil e faixa etária (Brasil):\n")
-
-# Filtrar apenas registros válidos
-df_validos_full = df[
-    (df['GRUPO_RACIAL'].isin(['Brancos e Amarelos', 'Pretos e Pardos', 'Indígenas'])) &
-    (df['ESCMAE_LABEL'].isin(['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I'])) &
-    (df['GRUPO_ESTCIVIL'].isin(['Solo', 'Não solo'])) &
-    (df['FAIXA_ETARIA'].isin(['<=13', '14-18', '19-30', '31-35', '36-40', '>=41']))
-]
-
-# Defini a ordem fixa/escolaridade
-ordem_escolaridade = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
-
-# Loop por grupo racial
-for grupo_racial in df_validos_full['GRUPO_RACIAL'].unique():
-    print(f"\n📌 {grupo_racial}:\n")
-    # Loop por estado civil
-    for estado_civil in ['Não solo', 'Solo']:
-        print(f"▶ Estado civil: {estado_civil}\n")
-        # Loop por faixa etária
-        for faixa in ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41']:
-            print(f"📎 Faixa etária: {faixa}\n")
-            # Filtrar dados
-            dados = df_validos_full[
-                (df_validos_full['GRUPO_RACIAL'] == grupo_racial) &
-                (df_validos_full['GRUPO_ESTCIVIL'] == estado_civil) &
-                (df_validos_full['FAIXA_ETARIA'] == faixa)
-            ]
-            if len(dados) == 0:
-                print("❗ Sem dados para esta combinação.\n")
-                continue
-            # Agrupa e calcula os percentuais
-            tabela_pct = (
-                    dados.groupby('ESCMAE_LABEL')['CATEGORIA_PRENATAL']
-                    .value_counts(normalize=True)
-                    .unstack()
-                    .fillna(0)
-                    .round(4) * 100
-            )
-            tabela_pct = tabela_pct.reindex(index=ordem_escolaridade)
-
-            # ✅ Corrigir para 2 casas decimais
-            tabela_pct = tabela_pct.astype(float).round(2).astype(str) + " %"
-
-            # Exibi
-            print(tabela_pct.to_string())
-            print()
 
 # -----------------------------
 # BL.17. Percentual nacional de gestantes que não realizaram nenhum pré-natal
 # -----------------------------
+@pipeline.etapa('BL.17', entradas=['cubo'])
+def sem_prenatal(cubo):
+    print("\n📊 [BRASIL] Percentual de gestantes que não realizaram nenhum pré-natal:\n")
 
-print("\n📊 [BRASIL] Percentual de gestantes que não realizaram nenhum pré-natal:\n")
+    # Total nacional
+    total_gestantes = cubo.total()
 
-# Total nacional
-total_gestantes = len(df)
+    # Total de gestantes sem pré-natal
+    sem_prenatal = cubo.contar('CATEGORIA_PRENATAL')['Nenhum']
 
-# Total de gestantes sem pré-natal
-sem_prenatal = (df['CATEGORIA_PRENATAL'] == 'Nenhum').sum()
+    # Cálculo do percentual
+    percentual_sem_prenatal = round((sem_prenatal / total_gestantes) * 100, 2)
 
-# Cálculo do percentual
-percentual_sem_prenatal = round((sem_prenatal / total_gestantes) * 100, 2)
+    print(f"Total de gestantes: {total_gestantes}")
+    print(f"Gestantes sem nenhum pré-natal: {sem_prenatal}")
+    print(f"📌 Percentual nacional sem pré-natal: {percentual_sem_prenatal:.2f}%")
+    guardar('BL.17 Sem pré-natal', pd.DataFrame({'Total de gestantes': [total_gestantes],
+                                                 'Sem pré-natal': [sem_prenatal],
+                                                 'Percentual (%)': [percentual_sem_prenatal]}))
 
-print(f"Total de gestantes: {total_gestantes}")
-print(f"Gestantes sem nenhum pré-natal: {sem_prenatal}")
-print(f"📌 Percentual nacional sem pré-natal: {percentual_sem_prenatal:.2f}%")
 
 # -----------------------------
 # BL.18 Estados com maior concentração de gestantes com baixa escolaridade, negras/indígenas, até 18 anos e solteiras
 # -----------------------------
+@pipeline.etapa('BL.18', entradas=['cubo'])
+def perfil_vulneravel_por_uf(cubo):
+    print("\n📊 [BRASIL] Percentual de gestantes em situação de maior vulnerabilidade por estado (perfil combinado):\n")
 
-print("\n📊 [BRASIL] Percentual de gestantes em situação de maior vulnerabilidade por estado (perfil combinado):\n")
+    # Filtrar gestantes válidas para todos os critérios
+    cubo_validos_criticos = cubo.selecionar(
+        ESCMAE_LABEL=['0 anos', '1-3 anos', '4-7 anos'],
+        GRUPO_RACIAL=['Pretos e Pardos', 'Indígenas'],
+        FAIXA_ETARIA=['<=13', '14-18'],
+        GRUPO_ESTCIVIL='Solo',
+    )
 
-# Filtrar gestantes válidas para todos os critérios
-df_validos_criticos = df[
-    (df['ESCMAE_LABEL'].isin(['0 anos', '1-3 anos', '4-7 anos'])) &
-    (df['GRUPO_RACIAL'].isin(['Pretos e Pardos', 'Indígenas'])) &
-    (df['FAIXA_ETARIA'].isin(['<=13', '14-18'])) &
-    (df['GRUPO_ESTCIVIL'] == 'Solo')
-]
+    # Total de gestantes por estado
+    total_uf = cubo.contar('UF')
 
-# Total de gestantes por estado
-total_uf = df['UF'].value_counts().sort_index()
+    # Total com perfil crítico por estado
+    criticos_uf = cubo_validos_criticos.contar('UF')
 
-# Total com perfil crítico por estado
-criticos_uf = df_validos_criticos['UF'].value_counts().sort_index()
+    # Junta e calcula o percentual
+    tabela_criticos = pd.DataFrame({
+        'Total Gestantes': total_uf,
+        'Com Perfil Crítico': criticos_uf
+    }).fillna(0).astype(int)
 
-# Junta e calcula o percentual
-tabela_criticos = pd.DataFrame({
-    'Total Gestantes': total_uf,
-    'Com Perfil Crítico': criticos_uf
-}).fillna(0).astype(int)
+    tabela_criticos['Percentual (%)'] = (tabela_criticos['Com Perfil Crítico'] / tabela_criticos['Total Gestantes'] * 100).round(2)
 
-tabela_criticos['Percentual (%)'] = (tabela_criticos['Com Perfil Crítico'] / tabela_criticos['Total Gestantes'] * 100).round(2)
+    # Ordenar por percentual decrescente
+    tabela_criticos = tabela_criticos.sort_values(by='Percentual (%)', ascending=False)
 
-# Ordenar por percentual decrescente
-tabela_criticos = tabela_criticos.sort_values(by='Percentual (%)', ascending=False)
+    # Exibir
+    print(tabela_criticos)
+    guardar('BL.18 Perfil vulnerável por UF', tabela_criticos)
 
-# Exibir
-print(tabela_criticos)
 
 # -----------------------------
 # BL.19 Estados com maior proporção de gestantes com acompanhamento pré-natal insuficiente ('Nenhum' ou 'Inadequado')
 # -----------------------------
+@pipeline.etapa('BL.19', entradas=['cubo'])
+def prenatal_insuficiente_por_uf(cubo):
+    print("\n📊 [BRASIL] Proporção de gestantes com pré-natal insuficiente ('Nenhum' ou 'Inadequado') por estado:\n")
 
-print("\n📊 [BRASIL] Proporção de gestantes com pré-natal insuficiente ('Nenhum' ou 'Inadequado') por estado:\n")
+    # Filtrar categorias de risco
+    categorias_insuficientes = ['Nenhum', 'Inadequado']
+    cubo_insuficiente = cubo.selecionar(CATEGORIA_PRENATAL=categorias_insuficientes)
 
-# Filtrar categorias de risco
-categorias_insuficientes = ['Nenhum', 'Inadequado']
-df_insuficiente = df[df['CATEGORIA_PRENATAL'].isin(categorias_insuficientes)]
+    # Contagem total por UF
+    total_gestantes_uf = cubo.contar('UF')
 
-# Contagem total por UF
-total_gestantes_uf = df['UF'].value_counts().sort_index()
+    # Contagem de insuficientes por UF
+    insuficientes_uf = cubo_insuficiente.contar('UF')
 
-# Contagem de insuficientes por UF
-insuficientes_uf = df_insuficiente['UF'].value_counts().sort_index()
+    # Monta minha tabela
+    tabela_insuficiencia = pd.DataFrame({
+        'Total Gestantes': total_gestantes_uf,
+        'Pré-natal Insuficiente': insuficientes_uf
+    }).fillna(0).astype(int)
 
-# Monta minha tabela
-tabela_insuficiencia = pd.DataFrame({
-    'Total Gestantes': total_gestantes_uf,
-    'Pré-natal Insuficiente': insuficientes_uf
-}).fillna(0).astype(int)
+    tabela_insuficiencia['Percentual (%)'] = (
+        tabela_insuficiencia['Pré-natal Insuficiente'] / tabela_insuficiencia['Total Gestantes'] * 100
+    ).round(2)
 
-tabela_insuficiencia['Percentual (%)'] = (
-    tabela_insuficiencia['Pré-natal Insuficiente'] / tabela_insuficiencia['Total Gestantes'] * 100
-).round(2)
+    # Ordenar maior/menor percentual
+    tabela_insuficiencia = tabela_insuficiencia.sort_values(by='Percentual (%)', ascending=False)
 
-# Ordenar maior/menor percentual
-tabela_insuficiencia = tabela_insuficiencia.sort_values(by='Percentual (%)', ascending=False)
+    # Exibi
+    print(tabela_insuficiencia)
+    guardar('BL.19 Pré-natal insuficiente por UF', tabela_insuficiencia)
 
-# Exibi
-print(tabela_insuficiencia)
 
 # -----------------------------
 # BL.20 Estados com menor média de consultas de pré-natal por gestante
 # -----------------------------
+@pipeline.etapa('BL.20', entradas=['df'])
+def media_consultas_por_uf(df):
+    print("\n📊 [BRASIL] Média de consultas de pré-natal por gestante – ranking dos estados (menor para maior):\n")
 
-print("\n📊 [BRASIL] Média de consultas de pré-natal por gestante – ranking dos estados (menor para maior):\n")
-
-# Converter para número
-df['CONSPRENAT_NUM'] = pd.to_numeric(df['CONSPRENAT'], errors='coerce')
+    # Calcular média por UF (CONSPRENAT já é numérico)
+    media_consultas_uf = df.groupby('UF')['CONSPRENAT'].mean().round(2)
 
-# Calcular média por UF
-media_consultas_uf = df.groupby('UF')['CONSPRENAT_NUM'].mean().round(2)
+    # Ordenar do menor para o maior
+    media_consultas_uf = media_consultas_uf.sort_values()
 
-# Ordenar do menor para o maior
-media_consultas_uf = media_consultas_uf.sort_values()
+    # Exibi
+    print(media_consultas_uf.rename("Média de Consultas por Gestante"))
+    guardar('BL.20 Média de consultas por UF', media_consultas_uf.rename("Média de Consultas por Gestante"))
 
-# Exibi
-print(media_consultas_uf.rename("Média de Consultas por Gestante"))
 
 # -----------------------------
 # BL.21 Ranking de estados por escore médio de risco das gestantes (ponderado por perfil)
 # -----------------------------
-
-print("\n📊 [BRASIL] Ranking de estados por escore médio de risco das gestantes (ponderado):\n")
-
-# Cria a coluna de pontuação
-def calcular_pontuacao(linha):
-    pontos = 0
-    if linha['ESCMAE_LABEL'] in ['0 anos', '1-3 anos', '4-7 anos']:
-        pontos += 4
-    if linha['FAIXA_ETARIA'] in ['<=13', '14-18']:
-        pontos += 3
-    if linha['GRUPO_RACIAL'] in ['Indígenas', 'Pretos e Pardos']:
-        pontos += 2
-    if linha['GRUPO_ESTCIVIL'] == 'Solo':
-        pontos += 1
-    return pontos
-
-df['PONTUACAO_RISCO'] = df.apply(calcular_pontuacao, axis=1)
-
-# Média por UF
-pontuacao_media_uf = df.groupby('UF')['PONTUACAO_RISCO'].mean().round(2)
-
-# Ordenar do maior/menor
-pontuacao_media_uf = pontuacao_media_uf.sort_values(ascending=False)
-
-# Exibi
-print(pontuacao_media_uf.rename("Pontuação Média de Risco"))
\ No newline at end of file
+@pipeline.etapa('BL.21', entradas=['df'])
+def escore_risco_por_uf(df):
+    print("\n📊 [BRASIL] Ranking de estados por escore médio de risco das gestantes (ponderado):\n")
+
+    # Pontuação de cada gestante: escolaridade até 7 anos = 4, até 18 anos = 3,
+    # pretas/pardas/indígenas = 2, solteira = 1 (pesos em pontuacao_risco.PESOS_PADRAO)
+    marcas_risco = marcar_criterios(df)
+    pontuacao = pontuar(marcas_risco, index=df.index).rename('PONTUACAO_RISCO')
+
+    # Média por UF
+    pontuacao_media_uf = pontuacao.groupby(df['UF']).mean().round(2)
+
+    # Ordenar do maior/menor
+    pontuacao_media_uf = pontuacao_media_uf.sort_values(ascending=False)
+
+    # Exibi
+    print(pontuacao_media_uf.rename("Pontuação Média de Risco"))
+    guardar('BL.21 Escore de risco por UF', pontuacao_media_uf.rename("Pontuação Média de Risco"))
+
+
+# Abas por UF da exportação (--tabelas): contagens de cada estado por faixa etária, grupo racial,
+# escolaridade, estado civil e anomalia x categoria de pré-natal, fatiadas do cubo uma UF por vez
+# (o gerador só monta a aba quando a planilha chega nela)
+DIMENSOES_POR_UF = ['FAIXA_ETARIA', 'GRUPO_RACIAL', 'ESCMAE_LABEL', 'GRUPO_ESTCIVIL', 'ANOMALIA']
+
+
+def tabelas_por_uf(cubo):
+    nascidos = cubo.contar('UF')
+    for uf in nascidos[nascidos > 0].index:
+        yield f'UF {uf}', cubo.selecionar(UF=uf).tabela(DIMENSOES_POR_UF, 'CATEGORIA_PRENATAL')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análise preliminar do SINASC, por blocos (BL.0 a BL.21).")
+    parser.add_argument('--blocos', '--blocks', type=lambda texto: [b.strip() for b in texto.split(',') if b.strip()],
+                        help="blocos a rodar, separados por vírgula (ex.: BL.2,BL.21); BL.2 inclui o BL.2.1. Padrão: todos")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="etapas independentes em paralelo (os gráficos ficam na thread principal)")
+    parser.add_argument('--listar', action='store_true', help="só lista as etapas e suas dependências")
+    parser.add_argument('--tempos', action='store_true', help="mostra o tempo de cada etapa (em stderr)")
+    parser.add_argument('--figuras', metavar='PASTA',
+                        help="grava os gráficos nesta pasta (sem janela, em paralelo) em vez de mostrá-los")
+    parser.add_argument('--formatos', default='png', help="formatos das figuras, separados por vírgula (ex.: png,svg)")
+    parser.add_argument('--processos', type=int, help="processos para gravar as figuras (padrão: número de núcleos)")
+    parser.add_argument('--tabelas', metavar='ARQUIVO',
+                        help="grava as tabelas dos blocos e uma aba por UF (.xlsx, .csv.zip ou .parquet.zip)")
+    argumentos = parser.parse_args()
+
+    if argumentos.listar:
+        pipeline.listar()
+    else:
+        try:
+            pipeline.plano(argumentos.blocos)
+        except KeyError as erro:
+            parser.error(erro.args[0])
+        if argumentos.figuras:
+            # Antes do pipeline abrir threads (o pool de figuras usa fork)
+            try:
+                ativar(argumentos.figuras, argumentos.formatos.split(','), argumentos.processos)
+            except ValueError as erro:
+                parser.error(str(erro))
+        if argumentos.tabelas:
+            try:
+                planilhas.ativar(argumentos.tabelas)
+            except ValueError as erro:
+                parser.error(str(erro))
+        pipeline.executar(argumentos.blocos, workers=argumentos.workers)
+        finalizar()
+        if argumentos.tabelas:
+            # O cubo já está no memo se algum bloco o usou; senão é montado agora
+            if 'cubo' not in pipeline.memo:
+                pipeline.executar(['cubo'])
+            planilhas.finalizar(tabelas_por_uf(pipeline.memo['cubo']))
+        if argumentos.tempos:
+            pipeline.imprimir_tempos()
@@ -0,0 +1,202 @@
+"""
+Benchmark da conversão .dbc/.dbf com arquivos sintéticos (gerador_sintetico.py).
+
+Gera arquivos no formato do SINASC ou do SIM com o número de linhas pedido e roda
+o "converte dbf em csv.py" em vários cenários (CSV em memória, streaming, workers,
+só algumas colunas, Parquet, lendo .dbf ou .dbc). Cada cenário roda em um processo
+novo, então o pico de memória medido é só dele. Para cada um mostra linhas/s, MB/s,
+pico de memória e tamanho da saída.
+
+Com --json o resultado sai em JSON; guardando esse JSON, --comparar aponta os
+cenários que ficaram mais lentos (ou gastaram mais memória) que a referência.
+
+Uso:
+    python benchmark_conversao.py --linhas 1000000 --ufs RJ,SP
+    python benchmark_conversao.py --linhas 200000 --json > referencia.json
+    python benchmark_conversao.py --linhas 200000 --comparar referencia.json   # código 1 se piorar
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from gerador_sintetico import CODIGOS_UF, PREFIXOS
+from leitor_dbc import abrir_dbc, ler_cabecalho_dbf
+
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+CONVERSOR = os.path.join(PASTA_SCRIPTS, 'converte dbf em csv.py')
+GERADOR = os.path.join(PASTA_SCRIPTS, 'gerador_sintetico.py')
+
+# Colunas usadas no cenário de projeção (as mesmas do "SINASC - limpeza.py")
+COLUNAS_PROJECAO = {
+    'sinasc': 'CODMUNRES,CONSPRENAT,IDANOMAL,IDADEMAE,ESCMAE,RACACOR,ESTCIVMAE',
+    'sim': 'CODMUNRES,DTOBITO,CAUSABAS,IDADE,SEXO,RACACOR,OBITOGRAV,OBITOPUERP',
+}
+
+# Piora aceita antes de acusar regressão (20%)
+TOLERANCIA_PADRAO = 0.2
+
+
+def cenarios(sistema, workers):
+    """(nome, entrada 'dbf'/'dbc', argumentos do conversor) de cada cenário medido."""
+    return [
+        ('csv', 'dbf', []),
+        ('csv --lote', 'dbf', ['--lote']),
+        (f'csv --workers {workers}', 'dbf', ['--workers', str(workers)]),
+        ('csv --colunas', 'dbf', ['--lote', '--colunas', COLUNAS_PROJECAO[sistema]]),
+        ('parquet --lote', 'dbf', ['--formato', 'parquet', '--lote']),
+        (f'parquet --workers {workers}', 'dbf', ['--formato', 'parquet', '--lote', '--workers', str(workers)]),
+        ('dbc csv --lote', 'dbc', ['--lote']),
+        (f'dbc parquet --workers {workers}', 'dbc', ['--formato', 'parquet', '--lote', '--workers', str(workers)]),
+    ]
+
+
+def tamanho_mb(caminho):
+    """Tamanho de um arquivo ou da soma dos arquivos de uma pasta, em MB."""
+    if os.path.isfile(caminho):
+        return os.path.getsize(caminho) / 1024 ** 2
+    total = 0
+    for raiz, _, arquivos in os.walk(caminho):
+        total += sum(os.path.getsize(os.path.join(raiz, nome)) for nome in arquivos)
+    return total / 1024 ** 2
+
+
+def _num_registros(caminho):
+    abrir = abrir_dbc if caminho.endswith('.dbc') else (lambda c: open(c, 'rb'))
+    with abrir(caminho) as arquivo:
+        return ler_cabecalho_dbf(arquivo)['num_registros']
+
+
+def preparar_entradas(pasta, sistema, linhas, ufs, ano, semente=0):
+    """Gera (ou reaproveita, se já existirem com o mesmo tamanho) pasta/dbf e pasta/dbc."""
+    pastas = {formato: os.path.join(pasta, formato) for formato in ('dbf', 'dbc')}
+    for uf in ufs:
+        nome = f'{PREFIXOS[sistema]}{uf}{ano}'
+        destinos = {formato: os.path.join(pastas[formato], f'{nome}.{formato}') for formato in pastas}
+        if all(os.path.exists(c) and _num_registros(c) == linhas for c in destinos.values()):
+            continue
+        print(f"Gerando {nome} com {linhas} registros...", file=sys.stderr)
+        # O gerador roda em outro processo: no Linux o pico de memória (ru_maxrss) passa
+        # do processo pai para os filhos, e os cenários mediriam o pico da geração
+        subprocess.run([sys.executable, GERADOR, '--sistema', sistema, '--linhas', str(linhas), '--ufs', uf,
+                        '--ano', str(ano), '--pasta', pasta, '--semente', str(semente)],
+                       check=True, stdout=subprocess.DEVNULL)
+        for formato, destino in destinos.items():
+            os.makedirs(pastas[formato], exist_ok=True)
+            os.replace(os.path.join(pasta, f'{nome}.{formato}'), destino)
+    return pastas
+
+
+def rodar_cenario(nome, entrada, argumentos, pasta_saida):
+    """Roda o conversor em um processo novo e devolve as métricas do cenário."""
+    saida = os.path.join(pasta_saida, 'saida_' + ''.join(c if c.isalnum() else '_' for c in nome))
+    comando = [sys.executable, CONVERSOR, '--entrada', entrada, '--saida', saida,
+               '--sem-confirmacao', '--json', *argumentos]
+    processo = subprocess.run(comando, capture_output=True, text=True, encoding='utf-8')
+    try:
+        if processo.returncode != 0:
+            return {'cenario': nome, 'erro': (processo.stderr.strip().splitlines() or [f'código {processo.returncode}'])[-1]}
+        estatisticas = json.loads(processo.stdout)
+        return {
+            'cenario': nome,
+            'linhas': estatisticas['linhas_lidas'],
+            'segundos': estatisticas['segundos'],
+            'linhas_por_segundo': estatisticas['linhas_por_segundo'],
+            'mb_por_segundo': estatisticas['mb_por_segundo'],
+            'pico_memoria_mb': estatisticas['pico_memoria_mb'],
+            'entrada_mb': round(estatisticas['mb_lidos'], 1),
+            'saida_mb': round(tamanho_mb(saida), 1),
+        }
+    finally:
+        if os.path.isdir(saida):
+            shutil.rmtree(saida, ignore_errors=True)
+        elif os.path.exists(saida):
+            os.remove(saida)
+
+
+def comparar(resultados, referencia, tolerancia=TOLERANCIA_PADRAO):
+    """Lista de avisos para os cenários que pioraram mais que a tolerância."""
+    anteriores = {r['cenario']: r for r in referencia.get('resultados', []) if 'erro' not in r}
+    avisos = []
+    for atual in resultados:
+        anterior = anteriores.get(atual['cenario'])
+        if anterior is None or 'erro' in atual:
+            continue
+        if atual['linhas_por_segundo'] < anterior['linhas_por_segundo'] * (1 - tolerancia):
+            avisos.append(f"{atual['cenario']}: {atual['linhas_por_segundo']:,.0f} linhas/s "
+                          f"(referência {anterior['linhas_por_segundo']:,.0f})")
+        if (atual['pico_memoria_mb'] and anterior['pico_memoria_mb']
+                and atual['pico_memoria_mb'] > anterior['pico_memoria_mb'] * (1 + tolerancia)):
+            avisos.append(f"{atual['cenario']}: pico de {atual['pico_memoria_mb']:.0f} MB "
+                          f"(referência {anterior['pico_memoria_mb']:.0f} MB)")
+    return avisos
+
+
+def imprimir_tabela(resultados, arquivo=sys.stdout):
+    print(f"\n{'cenário':<28}{'linhas/s':>12}{'MB/s':>8}{'pico MB':>9}{'entrada MB':>12}{'saída MB':>10}",
+          file=arquivo)
+    for r in resultados:
+        if 'erro' in r:
+            print(f"{r['cenario']:<28}  ❌ {r['erro']}", file=arquivo)
+            continue
+        pico = f"{r['pico_memoria_mb']:.0f}" if r['pico_memoria_mb'] is not None else '-'
+        print(f"{r['cenario']:<28}{r['linhas_por_segundo']:>12,.0f}{r['mb_por_segundo']:>8.1f}{pico:>9}"
+              f"{r['entrada_mb']:>12.1f}{r['saida_mb']:>10.1f}", file=arquivo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da conversão .dbc/.dbf com arquivos sintéticos")
+    parser.add_argument('--sistema', choices=sorted(PREFIXOS), default='sinasc')
+    parser.add_argument('--linhas', type=int, default=200_000, help="registros por arquivo (padrão 200000)")
+    parser.add_argument('--ufs', default='RJ,SP', help="UFs separadas por vírgula, um arquivo por UF (padrão RJ,SP)")
+    parser.add_argument('--ano', type=int, default=2014)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--pasta', default=None,
+                        help="pasta dos arquivos gerados (mantida entre execuções); padrão: temporária")
+    parser.add_argument('--cenarios', default=None, help="só os cenários cujo nome contém um destes textos (vírgula)")
+    parser.add_argument('--json', action='store_true', help="imprime o resultado em JSON na saída padrão")
+    parser.add_argument('--comparar', default=None, help="JSON de uma execução anterior (--json) para comparar")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                        help=f"piora aceita na comparação (padrão {TOLERANCIA_PADRAO})")
+    args = parser.parse_args()
+
+    ufs = [uf.strip().upper() for uf in args.ufs.split(',') if uf.strip()]
+    desconhecidas = [uf for uf in ufs if uf not in CODIGOS_UF]
+    if desconhecidas:
+        parser.error(f"UFs desconhecidas: {desconhecidas}")
+
+    pasta = args.pasta or tempfile.mkdtemp(prefix='benchmark_dbf_')
+    try:
+        entradas = preparar_entradas(pasta, args.sistema, args.linhas, ufs, args.ano)
+        filtros = [f.strip() for f in args.cenarios.split(',')] if args.cenarios else None
+        resultados = []
+        for nome, entrada, argumentos in cenarios(args.sistema, args.workers):
+            if filtros and not any(f in nome for f in filtros):
+                continue
+            print(f"Rodando cenário: {nome}...", file=sys.stderr)
+            resultados.append(rodar_cenario(nome, entradas[entrada], argumentos, pasta))
+    finally:
+        if args.pasta is None:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    relatorio = {'sistema': args.sistema, 'linhas_por_arquivo': args.linhas, 'ufs': ufs,
+                 'workers': args.workers, 'resultados': resultados}
+    if args.json:
+        imprimir_tabela(resultados, arquivo=sys.stderr)
+        print(json.dumps(relatorio, ensure_ascii=False))
+    else:
+        imprimir_tabela(resultados)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            avisos = comparar(resultados, json.load(arquivo), args.tolerancia)
+        for aviso in avisos:
+            print(f"⚠️ Regressão: {aviso}", file=sys.stderr)
+        if avisos:
+            sys.exit(1)
+    if any('erro' in r for r in resultados):
+        sys.exit(1)
@@ -0,0 +1,141 @@
+"""
+Classificações das colunas da análise de pré-natal (analise_preliminar.py).
+
+O script derivava CATEGORIA_PRENATAL, GRUPO_PRENATAL, FAIXA_ETARIA, GRUPO_RACIAL,
+GRUPO_ESTCIVIL e ESCMAE_LABEL com .apply de funções Python linha a linha (com
+try/except em cada chamada). Aqui cada coluna de origem é fatorada uma vez
+(pd.factorize): as regras de faixa/código rodam vetorizadas só sobre os valores
+distintos (poucas dezenas) e o resultado volta para as linhas por um único take.
+
+Todas as funções devolvem pd.Categorical ordenado, com as categorias na ordem
+natural da classificação (ex.: '<=13' < '14-18' < ... < 'N/I'), então
+value_counts().sort_index(), reindex e os gráficos seguem essa ordem. Recebendo
+uma Series, devolvem uma Series com o mesmo índice.
+
+Uso:
+    df['CATEGORIA_PRENATAL'] = classificar_consultas(df['CONSPRENAT'])
+    df['GRUPO_PRENATAL'] = classificar_grupo_prenatal(df['CATEGORIA_PRENATAL'])
+    classificar_colunas(df)   # as seis colunas de uma vez
+"""
+
+import numpy as np
+import pandas as pd
+
+# Muda quando alguma regra ou categoria muda (invalida o cache de colunas derivadas, ver colunas_derivadas.py)
+VERSAO_CLASSIFICADORES = 1
+
+# Categorias de cada classificação, na ordem em que aparecem nas tabelas
+CATEGORIAS_PRENATAL = ['Nenhum', 'Inadequado', 'Mínimo', 'Adequado', 'Incomum']
+GRUPOS_PRENATAL = ['Ruim', 'Bom', 'Ótimo', 'Ignorado']
+FAIXAS_ETARIAS = ['<=13', '14-18', '19-30', '31-35', '36-40', '>=41', 'N/I']
+GRUPOS_RACIAIS = ['Brancos e Amarelos', 'Pretos e Pardos', 'Indígenas', 'Ignorado']
+GRUPOS_ESTCIVIL = ['Não solo', 'Solo', 'N/I']
+ESCOLARIDADES = ['0 anos', '1-3 anos', '4-7 anos', '8-11 anos', '12+ anos', 'N/I']
+ANOMALIAS = ['Sim', 'Não', 'Ignorado']
+
+# Códigos do SINASC -> rótulo (o que não estiver aqui vira o rótulo de ignorado)
+RACA_POR_CODIGO = {1: 'Brancos e Amarelos', 3: 'Brancos e Amarelos', 2: 'Pretos e Pardos',
+                   4: 'Pretos e Pardos', 5: 'Indígenas'}
+ESTCIVIL_POR_CODIGO = {1: 'Não solo', 2: 'Não solo', 3: 'Solo', 4: 'Solo', 5: 'Solo'}
+ESCOLARIDADE_POR_CODIGO = {1: '0 anos', 2: '1-3 anos', 3: '4-7 anos', 4: '8-11 anos', 5: '12+ anos', 9: 'N/I'}
+ANOMALIA_POR_CODIGO = {1: 'Sim', 2: 'Não'}
+GRUPO_POR_CATEGORIA = {'Nenhum': 'Ruim', 'Inadequado': 'Ruim', 'Mínimo': 'Bom',
+                       'Adequado': 'Ótimo', 'Incomum': 'Ótimo'}
+
+# Limite inferior de cada faixa etária depois da primeira ('<=13')
+_INICIO_FAIXAS = [14, 19, 31, 36, 41]
+
+
+def _numeros(unicos):
+    """Valores distintos como float64 (NaN onde não há número)."""
+    return pd.to_numeric(pd.Series(np.asarray(unicos, dtype=object)), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _classificar(valores, posicoes_dos_unicos, categorias, categoria_na):
+    """Fatora valores, classifica só os distintos e monta o Categorical ordenado."""
+    if not isinstance(valores, (pd.Series, pd.Index, pd.api.extensions.ExtensionArray, np.ndarray)):
+        valores = np.asarray(valores, dtype=object)
+    codigos, unicos = pd.factorize(valores)
+    tabela = np.empty(len(unicos) + 1, dtype=np.int8)
+    tabela[:-1] = posicoes_dos_unicos(unicos)
+    # Código -1 do factorize (NA) cai na última posição da tabela
+    tabela[-1] = categorias.index(categoria_na)
+    rotulos = pd.Categorical.from_codes(tabela[codigos], dtype=pd.CategoricalDtype(categorias, ordered=True))
+    if isinstance(valores, pd.Series):
+        return pd.Series(rotulos, index=valores.index, name=valores.name)
+    return rotulos
+
+
+def _por_codigo(rotulo_por_codigo, categorias, categoria_ignorada):
+    """Regra de classificação por código inteiro (a parte decimal é descartada, como no int())."""
+    def posicoes(unicos):
+        inteiros = np.trunc(_numeros(unicos))
+        return [categorias.index(rotulo_por_codigo.get(codigo, categoria_ignorada)) for codigo in inteiros]
+    return posicoes
+
+
+def _posicoes_consultas(unicos):
+    v = _numeros(unicos)
+    # Sem número (ou fora das faixas, ex.: 5.5) conta como 'Nenhum', igual ao script original
+    return np.select(
+        [(v >= 1) & (v <= 5), (v >= 6) & (v <= 7), (v >= 8) & (v <= 14), v > 14],
+        [1, 2, 3, 4],
+        default=0,
+    )
+
+
+def _posicoes_idade(unicos):
+    idade = np.trunc(_numeros(unicos))
+    posicoes = np.digitize(idade, _INICIO_FAIXAS)
+    return np.where(np.isnan(idade), FAIXAS_ETARIAS.index('N/I'), posicoes)
+
+
+def classificar_consultas(consultas):
+    """CATEGORIA_PRENATAL pelo número de consultas (CONSPRENAT)."""
+    return _classificar(consultas, _posicoes_consultas, CATEGORIAS_PRENATAL, 'Nenhum')
+
+
+def classificar_grupo_prenatal(categorias_prenatal):
+    """GRUPO_PRENATAL (Ruim/Bom/Ótimo) a partir da CATEGORIA_PRENATAL."""
+    def posicoes(unicos):
+        return [GRUPOS_PRENATAL.index(GRUPO_POR_CATEGORIA.get(c, 'Ignorado')) for c in np.asarray(unicos, dtype=object)]
+    return _classificar(categorias_prenatal, posicoes, GRUPOS_PRENATAL, 'Ignorado')
+
+
+def classificar_idade(idades):
+    """FAIXA_ETARIA pela idade da mãe (IDADEMAE); sem idade -> 'N/I'."""
+    return _classificar(idades, _posicoes_idade, FAIXAS_ETARIAS, 'N/I')
+
+
+def agrupar_raca(racacor):
+    """GRUPO_RACIAL pelo código RACACOR; código desconhecido -> 'Ignorado'."""
+    return _classificar(racacor, _por_codigo(RACA_POR_CODIGO, GRUPOS_RACIAIS, 'Ignorado'),
+                        GRUPOS_RACIAIS, 'Ignorado')
+
+
+def agrupar_estado_civil(estcivmae):
+    """GRUPO_ESTCIVIL pelo código ESTCIVMAE; código desconhecido -> 'N/I'."""
+    return _classificar(estcivmae, _por_codigo(ESTCIVIL_POR_CODIGO, GRUPOS_ESTCIVIL, 'N/I'),
+                        GRUPOS_ESTCIVIL, 'N/I')
+
+
+def rotular_escolaridade(escmae):
+    """ESCMAE_LABEL (anos de estudo) pelo código ESCMAE; código desconhecido -> 'N/I'."""
+    return _classificar(escmae, _por_codigo(ESCOLARIDADE_POR_CODIGO, ESCOLARIDADES, 'N/I'),
+                        ESCOLARIDADES, 'N/I')
+
+
+def classificar_anomalia(idanomal):
+    """Anomalia congênita (Sim/Não) pelo código IDANOMAL; 9 ou sem informação -> 'Ignorado'."""
+    return _classificar(idanomal, _por_codigo(ANOMALIA_POR_CODIGO, ANOMALIAS, 'Ignorado'), ANOMALIAS, 'Ignorado')
+
+
+def classificar_colunas(df):
+    """Acrescenta ao df as seis colunas derivadas usadas na análise."""
+    df['CATEGORIA_PRENATAL'] = classificar_consultas(df['CONSPRENAT'])
+    df['GRUPO_PRENATAL'] = classificar_grupo_prenatal(df['CATEGORIA_PRENATAL'])
+    df['FAIXA_ETARIA'] = classificar_idade(df['IDADEMAE'])
+    df['ESCMAE_LABEL'] = rotular_escolaridade(df['ESCMAE'])
+    df['GRUPO_RACIAL'] = agrupar_raca(df['RACACOR'])
+    df['GRUPO_ESTCIVIL'] = agrupar_estado_civil(df['ESTCIVMAE'])
+    return df
@@ -0,0 +1,111 @@
+"""
+Cache em disco do SINASC já com as colunas derivadas da análise de pré-natal.
+
+O analise_preliminar.py e o notebooks/Analise-preliminar.ipynb partiam do CSV
+limpo e, em toda sessão, refaziam as mesmas colunas: CODMUNRES com 7 dígitos (Int32,
+com o dígito verificador do IBGE, ver geografia.codigo_municipio_7),
+UF, REGIAO e as classificações (CATEGORIA_PRENATAL, GRUPO_PRENATAL, FAIXA_ETARIA,
+ESCMAE_LABEL, GRUPO_RACIAL, GRUPO_ESTCIVIL). Aqui o DataFrame enriquecido é
+gravado uma vez em Arrow IPC (Feather v2, sem compressão) em
+<cache>/derivadas/<chave>.arrow, com chave = sha256 do arquivo de origem + versões
+do esquema, dos classificadores e deste módulo. Qualquer mudança no CSV ou nas
+regras gera outra chave, então um cache antigo nunca é usado por engano.
+
+A leitura abre o arquivo com pa.memory_map: as colunas apontam para as páginas do
+arquivo (o sistema carrega só o que for usado), sem interpretar CSV nem refazer as
+classificações. Colunas sem NA e os códigos das categorias são convertidos para o
+pandas sem cópia quando o Arrow permite.
+
+Uso:
+    from colunas_derivadas import ler_derivado
+    df = ler_derivado('nascidos_vivos_limpo')    # CSV tipado + colunas derivadas
+
+Dependências necessárias:
+- pyarrow pip install pyarrow (sem ele as colunas são derivadas a cada execução)
+"""
+
+import os
+
+import pandas as pd
+
+from classificadores import VERSAO_CLASSIFICADORES, classificar_colunas
+from esquemas import VERSAO_ESQUEMA
+from fontes_dados import FONTES, chave_resultado, ler_csv, pasta_cache, resolver
+from geografia import adicionar_geografia, codigo_municipio_7
+
+# Muda quando o conjunto de colunas ou a forma de derivá-las muda (ex.: novas regiões)
+VERSAO_DERIVADAS = 2
+
+# Colunas acrescentadas por derivar_colunas (CODMUNRES é substituída, não acrescentada)
+COLUNAS_DERIVADAS = ['UF', 'REGIAO', 'CATEGORIA_PRENATAL', 'GRUPO_PRENATAL', 'FAIXA_ETARIA',
+                     'ESCMAE_LABEL', 'GRUPO_RACIAL', 'GRUPO_ESTCIVIL']
+
+
+def codmunres_7(codmunres):
+    """CODMUNRES com os 7 dígitos do IBGE (Int32, NA onde o código é inválido)."""
+    sete = codigo_municipio_7(codmunres)
+    return pd.arrays.IntegerArray(sete, sete < 0)
+
+
+def derivar_colunas(df):
+    """Corrige o CODMUNRES e acrescenta UF, REGIAO e as classificações ao df."""
+    df['CODMUNRES'] = codmunres_7(df['CODMUNRES'])
+    adicionar_geografia(df, 'CODMUNRES')
+    classificar_colunas(df)
+    return df
+
+
+def _caminho_derivado(conteudo_hash, parametros):
+    chave = chave_resultado(conteudo_hash, parametros)
+    return os.path.join(pasta_cache(), 'derivadas', f'{chave}.arrow')
+
+
+def _ler_arrow(caminho):
+    if not os.path.exists(caminho):
+        return None
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    try:
+        # O memory map fica vivo enquanto houver colunas apontando para ele
+        tabela = pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+        return tabela.to_pandas(split_blocks=True)
+    except Exception as e:
+        # Arquivo corrompido (ex.: gravação interrompida): deriva de novo
+        print(f"⚠️ Ignorando cache inválido {os.path.basename(caminho)}: {e}")
+        return None
+
+
+def _gravar_arrow(caminho, df):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + f'.{os.getpid()}.tmp'
+    try:
+        tabela = pa.Table.from_pandas(df, preserve_index=True)
+        with pa.OSFile(temporario, 'wb') as destino, pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def ler_derivado(nome='nascidos_vivos_limpo', atualizar=False):
+    """DataFrame do dataset `nome` com as colunas derivadas, do cache Arrow (ou derivado e gravado nele)."""
+    _, conteudo_hash = resolver(nome, atualizar=atualizar)
+    parametros = {
+        'leitura': FONTES[nome].get('leitura', {}),
+        'versao_esquema': VERSAO_ESQUEMA,
+        'versao_classificadores': VERSAO_CLASSIFICADORES,
+        'versao_derivadas': VERSAO_DERIVADAS,
+    }
+    caminho = _caminho_derivado(conteudo_hash, parametros)
+    df = _ler_arrow(caminho)
+    if df is None:
+        df = derivar_colunas(ler_csv(nome))
+        _gravar_arrow(caminho, df)
+    return df
@@ -1,103 +1,529 @@
 """
 Criado na Quinta Feira 03 de Abril de 2025 às 23:00:00
 @author1: Alberto Nagem
-Converte todos os arquivos .dbc do SUS expandidos em .dbf na pasta do script
-para um único arquivo .csv (all.csv).
+Converte todos os arquivos .dbc do SUS (lidos diretamente, sem expandir) e .dbf
+na pasta do script para um único arquivo .csv (all.csv).
+
+Os .dbc são descompactados em fluxo pelo leitor_dbc.py, então não é mais preciso
+expandir os arquivos com o TabWin antes da conversão. A leitura dos registros é
+vetorizada (leitor_dbf.py): o .dbf é mapeado em memória e decodificado coluna a coluna.
+A codificação de cada arquivo (latin-1, cp1252, cp850 do TabWin, utf-8) é detectada
+uma vez pelo cabeçalho/amostra, e o arquivo é lido uma única vez.
 
 Dependências necessárias:
-- pandas (para manipular dados) pip install pandas
-- dbfread (para ler arquivos .dbf expandidos) pip install dbfread
-- keyboard (para usar a tecla ESC) pip install keyboard
+- pandas e numpy (para manipular dados) pip install pandas numpy
+- psutil (opcional, mede o pico de memória no Windows) pip install psutil
+- pyarrow (só para --formato parquet) pip install pyarrow
+
+Uso:
+    python "converte dbf em csv.py"             # carrega tudo e grava no final
+    python "converte dbf em csv.py" --lote 50000 # modo streaming, memória limitada ao lote
+    python "converte dbf em csv.py" --workers 8  # converte 8 arquivos (UFs) em paralelo
+    python "converte dbf em csv.py" --colunas CODMUNRES,CONSPRENAT,IDADEMAE  # só essas colunas
+    python "converte dbf em csv.py" --formato parquet  # all_parquet/UF=RJ/ANO=2014/DNRJ2014.parquet
+                                                       # (incremental: só reconverte o que mudou)
+
+    # Em lote (agendador, cron): sem confirmação, pastas explícitas e estatísticas em JSON
+    python "converte dbf em csv.py" --entrada /dados/sinasc --saida /dados/all_parquet \
+        --formato parquet --workers 8 --lote 100000 --sem-confirmacao --json > estatisticas.json
 """
 
 
+import argparse
+import contextlib
+import io
+import json
 import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-from dbfread import DBF
-import keyboard
 
-def dbf_to_csv():
+from esquemas import esquema_do_arquivo
+from leitor_dbf import TabelaDBF
+
+# Quantidade padrão de registros por lote no modo streaming
+TAMANHO_LOTE_PADRAO = 100_000
+
+
+def pico_memoria_mb():
+    """Pico de memória residente (RSS) do processo em MB, ou None se não for possível medir."""
+    try:
+        import resource
+    except ImportError:
+        # Windows não tem o módulo resource; usa o psutil se estiver instalado
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024 ** 2
+        except (ImportError, AttributeError):
+            return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # No macOS o ru_maxrss vem em bytes, no Linux em KB
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def pico_memoria_filhos_mb():
+    """Maior pico de RSS entre os processos filhos já encerrados (workers), em MB."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+
+def gravar_csv(lotes, destino, filename):
+    """Grava os lotes de um arquivo em um CSV próprio; se falhar, o CSV parcial é apagado."""
+    linhas = 0
+    try:
+        with open(destino, 'w', encoding='utf-8', errors='replace', newline='') as saida:
+            for lote in lotes:
+                lote['ARQUIVO_ORIGEM'] = filename
+                lote.to_csv(saida, index=False, header=linhas == 0)
+                linhas += len(lote)
+    except Exception:
+        if os.path.exists(destino):
+            os.remove(destino)
+        raise
+    if not linhas:
+        os.remove(destino)
+    return linhas
+
+
+def esquema_da_conversao(filename, formato):
+    """Esquema de tipos (esquemas.py) aplicado na leitura: só no Parquet, pelo prefixo do arquivo.
+
+    O all.csv continua com os valores como estão no .dbf (datas ddmmaaaa, códigos com
+    zero à esquerda), que é o que os scripts de leitura do CSV esperam.
+    """
+    return esquema_do_arquivo(filename) if formato == 'parquet' else None
+
+
+def gravar_parquet(lotes, pasta, filename, campos, esquema=None):
+    """Grava os lotes de um arquivo nas partições UF/ano da pasta Parquet.
+
+    Retorna (linhas, partições gravadas). Se falhar, as partições anteriores desse
+    arquivo continuam como estavam.
+    """
+    from saida_parquet import GravadorParquet
+
+    gravador = GravadorParquet(pasta, filename, campos, esquema)
+    linhas = 0
+    try:
+        for lote in lotes:
+            lote['ARQUIVO_ORIGEM'] = filename
+            gravador.gravar(lote)
+            linhas += len(lote)
+    except Exception:
+        gravador.abortar()
+        raise
+    return linhas, gravador.fechar()
+
+
+def estatistica_arquivo(arquivo, status, linhas, tamanho_bytes, segundos, codificacao=None):
+    """Linha das estatísticas de um arquivo: status, linhas, MB e vazão (linhas/s e MB/s)."""
+    mb = tamanho_bytes / 1024 ** 2
+    return {
+        'arquivo': arquivo,
+        'status': status,
+        'linhas': linhas,
+        'mb': round(mb, 3),
+        'segundos': round(segundos, 3),
+        'linhas_por_segundo': round(linhas / segundos, 1) if segundos else None,
+        'mb_por_segundo': round(mb / segundos, 3) if segundos else None,
+        'codificacao': codificacao,
+    }
+
+
+def status_resultado(resultado):
+    if resultado['erro'] is not None:
+        return 'erro'
+    return 'convertido' if resultado['linhas'] else 'vazio'
+
+
+def confirmar_inicio():
+    """Espera o ENTER do usuário (sem laço ocupando a CPU). False se ele cancelar."""
+    print("Por favor Pressione ENTER para continuar ou Ctrl+C para sair...")
+    try:
+        input()
+    except (KeyboardInterrupt, EOFError):
+        print("\ncancelado pelo usuário.")
+        return False
+    return True
 
-    # Mensagem inicial com opção de abortar a conversão dos arquivos
-    print("Todos os arquivos .dbc expandidos para .dbf serão convertidos e reunidos em apenas um arquivo de nome all.csv")
-    print("Por favor Pressione ENTER para continuar ou ESC para sair...")
 
+def converter_arquivo(filepath, destino, tamanho_lote=None, columns=None, formato='csv'):
+    """Converte um único .dbc/.dbf, usado pelos workers.
 
-    while True:
-        if keyboard.is_pressed('esc'):
-            print("\ncancelado pelo usuário.")
-            return
-        if keyboard.is_pressed('enter'):
-            break
+    Com formato='csv' grava um CSV próprio (destino); com formato='parquet' grava as
+    partições UF/ano desse arquivo dentro da pasta destino.
+    Retorna um dicionário com arquivo, linhas, codificacao, particoes e erro (None se deu certo).
+    No Parquet traz também a assinatura (tamanho, mtime, hash) usada no manifesto.
+    """
+    filename = os.path.basename(filepath)
+    dbf = None
+    inicio = time.perf_counter()
+    tamanho_bytes = os.path.getsize(filepath)
+
+    try:
+        # A codificação é resolvida uma vez (cabeçalho/amostra; no .dbc, a amostra são os
+        # primeiros registros da própria leitura) e o arquivo é lido uma única vez
+        esquema = esquema_da_conversao(filename, formato)
+        dbf = TabelaDBF(filepath, char_decode_errors='replace', columns=columns, esquema=esquema)
+        lotes = dbf.lotes(tamanho_lote) if tamanho_lote else [dbf.ler()]
+        if formato == 'parquet':
+            from manifesto import assinatura
+
+            # Assinatura tirada antes da leitura: se o arquivo mudar no meio, a próxima execução o refaz
+            assinatura_arquivo = assinatura(filepath)
+            linhas, particoes = gravar_parquet(lotes, destino, filename, dbf.campos, esquema)
+            return {'arquivo': filename, 'linhas': linhas, 'codificacao': dbf.encoding,
+                    'particoes': particoes, 'assinatura': assinatura_arquivo, 'erro': None,
+                    'bytes': tamanho_bytes, 'segundos': time.perf_counter() - inicio}
+        linhas = gravar_csv(lotes, destino, filename)
+        return {'arquivo': filename, 'linhas': linhas, 'codificacao': dbf.encoding,
+                'particoes': [], 'erro': None, 'bytes': tamanho_bytes, 'segundos': time.perf_counter() - inicio}
+    except Exception as e:
+        encoding = dbf.encoding if dbf is not None else None
+        return {'arquivo': filename, 'linhas': 0, 'codificacao': encoding, 'particoes': [], 'erro': str(e),
+                'bytes': tamanho_bytes, 'segundos': time.perf_counter() - inicio}
+
+
+def juntar_partes(partes, output_path):
+    """Junta os CSVs parciais em output_path, na ordem da lista (ordem dos arquivos de origem).
+
+    Partes com o mesmo cabeçalho da primeira são copiadas byte a byte; se as colunas
+    forem diferentes, a parte é realinhada às colunas da primeira com o pandas.
+    """
+    cabecalho = None
+    with open(output_path, 'wb') as saida:
+        for parte in partes:
+            with open(parte, 'rb') as entrada:
+                primeira_linha = entrada.readline()
+                if cabecalho is None:
+                    cabecalho = primeira_linha
+                    saida.write(primeira_linha)
+                if primeira_linha == cabecalho:
+                    shutil.copyfileobj(entrada, saida, 1024 * 1024)
+                    continue
+
+            colunas = pd.read_csv(io.BytesIO(cabecalho), nrows=0).columns
+            for bloco in pd.read_csv(parte, dtype=str, keep_default_na=False, chunksize=TAMANHO_LOTE_PADRAO):
+                extras = [c for c in bloco.columns if c not in colunas]
+                if extras:
+                    print(f"⚠️ {os.path.basename(parte)}: colunas ignoradas (não existem no primeiro arquivo): {extras}")
+                saida.write(bloco.reindex(columns=colunas).to_csv(index=False, header=False).encode('utf-8'))
+
+
+def dbf_to_csv(tamanho_lote=None, workers=1, columns=None, formato='csv', refazer=False,
+               pasta_entrada=None, output_path=None, confirmar=True):
+    """Converte os .dbc/.dbf da pasta para all.csv (ou para a pasta all_parquet).
+
+    pasta_entrada: pasta com os .dbc/.dbf (padrão: a pasta do script).
+    output_path: all.csv ou pasta Parquet de saída (padrão: all.csv/all_parquet na pasta de entrada).
+    confirmar: pede ENTER antes de começar (só se houver um terminal; em lote, passe False).
+
+    Com tamanho_lote=None todos os arquivos são carregados na memória e unidos no final.
+    Com tamanho_lote=N (modo streaming) os registros são lidos em lotes de N linhas e
+    anexados ao all.csv à medida que são lidos, limitando o pico de memória ao tamanho do lote.
+    Com workers=N > 1 os arquivos são convertidos em paralelo por N processos, cada um
+    gravando um CSV parcial; no final as partes são unidas na ordem alfabética dos arquivos.
+    Com columns=[...] só essas colunas são lidas e decodificadas de cada arquivo.
+    Com formato='parquet' cada arquivo é gravado tipado e compactado em
+    all_parquet/UF=XX/ANO=AAAA/, sem etapa de junção (ver saida_parquet.py). A conversão
+    Parquet é incremental: arquivos sem alterações desde a última execução (pelo
+    manifesto.py) são pulados e só as partições dos novos/alterados são regravadas.
+    Retorna as estatísticas da conversão (linhas/s, MB/s e tempo de cada arquivo), ou
+    None se o usuário cancelar.
+    """
 
     # Script para obter o diretório onde o software está localizado
     # Obs: eu escrevi ele sempre para trabalhar na raiz da pasta dos arquivos
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    script_dir = pasta_entrada or os.path.dirname(os.path.abspath(__file__))
+    if output_path is None:
+        output_path = os.path.join(script_dir, "all_parquet" if formato == 'parquet' else "all.csv")
+    pasta_saida = output_path if formato == 'parquet' else os.path.dirname(os.path.abspath(output_path))
+
+    # Mensagem inicial com opção de abortar a conversão dos arquivos
+    if formato == 'parquet':
+        print(f"Todos os arquivos .dbc e .dbf serão convertidos para Parquet na pasta {output_path}, particionada por UF e ano")
+    else:
+        print(f"Todos os arquivos .dbc e .dbf serão convertidos e reunidos em apenas um arquivo: {output_path}")
 
+    # Só pergunta se houver alguém no terminal; em lote (cron, agendador) segue direto
+    if confirmar and sys.stdin.isatty() and not confirmar_inicio():
+        return None
+    os.makedirs(pasta_saida, exist_ok=True)
 
+    inicio_conversao = time.perf_counter()
     all_dfs = []
     processed_files = 0
     failed_files = 0
+    skipped_files = 0
     total_rows = 0
+    por_arquivo = []
+
+    # No modo streaming o all.csv é aberto uma vez e cada lote é anexado a ele
+    saida = None
+    colunas_saida = None
+    if tamanho_lote:
+        print(f"\nModo streaming: lotes de {tamanho_lote} registros")
+        if workers <= 1 and formato == 'csv':
+            saida = open(output_path, 'w', encoding='utf-8', errors='replace', newline='')
+
+    print(f"\nIniciando conversão de arquivos .dbc/.dbf para {os.path.basename(output_path)}...")
+
+    arquivos = sorted(os.listdir(script_dir))
+    expandidos = {os.path.splitext(f)[0].lower() for f in arquivos if f.lower().endswith('.dbf')}
 
-    print("\nIniciando conversão de arquivos .dbf para all.csv...")
+    entradas = []
+    for filename in arquivos:
+        nome, extensao = os.path.splitext(filename)
+        extensao = extensao.lower()
 
-    encodings_to_try = ['latin-1', 'cp1252', 'iso-8859-1', 'utf-8']
+        # Se o .dbc já foi expandido com o TabWin, usa só o .dbf para não duplicar as linhas
+        if extensao == '.dbc' and nome.lower() in expandidos:
+            print(f"\nIgnorando {filename}: o .dbf expandido já está na pasta")
+            continue
 
-    for filename in sorted(os.listdir(script_dir)):
-        if filename.lower().endswith('.dbf'):
+        if extensao in ('.dbf', '.dbc'):
+            entradas.append(filename)
+
+    if workers > 1 or formato == 'parquet':
+        # No Parquet cada arquivo grava direto nas suas partições; no CSV grava uma parte
+        # temporária que depois é juntada no all.csv
+        manifesto = None
+        pendentes = entradas
+        if formato == 'parquet':
+            from manifesto import Manifesto
+
+            pasta_partes = None
+            os.makedirs(output_path, exist_ok=True)
+            manifesto = Manifesto(output_path)
+            if not refazer:
+                pendentes = []
+                for filename in entradas:
+                    if manifesto.precisa_converter(os.path.join(script_dir, filename), columns):
+                        pendentes.append(filename)
+                    else:
+                        registro = manifesto.arquivos[filename]
+                        print(f"\n⏭️ {filename} sem alterações desde a última conversão. Linhas: {registro['linhas']}")
+                        skipped_files += 1
+                        total_rows += registro['linhas']
+                        por_arquivo.append(estatistica_arquivo(filename, 'pulado', registro['linhas'], 0, 0,
+                                                               registro['codificacao']))
+            destinos = [output_path] * len(pendentes)
+        else:
+            pasta_partes = tempfile.mkdtemp(prefix='.partes_', dir=pasta_saida)
+            destinos = [os.path.join(pasta_partes, f"{i:05d}.csv") for i in range(len(pendentes))]
+        try:
+            argumentos = (
+                [os.path.join(script_dir, f) for f in pendentes],
+                destinos,
+                [tamanho_lote] * len(pendentes),
+                [columns] * len(pendentes),
+                [formato] * len(pendentes),
+            )
+            if workers > 1 and pendentes:
+                print(f"\nConvertendo {len(pendentes)} arquivos com {workers} processos em paralelo...")
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    resultados = list(executor.map(converter_arquivo, *argumentos))
+            else:
+                resultados = list(map(converter_arquivo, *argumentos))
+
+            partes = []
+            for resultado, destino in zip(resultados, destinos):
+                print(f"\nProcessando arquivo: {resultado['arquivo']}")
+                por_arquivo.append(estatistica_arquivo(resultado['arquivo'], status_resultado(resultado),
+                                                       resultado['linhas'], resultado['bytes'],
+                                                       resultado['segundos'], resultado['codificacao']))
+                if resultado['erro'] is not None:
+                    print(f"❌ Erro ao converter! Detalhes: {resultado['erro']}")
+                    failed_files += 1
+                elif resultado['linhas'] == 0:
+                    print(f"⚠️ {resultado['arquivo']} está vazio ou não contém dados válidos")
+                    failed_files += 1
+                else:
+                    print(f"✔️ Convertido com sucesso! Codificação: {resultado['codificacao']}. Linhas: {resultado['linhas']}")
+                    if resultado['particoes']:
+                        particoes = [f"UF={uf}/ANO={ano}" for uf, ano in resultado['particoes']]
+                        print(f"   Partições: {', '.join(particoes[:5])}" + (f" (+{len(particoes) - 5})" if len(particoes) > 5 else ""))
+                    processed_files += 1
+                    total_rows += resultado['linhas']
+                    partes.append(destino)
+                    if manifesto is not None:
+                        manifesto.registrar(resultado['arquivo'], resultado, columns)
+
+            if manifesto is not None:
+                # Tira do all_parquet e do manifesto as origens que saíram da pasta
+                from saida_parquet import remover_origens_ausentes
+                remover_origens_ausentes(output_path, entradas)
+                manifesto.manter_apenas(entradas)
+                manifesto.salvar()
+            elif partes:
+                juntar_partes(partes, output_path)
+            elif os.path.exists(output_path):
+                os.remove(output_path)
+        finally:
+            if pasta_partes is not None:
+                shutil.rmtree(pasta_partes, ignore_errors=True)
+
+    else:
+        for filename in entradas:
             filepath = os.path.join(script_dir, filename)
 
             print(f"\nProcessando arquivo: {filename}")
+            inicio_arquivo_s = time.perf_counter()
+            dbf = None
+            linhas_arquivo = 0
 
             try:
-                for encoding in encodings_to_try:
+                dbf = TabelaDBF(filepath, char_decode_errors='replace', columns=columns,
+                                esquema=esquema_da_conversao(filename, formato))
+
+                if saida is not None:
+                    # Guarda a posição para desfazer o que já foi escrito se o arquivo falhar
+                    inicio_arquivo = saida.tell()
+                    colunas_antes = colunas_saida
                     try:
-                        dbf = DBF(filepath, encoding=encoding, char_decode_errors='replace')
-                        df = pd.DataFrame(iter(dbf))
-
-                        if not df.empty:
-                            df['ARQUIVO_ORIGEM'] = filename
-                            all_dfs.append(df)
-                            processed_files += 1
-                            total_rows += len(df)
-                            print(f"✔️ Convertido com sucesso! Codificação: {encoding}. Linhas: {len(df)}")
-                            break
-                        else:
-                            print(f"⚠️ {filename} está vazio ou não contém dados válidos")
-                            failed_files += 1
-                            break
-
-                    except Exception as e:
-                        if encoding == encodings_to_try[-1]:
-                            print(f"❌ Erro ao converter! Todas as codificações falharam")
-                            failed_files += 1
-                        continue
+                        for lote in dbf.lotes(tamanho_lote):
+                            lote['ARQUIVO_ORIGEM'] = filename
+                            if colunas_saida is None:
+                                colunas_saida = list(lote.columns)
+                            elif list(lote.columns) != colunas_saida:
+                                extras = [c for c in lote.columns if c not in colunas_saida]
+                                if extras and linhas_arquivo == 0:
+                                    print(f"⚠️ Colunas ignoradas (não existem no primeiro arquivo): {extras}")
+                                lote = lote.reindex(columns=colunas_saida)
+                            lote.to_csv(saida, index=False, header=inicio_arquivo == 0 and linhas_arquivo == 0)
+                            linhas_arquivo += len(lote)
+                    except Exception:
+                        saida.seek(inicio_arquivo)
+                        saida.truncate()
+                        colunas_saida = colunas_antes
+                        raise
+                else:
+                    df = dbf.ler()
+                    if not df.empty:
+                        df['ARQUIVO_ORIGEM'] = filename
+                        all_dfs.append(df)
+                        linhas_arquivo = len(df)
+
+                if linhas_arquivo:
+                    processed_files += 1
+                    total_rows += linhas_arquivo
+                    status = 'convertido'
+                    print(f"✔️ Convertido com sucesso! Codificação: {dbf.encoding}. Linhas: {linhas_arquivo}")
+                else:
+                    print(f"⚠️ {filename} está vazio ou não contém dados válidos")
+                    failed_files += 1
+                    status = 'vazio'
 
             except Exception as e:
                 print(f"❌ Erro ao converter! Detalhes: {str(e)}")
                 failed_files += 1
+                status, linhas_arquivo = 'erro', 0
+
+            encoding = dbf.encoding if dbf is not None else None
+            por_arquivo.append(estatistica_arquivo(filename, status, linhas_arquivo, os.path.getsize(filepath),
+                                                   time.perf_counter() - inicio_arquivo_s, encoding))
 
-    if not all_dfs:
-        print("\nNenhum arquivo .dbf foi convertido com sucesso.")
-        return
+    if saida is not None:
+        saida.close()
+        if not processed_files:
+            os.remove(output_path)
 
-    final_df = pd.concat(all_dfs, ignore_index=True)
-    output_path = os.path.join(script_dir, "all.csv")
-    final_df.to_csv(output_path, index=False, encoding='utf-8', errors='replace')
+    if not all_dfs and not processed_files and not skipped_files:
+        print("\nNenhum arquivo .dbc/.dbf foi convertido com sucesso.")
+
+    if all_dfs:
+        final_df = pd.concat(all_dfs, ignore_index=True)
+        final_df.to_csv(output_path, index=False, encoding='utf-8', errors='replace')
+
+    pico = pico_memoria_mb()
+    if workers > 1:
+        # O pico relevante é o do maior worker, não só o do processo principal
+        pico_workers = pico_memoria_filhos_mb()
+        if pico is not None and pico_workers is not None:
+            pico = max(pico, pico_workers)
+
+    segundos = time.perf_counter() - inicio_conversao
+    convertidos = [a for a in por_arquivo if a['status'] != 'pulado']
+    linhas_lidas = sum(a['linhas'] for a in convertidos)
+    mb_lidos = sum(a['mb'] for a in convertidos)
+    estatisticas = {
+        'formato': formato,
+        'entrada': os.path.abspath(script_dir),
+        'saida': os.path.abspath(output_path),
+        'workers': workers,
+        'tamanho_lote': tamanho_lote,
+        'arquivos_convertidos': processed_files,
+        'arquivos_pulados': skipped_files,
+        'arquivos_com_falha': failed_files,
+        'linhas_total': total_rows,
+        'linhas_lidas': linhas_lidas,
+        'mb_lidos': round(mb_lidos, 3),
+        'segundos': round(segundos, 3),
+        'linhas_por_segundo': round(linhas_lidas / segundos, 1) if segundos else None,
+        'mb_por_segundo': round(mb_lidos / segundos, 3) if segundos else None,
+        'pico_memoria_mb': round(pico, 1) if pico is not None else None,
+        'arquivos': por_arquivo,
+    }
+
+    if not processed_files and not skipped_files:
+        return estatisticas
 
     print("\nResumo da conversão:")
     print(f"- Arquivos processados com sucesso: {processed_files}")
+    if formato == 'parquet':
+        print(f"- Arquivos sem alterações (pulados): {skipped_files}")
     print(f"- Arquivos que falharam: {failed_files}")
     print(f"- Linhas totais no arquivo final: {total_rows}")
-    print(f"- Arquivo gerado: {output_path}")
+    print(f"- {'Pasta gerada' if formato == 'parquet' else 'Arquivo gerado'}: {output_path}")
+    print(f"- Pico de memória (RSS): {pico:.1f} MB" if pico is not None else "- Pico de memória (RSS): indisponível")
+    if linhas_lidas and segundos:
+        print(f"- Vazão: {estatisticas['linhas_por_segundo']:,.0f} linhas/s, {estatisticas['mb_por_segundo']:.1f} MB/s"
+              f" em {segundos:.1f} s")
     print("\n✅ Conversão concluída!")
+    return estatisticas
 
 if __name__ == "__main__":
-    # Instruções para o usuário caso não tenha a biblioteca keyboard
-    try:
-        dbf_to_csv()
-    except ImportError:
-        print("\nErro: A biblioteca 'keyboard' não está instalada.")
-        print("Para instalar, execute: pip install keyboard")
-        print("Obs: Dependendo do seu ambientes, pode ser necessário executar como administrador")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Converte os .dbc/.dbf de uma pasta em all.csv ou all_parquet")
+    parser.add_argument('--entrada', default=None,
+                        help="pasta com os .dbc/.dbf (padrão: a pasta deste script)")
+    parser.add_argument('--saida', default=None,
+                        help="arquivo CSV ou pasta Parquet de saída (padrão: all.csv/all_parquet na pasta de entrada)")
+    parser.add_argument('--lote', type=int, nargs='?', const=TAMANHO_LOTE_PADRAO, default=None,
+                        help=f"modo streaming: lê e grava em lotes de N registros (padrão {TAMANHO_LOTE_PADRAO})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="número de processos para converter arquivos em paralelo (padrão 1)")
+    parser.add_argument('--colunas', type=lambda texto: [c.strip() for c in texto.split(',') if c.strip()],
+                        default=None, help="lista de colunas separadas por vírgula (padrão: todas)")
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default='csv',
+                        help="csv: um único all.csv (padrão, compatível com os scripts atuais); "
+                             "parquet: pasta all_parquet particionada por UF e ano")
+    parser.add_argument('--refazer', action='store_true',
+                        help="parquet: ignora o manifesto e converte de novo todos os arquivos")
+    parser.add_argument('--sem-confirmacao', action='store_true',
+                        help="não pede ENTER antes de começar (execução em lote)")
+    parser.add_argument('--json', action='store_true',
+                        help="imprime só as estatísticas em JSON na saída padrão (mensagens vão para a saída de erro)")
+    args = parser.parse_args()
+    if args.entrada is not None and not os.path.isdir(args.entrada):
+        parser.error(f"pasta de entrada não encontrada: {args.entrada}")
+
+    # Com --json a saída padrão fica só com o JSON, para ser lida por outros programas
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        estatisticas = dbf_to_csv(tamanho_lote=args.lote, workers=args.workers, columns=args.colunas,
+                                  formato=args.formato, refazer=args.refazer, pasta_entrada=args.entrada,
+                                  output_path=args.saida, confirmar=not args.sem_confirmacao)
+
+    if estatisticas is None:
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(estatisticas, ensure_ascii=False))
+    if not estatisticas['arquivos_convertidos'] and not estatisticas['arquivos_pulados']:
+        sys.exit(1)
@@ -0,0 +1,153 @@
+"""
+Cubo de contagens para as tabelas cruzadas do analise_preliminar.py.
+
+Cada bloco do script varria o DataFrame inteiro de novo (groupby().size().unstack(),
+value_counts(normalize=True), filtros booleanos e, nos BL.8.1 e BL.16, laços que
+filtravam o df a cada combinação). Como todas essas tabelas são contagens sobre as
+mesmas colunas categóricas, o Cubo conta uma única vez, com np.bincount sobre os
+códigos combinados, quantos nascidos vivos há em cada combinação de
+
+    UF x CATEGORIA_PRENATAL x FAIXA_ETARIA x GRUPO_RACIAL x ESCMAE_LABEL x GRUPO_ESTCIVIL x ANOMALIA
+
+(cerca de 750 mil células, ~6 MB). As tabelas do script saem daí como somas
+(marginais) e fatias desse vetor, sem voltar às linhas.
+
+Cada dimensão tem uma posição extra no fim para os valores ausentes (ex.: UF de um
+município inválido). Ela entra nas somas, mas não aparece nas tabelas, como no
+groupby do pandas.
+
+Uso:
+    cubo = Cubo.do_df(df)
+    cubo.contar('FAIXA_ETARIA')                                    # value_counts()
+    cubo.tabela('UF', 'CATEGORIA_PRENATAL')                        # groupby().size().unstack()
+    cubo.selecionar(ANOMALIA='Sim', UF='SP').contar('CATEGORIA_PRENATAL')
+    cubo.agrupar('CATEGORIA_PRENATAL', 'GRUPO_PRENATAL', GRUPO_POR_CATEGORIA, GRUPOS_PRENATAL)
+"""
+
+import numpy as np
+import pandas as pd
+
+from classificadores import (ANOMALIAS, CATEGORIAS_PRENATAL, ESCOLARIDADES, FAIXAS_ETARIAS, GRUPOS_ESTCIVIL,
+                             GRUPOS_RACIAIS, classificar_anomalia)
+from geografia import CATEGORIAS_SIGLA
+
+# Dimensão -> (categorias, função que deriva a coluna do df; None = usar df[dimensão])
+DIMENSOES = {
+    'UF': (CATEGORIAS_SIGLA, None),
+    'CATEGORIA_PRENATAL': (CATEGORIAS_PRENATAL, None),
+    'FAIXA_ETARIA': (FAIXAS_ETARIAS, None),
+    'GRUPO_RACIAL': (GRUPOS_RACIAIS, None),
+    'ESCMAE_LABEL': (ESCOLARIDADES, None),
+    'GRUPO_ESTCIVIL': (GRUPOS_ESTCIVIL, None),
+    'ANOMALIA': (ANOMALIAS, lambda df: classificar_anomalia(df['IDANOMAL'])),
+}
+
+
+class Cubo:
+    """Contagens densas por combinação de categorias (a última posição de cada eixo é o NA)."""
+
+    def __init__(self, contagens, rotulos):
+        self.contagens = contagens
+        self.rotulos = dict(rotulos)
+        esperado = tuple(len(r) + 1 for r in self.rotulos.values())
+        if contagens.shape != esperado:
+            raise ValueError(f"Formato {contagens.shape} não corresponde às dimensões {esperado}")
+
+    @classmethod
+    def do_df(cls, df, dimensoes=DIMENSOES):
+        """Monta o cubo com uma passada (np.bincount) pelas colunas do df."""
+        tamanhos = [len(categorias) + 1 for categorias, _ in dimensoes.values()]
+        indice = np.zeros(len(df), dtype=np.int64)
+        for (nome, (categorias, derivar)), tamanho in zip(dimensoes.items(), tamanhos):
+            valores = df[nome] if derivar is None else derivar(df)
+            codigos = pd.Categorical(valores, categories=categorias).codes.astype(np.int64)
+            # Código -1 (ausente ou fora das categorias) vai para a posição do NA
+            codigos[codigos < 0] = tamanho - 1
+            indice = indice * tamanho + codigos
+        contagens = np.bincount(indice, minlength=int(np.prod(tamanhos))).reshape(tamanhos)
+        return cls(contagens, {nome: list(categorias) for nome, (categorias, _) in dimensoes.items()})
+
+    @property
+    def dimensoes(self):
+        return list(self.rotulos)
+
+    def _eixo(self, dimensao):
+        try:
+            return self.dimensoes.index(dimensao)
+        except ValueError:
+            raise KeyError(f"Dimensão desconhecida: {dimensao} (disponíveis: {self.dimensoes})") from None
+
+    def total(self):
+        return int(self.contagens.sum())
+
+    def selecionar(self, **filtros):
+        """Cubo só com os rótulos pedidos em cada dimensão (um rótulo ou uma lista), como df[col.isin(...)].
+
+        Os rótulos mantidos continuam na ordem das categorias da dimensão.
+        """
+        contagens, rotulos = self.contagens, dict(self.rotulos)
+        for dimensao, valores in filtros.items():
+            eixo = self._eixo(dimensao)
+            valores = {valores} if isinstance(valores, str) or np.isscalar(valores) else set(valores)
+            desconhecidos = valores - set(rotulos[dimensao])
+            if desconhecidos:
+                raise KeyError(f"Rótulos desconhecidos em {dimensao}: {sorted(desconhecidos)}")
+            posicoes = [i for i, rotulo in enumerate(rotulos[dimensao]) if rotulo in valores]
+            valores = [rotulos[dimensao][i] for i in posicoes]
+            fatia = np.take(contagens, posicoes, axis=eixo)
+            # Mantém a posição do NA (agora vazia) para o cubo continuar com o mesmo formato
+            vazio = np.zeros_like(np.take(contagens, [0], axis=eixo))
+            contagens = np.concatenate([fatia, vazio], axis=eixo)
+            rotulos[dimensao] = valores
+        return Cubo(contagens, rotulos)
+
+    def agrupar(self, dimensao, nova_dimensao, mapa, categorias):
+        """Troca a dimensão por outra agrupando os rótulos (mapa rótulo -> novo; chave None = NA)."""
+        eixo = self._eixo(dimensao)
+        origem = self.rotulos[dimensao] + [None]
+        destino = list(categorias)
+        matriz = np.zeros((len(origem), len(destino) + 1), dtype=self.contagens.dtype)
+        for i, rotulo in enumerate(origem):
+            novo = mapa.get(rotulo)
+            matriz[i, destino.index(novo) if novo in destino else len(destino)] = 1
+        contagens = np.moveaxis(np.tensordot(self.contagens, matriz, axes=([eixo], [0])), -1, eixo)
+        rotulos = {(nova_dimensao if nome == dimensao else nome): (destino if nome == dimensao else r)
+                   for nome, r in self.rotulos.items()}
+        return Cubo(contagens, rotulos)
+
+    def _marginal(self, dimensoes):
+        eixos = [self._eixo(d) for d in dimensoes]
+        outros = tuple(i for i in range(self.contagens.ndim) if i not in eixos)
+        soma = self.contagens.sum(axis=outros)
+        # Eixos na ordem pedida, sem a posição do NA
+        soma = np.transpose(soma, [sorted(eixos).index(eixo) for eixo in eixos])
+        return soma[tuple(slice(0, -1) for _ in dimensoes)]
+
+    def _indice(self, dimensoes):
+        if len(dimensoes) == 1:
+            return pd.Index(self.rotulos[dimensoes[0]], name=dimensoes[0])
+        return pd.MultiIndex.from_product([self.rotulos[d] for d in dimensoes], names=dimensoes)
+
+    def contar(self, *dimensoes):
+        """Contagem por combinação das dimensões (como value_counts/groupby().size())."""
+        soma = self._marginal(dimensoes)
+        return pd.Series(soma.reshape(-1), index=self._indice(dimensoes), name='count')
+
+    def tabela(self, linhas, colunas, remover_vazias=True):
+        """DataFrame linhas x colunas (como groupby([...]).size().unstack()).
+
+        remover_vazias tira as linhas sem nenhum registro, como o groupby faz com
+        as combinações que não aparecem nos dados.
+        """
+        linhas = [linhas] if isinstance(linhas, str) else list(linhas)
+        soma = self._marginal(linhas + [colunas])
+        tabela = pd.DataFrame(soma.reshape(-1, soma.shape[-1]), index=self._indice(linhas),
+                              columns=pd.Index(self.rotulos[colunas], name=colunas))
+        if remover_vazias:
+            tabela = tabela[tabela.sum(axis=1) > 0]
+        return tabela
+
+
+def proporcao_por_linha(tabela):
+    """Fração de cada coluna no total da linha (como groupby(linhas)[coluna].value_counts(normalize=True))."""
+    return tabela.div(tabela.sum(axis=1), axis=0)
@@ -0,0 +1,338 @@
+"""
+Esquema de tipos das colunas do SINASC, do SIM e do Sisprenatal.
+
+Sem esquema o pandas lê os códigos do DATASUS como int64/float64 (8 bytes por valor;
+float quando há campos em branco) ou como texto, e cada script corrigia depois com
+pd.to_numeric(..., errors='coerce') e comparações com .astype(str). Aqui cada coluna
+conhecida tem um tipo compacto, aplicado já na leitura:
+
+- códigos (ESCMAE, RACACOR, IDANOMAL...): Int8, inteiro de 1 byte que aceita NA
+  (campo em branco). O código de "ignorado" (9, 99) continua como valor, e fica
+  registrado em IGNORADOS (ver ignorados_como_na);
+- contagens e medidas: Int8/Int16 (IDADEMAE, CONSPRENAT, PESO...);
+- municípios e estabelecimentos: Int32;
+- textos muito repetidos (CID, versão do sistema, arquivo de origem): category;
+- datas ddmmaaaa: datetime.
+
+Os códigos ficam inteiros (e não category) porque é assim que as análises os usam
+(== 1, isin([1, 2]), mapeamentos por código); o código de um Int8 já ocupa 1 byte,
+o mesmo de uma category. Os rótulos e as faixas vêm dos classificadores.
+
+Uso:
+    df = ler_csv_tipado('nascidos_vivos_limpo.csv', 'sinasc', encoding='latin1')
+    df = aplicar_esquema(df, 'sim')          # DataFrame já lido
+    df = ler_dbf('DNRJ2014.dbf', esquema='sinasc')
+    esquema_do_arquivo('DORJ2019.dbc')       # 'sim' (pelo prefixo do DATASUS)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Muda quando algum tipo muda (invalida os caches de tabelas já lidas)
+# 2: campos em branco das colunas category viram NA (antes, categoria '' na leitura do DBF)
+VERSAO_ESQUEMA = 2
+
+DATA = 'data'
+
+# Colunas comuns aos sistemas
+_MUNICIPIOS = {'CODMUNRES': 'Int32', 'CODMUNNASC': 'Int32', 'CODMUNOCOR': 'Int32', 'CODMUNNATU': 'Int32'}
+
+SINASC = {
+    **_MUNICIPIOS,
+    'CONTADOR': 'Int32',
+    'ORIGEM': 'Int8',
+    'CODESTAB': 'Int32',
+    'LOCNASC': 'Int8',
+    'IDADEMAE': 'Int8',
+    'ESTCIVMAE': 'Int8',
+    'ESCMAE': 'Int8',
+    'CODOCUPMAE': 'Int32',
+    'QTDFILVIVO': 'Int8',
+    'QTDFILMORT': 'Int8',
+    'GESTACAO': 'Int8',
+    'GRAVIDEZ': 'Int8',
+    'PARTO': 'Int8',
+    'CONSULTAS': 'Int8',
+    'DTNASC': DATA,
+    'HORANASC': 'Int16',
+    'SEXO': 'Int8',
+    'APGAR1': 'Int8',
+    'APGAR5': 'Int8',
+    'RACACOR': 'Int8',
+    'PESO': 'Int16',
+    'IDANOMAL': 'Int8',
+    'DTCADASTRO': DATA,
+    'CODANOMAL': 'category',
+    'NUMEROLOTE': 'Int32',
+    'VERSAOSIST': 'category',
+    'DTRECEBIM': DATA,
+    'DIFDATA': 'Int16',
+    'DTRECORIGA': DATA,
+    'NATURALMAE': 'Int16',
+    'CODUFNATU': 'Int8',
+    'ESCMAE2010': 'Int8',
+    'SERIESCMAE': 'Int8',
+    'DTNASCMAE': DATA,
+    'RACACORMAE': 'Int8',
+    'QTDGESTANT': 'Int8',
+    'QTDPARTNOR': 'Int8',
+    'QTDPARTCES': 'Int8',
+    'IDADEPAI': 'Int8',
+    'DTULTMENST': DATA,
+    'SEMAGESTAC': 'Int8',
+    'TPMETESTIM': 'Int8',
+    'CONSPRENAT': 'Int8',
+    'MESPRENAT': 'Int8',
+    'TPAPRESENT': 'Int8',
+    'STTRABPART': 'Int8',
+    'STCESPARTO': 'Int8',
+    'TPNASCASSI': 'Int8',
+    'TPFUNCRESP': 'Int8',
+    'TPDOCRESP': 'Int8',
+    'DTDECLARAC': DATA,
+    'ESCMAEAGR1': 'Int8',
+    'STDNEPIDEM': 'Int8',
+    'STDNNOVA': 'Int8',
+    'CODPAISRES': 'Int16',
+    'TPROBSON': 'Int8',
+    'PARIDADE': 'Int8',
+    'KOTELCHUCK': 'Int8',
+    'ARQUIVO_ORIGEM': 'category',
+}
+
+SIM = {
+    **_MUNICIPIOS,
+    'CONTADOR': 'Int32',
+    'ORIGEM': 'Int8',
+    'TIPOBITO': 'Int8',
+    'DTOBITO': DATA,
+    'HORAOBITO': 'Int16',
+    'NATURAL': 'Int16',
+    'DTNASC': DATA,
+    'IDADE': 'Int16',
+    'SEXO': 'Int8',
+    'RACACOR': 'Int8',
+    'ESTCIV': 'Int8',
+    'ESC': 'Int8',
+    'ESC2010': 'Int8',
+    'SERIESCFAL': 'Int8',
+    'OCUP': 'Int32',
+    'LOCOCOR': 'Int8',
+    'CODESTAB': 'Int32',
+    'IDADEMAE': 'Int8',
+    'ESCMAE': 'Int8',
+    'ESCMAE2010': 'Int8',
+    'SERIESCMAE': 'Int8',
+    'OCUPMAE': 'Int32',
+    'QTDFILVIVO': 'Int8',
+    'QTDFILMORT': 'Int8',
+    'GRAVIDEZ': 'Int8',
+    'SEMAGESTAC': 'Int8',
+    'GESTACAO': 'Int8',
+    'PARTO': 'Int8',
+    'OBITOPARTO': 'Int8',
+    'PESO': 'Int16',
+    'TPMORTEOCO': 'Int8',
+    'OBITOGRAV': 'Int8',
+    'OBITOPUERP': 'Int8',
+    'ASSISTMED': 'Int8',
+    'EXAME': 'Int8',
+    'CIRURGIA': 'Int8',
+    'NECROPSIA': 'Int8',
+    'LINHAA': 'category',
+    'LINHAB': 'category',
+    'LINHAC': 'category',
+    'LINHAD': 'category',
+    'LINHAII': 'category',
+    'CAUSABAS': 'category',
+    'CB_PRE': 'category',
+    'DTATESTADO': DATA,
+    'CIRCOBITO': 'Int8',
+    'ACIDTRAB': 'Int8',
+    'FONTE': 'Int8',
+    'NUMEROLOTE': 'Int32',
+    'TPPOS': 'category',
+    'DTINVESTIG': DATA,
+    'CAUSABAS_O': 'category',
+    'DTCADASTRO': DATA,
+    'ATESTANTE': 'Int8',
+    'STCODIFICA': 'category',
+    'CODIFICADO': 'category',
+    'VERSAOSIST': 'category',
+    'VERSAOSCB': 'category',
+    'FONTEINV': 'Int8',
+    'DTRECEBIM': DATA,
+    'DTRECORIGA': DATA,
+    'CAUSAMAT': 'category',
+    'ESCMAEAGR1': 'Int8',
+    'ESCFALAGR1': 'Int8',
+    'STDOEPIDEM': 'Int8',
+    'STDONOVA': 'Int8',
+    'DIFDATA': 'Int16',
+    'NUDIASOBCO': 'Int16',
+    'NUDIASOBIN': 'Int16',
+    'DTCADINV': DATA,
+    'TPOBITOCOR': 'Int8',
+    'DTCONINV': DATA,
+    'FONTES': 'category',
+    'TPRESGINFO': 'Int8',
+    'TPNIVELINV': 'category',
+    'NUDIASINF': 'Int16',
+    'DTCADINF': DATA,
+    'MORTEPARTO': 'Int8',
+    'DTCONCASO': DATA,
+    'FONTESINF': 'category',
+    'ALTCAUSA': 'Int8',
+    'ARQUIVO_ORIGEM': 'category',
+}
+
+SISPRENATAL = {
+    'CO_UF_IBGE': 'Int8',
+    'QT_CONSULT': 'Int16',
+}
+
+ESQUEMAS = {'sinasc': SINASC, 'sim': SIM, 'sisprenatal': SISPRENATAL}
+
+# Prefixo do nome dos arquivos do DATASUS (DNRJ2014, DOSP2019) -> esquema
+ESQUEMA_DO_PREFIXO = {'DN': 'sinasc', 'DO': 'sim'}
+
+# Código de "ignorado" de cada coluna, conforme o dicionário de dados do DATASUS
+_IGNORADO_9 = ['LOCNASC', 'ESTCIVMAE', 'ESCMAE', 'GESTACAO', 'GRAVIDEZ', 'PARTO', 'CONSULTAS',
+               'IDANOMAL', 'ESCMAE2010', 'TPMETESTIM', 'TPAPRESENT', 'STTRABPART', 'STCESPARTO',
+               'TPNASCASSI', 'KOTELCHUCK']
+_IGNORADO_99 = ['IDADEMAE', 'QTDFILVIVO', 'QTDFILMORT', 'APGAR1', 'APGAR5', 'QTDGESTANT',
+                'QTDPARTNOR', 'QTDPARTCES', 'CONSPRENAT', 'MESPRENAT', 'ESCMAEAGR1']
+IGNORADOS = {
+    'sinasc': {**dict.fromkeys(_IGNORADO_9, 9), **dict.fromkeys(_IGNORADO_99, 99)},
+    'sim': {
+        **dict.fromkeys(['ESTCIV', 'ESC', 'ESC2010', 'LOCOCOR', 'ESCMAE', 'ESCMAE2010', 'GRAVIDEZ',
+                         'GESTACAO', 'PARTO', 'OBITOPARTO', 'TPMORTEOCO', 'OBITOGRAV', 'OBITOPUERP',
+                         'ASSISTMED', 'EXAME', 'CIRURGIA', 'NECROPSIA', 'CIRCOBITO', 'ACIDTRAB',
+                         'FONTE', 'MORTEPARTO'], 9),
+        **dict.fromkeys(['QTDFILVIVO', 'QTDFILMORT', 'IDADEMAE', 'ESCMAEAGR1', 'ESCFALAGR1'], 99),
+    },
+    'sisprenatal': {},
+}
+
+
+def esquema(nome_ou_esquema):
+    """Dicionário coluna -> tipo a partir do nome ('sinasc', 'sim', 'sisprenatal') ou do próprio dict."""
+    if isinstance(nome_ou_esquema, dict):
+        return nome_ou_esquema
+    return ESQUEMAS[nome_ou_esquema]
+
+
+def esquema_do_arquivo(filename):
+    """Nome do esquema pelo prefixo do arquivo do DATASUS ('DNRJ2014.dbc' -> 'sinasc'), ou None."""
+    return ESQUEMA_DO_PREFIXO.get(os.path.basename(filename)[:2].upper())
+
+
+def eh_inteiro(tipo):
+    return isinstance(tipo, str) and tipo.startswith('Int')
+
+
+def dtypes_leitura(nome_ou_esquema, colunas=None):
+    """dtype para o pd.read_csv; o tipo final vem de aplicar_esquema.
+
+    Os inteiros são lidos como float64 e só depois viram Int8/Int16/Int32: o parser
+    do pandas é bem mais lento com os inteiros que aceitam NA (cerca de 0,4 s por
+    coluna a cada milhão de linhas) do que com float64 + conversão vetorizada.
+    As datas chegam como texto (ddmmaaaa, com zero à esquerda).
+    """
+    tipos = {}
+    for coluna, tipo in esquema(nome_ou_esquema).items():
+        if colunas is not None and coluna not in colunas:
+            continue
+        if eh_inteiro(tipo):
+            tipos[coluna] = 'float64'
+        elif tipo == DATA:
+            tipos[coluna] = 'str'
+        else:
+            tipos[coluna] = tipo
+    return tipos
+
+
+def _converter_inteiro(serie, tipo):
+    """Converte para Int8/Int16/Int32; valores não numéricos, fracionários ou fora da faixa viram NA."""
+    if serie.dtype == tipo:
+        return serie
+    numeros = pd.to_numeric(serie, errors='coerce')
+    valores = np.asarray(numeros.astype('Float64').to_numpy(dtype=np.float64, na_value=np.nan))
+    limites = np.iinfo(tipo.lower())
+    validos = (~np.isnan(valores) & (np.mod(valores, 1) == 0)
+               & (valores >= limites.min) & (valores <= limites.max))
+    inteiros = np.zeros(len(valores), dtype=tipo.lower())
+    inteiros[validos] = valores[validos]
+    return pd.Series(pd.arrays.IntegerArray(inteiros, ~validos), index=serie.index, name=serie.name)
+
+
+def _converter_data(serie):
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    if pd.api.types.is_numeric_dtype(serie):
+        # ddmmaaaa lido como número perde o zero à esquerda (1012014 = 01012014)
+        serie = serie.astype('Int64').astype('string').str.zfill(8)
+    return pd.to_datetime(serie, format='%d%m%Y', errors='coerce')
+
+
+def _converter_categoria(serie):
+    # O DBF devolve '' nos campos C em branco e o CSV lê os mesmos campos como NaN:
+    # os dois viram NA, sem uma categoria vazia nas tabelas cruzadas e contagens
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.remove_categories('') if '' in serie.cat.categories else serie
+    return serie.mask(serie == '').astype('category')
+
+
+def aplicar_esquema(df, nome_ou_esquema, copiar=True):
+    """Converte as colunas conhecidas de df para os tipos do esquema (as demais ficam iguais)."""
+    tipos = esquema(nome_ou_esquema)
+    if copiar:
+        df = df.copy()
+    for coluna in df.columns:
+        tipo = tipos.get(coluna)
+        if tipo is None:
+            continue
+        if eh_inteiro(tipo):
+            df[coluna] = _converter_inteiro(df[coluna], tipo)
+        elif tipo == DATA:
+            df[coluna] = _converter_data(df[coluna])
+        elif tipo == 'category':
+            df[coluna] = _converter_categoria(df[coluna])
+        elif str(df[coluna].dtype) != str(tipo):
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+
+def ler_csv_tipado(caminho, nome_ou_esquema, **kwargs):
+    """pd.read_csv já com os tipos do esquema.
+
+    Se algum valor não couber no tipo na leitura (ex.: '6.5' ou lixo em uma coluna de
+    código), essas colunas são lidas sem tipo e convertidas depois, com NA no lugar
+    dos valores inválidos.
+    """
+    tipos = {**dtypes_leitura(nome_ou_esquema), **kwargs.pop('dtype', {})}
+    try:
+        df = pd.read_csv(caminho, dtype=tipos, **kwargs)
+    except (ValueError, TypeError, OverflowError):
+        sem_numeros = {coluna: tipo for coluna, tipo in tipos.items() if tipo != 'float64'}
+        if hasattr(caminho, 'seek'):
+            caminho.seek(0)
+        df = pd.read_csv(caminho, dtype=sem_numeros, **kwargs)
+    return aplicar_esquema(df, nome_ou_esquema, copiar=False)
+
+
+def ignorados_como_na(df, nome_ou_esquema, colunas=None):
+    """Cópia de df com o código de "ignorado" (9, 99) trocado por NA nas colunas do esquema."""
+    ignorados = IGNORADOS[nome_ou_esquema] if isinstance(nome_ou_esquema, str) else nome_ou_esquema
+    df = df.copy()
+    for coluna, codigo in ignorados.items():
+        if coluna in df.columns and (colunas is None or coluna in colunas):
+            df[coluna] = df[coluna].mask(df[coluna] == codigo)
+    return df
+
+
+def memoria_mb(df):
+    """Memória ocupada pelo DataFrame (com o texto das colunas object), em MB."""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
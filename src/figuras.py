@@ -0,0 +1,217 @@
+"""
+Figuras dos scripts gravadas em arquivo (PNG/SVG), sem janela, em paralelo.
+
+Os gráficos do analise_preliminar.py e dos scripts do Sisprenatal terminam em
+plt.show(): num servidor (sem tela) isso trava ou não faz nada, e desenhar umas 30
+figuras em sequência (com mapas de 15x15 polegadas) ocupa boa parte do tempo.
+Aqui plt.show() vira mostrar('nome'):
+
+- modo normal (padrão): é só o plt.show() de sempre;
+- modo arquivo (ativar(pasta) ou PROJETO_FIGURAS=pasta): usa o backend Agg (sem
+  janela), serializa a figura já montada (pickle: só os artistas com os dados
+  agregados, não o DataFrame) e entrega a um pool de processos, que faz o
+  desenho e grava um arquivo por formato. O script segue montando as próximas
+  figuras enquanto as anteriores são gravadas.
+
+No fim (finalizar(), chamado também na saída do programa) espera as gravações e
+atualiza o manifesto da pasta (_manifesto.json): para cada figura, os arquivos
+gravados, tamanho em pixels, tempo de desenho e o script de origem.
+
+Uso:
+    from figuras import mostrar
+    plt.bar(...)
+    mostrar('BL.4.1_faixa_etaria')      # no lugar de plt.show()
+
+    python analise_preliminar.py --figuras saida/figuras --formatos png,svg
+
+Variáveis de ambiente (para os scripts sem linha de comando):
+- PROJETO_FIGURAS           pasta das figuras; ativa o modo arquivo
+- PROJETO_FIGURAS_FORMATOS  formatos separados por vírgula (padrão: png)
+- PROJETO_FIGURAS_PROCESSOS processos do pool (padrão: número de núcleos; 1 = sem pool)
+"""
+
+import atexit
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+FORMATOS_PADRAO = ('png',)
+ARQUIVO_MANIFESTO = '_manifesto.json'
+VERSAO_MANIFESTO = 1
+
+
+class _ModoArquivo:
+    def __init__(self, pasta, formatos, processos):
+        self.pasta = pasta
+        self.formatos = tuple(formatos)
+        self.processos = processos
+        self.executor = None
+        self.figuras = []   # (nome do arquivo, resultado ou futuro)
+
+
+_modo = None
+
+
+def ativar(pasta, formatos=FORMATOS_PADRAO, processos=None, iniciar_pool=True):
+    """Passa a gravar as figuras em `pasta` (backend Agg, sem janela).
+
+    Com iniciar_pool=True os processos são criados já aqui: chame antes de abrir
+    outras threads (o pool usa fork, e o fork só copia a thread atual).
+    """
+    global _modo
+    import matplotlib.pyplot as plt
+    from matplotlib.backend_bases import FigureCanvasBase
+
+    formatos = [f.strip().lower() for f in formatos if f.strip()]
+    desconhecidos = [f for f in formatos if f not in FigureCanvasBase.get_supported_filetypes()]
+    if desconhecidos:
+        raise ValueError(f"Formatos de figura não suportados: {desconhecidos}")
+    finalizar()
+    plt.switch_backend('Agg')
+    os.makedirs(pasta, exist_ok=True)
+    _modo = _ModoArquivo(pasta, formatos, processos or _nucleos())
+    if iniciar_pool:
+        _pool()
+
+
+def _nucleos():
+    # Núcleos que este processo pode usar (em contêineres pode ser menos que os da máquina)
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def ativo():
+    return _modo is not None
+
+
+def _pool():
+    """Pool de processos do modo arquivo (None = desenha no processo principal)."""
+    if _modo.executor is None and _modo.processos > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        # fork: os processos já têm os módulos carregados e não reexecutam o script
+        _modo.executor = ProcessPoolExecutor(_modo.processos, mp_context=multiprocessing.get_context('fork'))
+        # Com fork, o primeiro submit cria todos os processos de uma vez
+        _modo.executor.submit(int).result()
+    return _modo.executor
+
+
+def _nome_arquivo(nome):
+    base = re.sub(r'[^\w.\-]+', '_', nome).strip('_') or 'figura'
+    usados = {arquivo for arquivo, _ in _modo.figuras}
+    arquivo, n = base, 1
+    while arquivo in usados:
+        n += 1
+        arquivo = f'{base}_{n}'
+    return arquivo
+
+
+def _serializavel(fig):
+    """Troca classes locais (não serializáveis) dos artistas pela classe base importável.
+
+    O geopandas desenha os polígonos com uma subclasse de PatchCollection criada
+    dentro da função de plot, que só serve para escolher o desenho da legenda; com a
+    figura montada, a PatchCollection da base desenha igual.
+    """
+    for artista in fig.findobj():
+        if '<locals>' in type(artista).__qualname__:
+            artista.__class__ = next(c for c in type(artista).__mro__ if '<locals>' not in c.__qualname__)
+    return fig
+
+
+def _gravar(fig, caminho_base, formatos):
+    inicio = time.perf_counter()
+    arquivos = []
+    for formato in formatos:
+        caminho = f'{caminho_base}.{formato}'
+        fig.savefig(caminho, format=formato)
+        arquivos.append({'arquivo': os.path.basename(caminho), 'formato': formato, 'bytes': os.path.getsize(caminho)})
+    largura, altura = fig.get_size_inches() * fig.dpi
+    return {'arquivos': arquivos, 'pixels': [int(round(largura)), int(round(altura))],
+            'segundos': round(time.perf_counter() - inicio, 3)}
+
+
+def _gravar_serializada(conteudo, caminho_base, formatos):
+    """Executada nos processos do pool."""
+    matplotlib.use('Agg')
+    return _gravar(pickle.loads(conteudo), caminho_base, formatos)
+
+
+def mostrar(nome, fig=None):
+    """No lugar do plt.show(): mostra a figura ou, no modo arquivo, grava como `nome`.<formato>."""
+    import matplotlib.pyplot as plt
+
+    if _modo is None:
+        plt.show()
+        return
+    fig = fig or plt.gcf()
+    arquivo = _nome_arquivo(nome)
+    caminho_base = os.path.join(_modo.pasta, arquivo)
+    executor = _pool()
+    resultado = None
+    if executor is not None:
+        try:
+            conteudo = pickle.dumps(_serializavel(fig))
+            resultado = executor.submit(_gravar_serializada, conteudo, caminho_base, _modo.formatos)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            pass
+    if resultado is None:
+        # Sem pool (ou figura que não pôde ser serializada): grava aqui mesmo
+        resultado = _gravar(fig, caminho_base, _modo.formatos)
+    _modo.figuras.append((arquivo, resultado))
+    # Como o plt.show(), libera as figuras abertas
+    plt.close('all')
+
+
+def _ler_manifesto(caminho):
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            conteudo = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return conteudo.get('figuras', {}) if conteudo.get('versao') == VERSAO_MANIFESTO else {}
+
+
+def finalizar():
+    """Espera as figuras pendentes, grava o manifesto e encerra o pool; devolve o caminho do manifesto."""
+    global _modo
+    if _modo is None:
+        return None
+    modo, _modo = _modo, None
+    script = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None
+    caminho = os.path.join(modo.pasta, ARQUIVO_MANIFESTO)
+    figuras = _ler_manifesto(caminho)
+    gravadas = 0
+    for ordem, (arquivo, resultado) in enumerate(modo.figuras):
+        registro = {'script': script, 'ordem': ordem, 'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        try:
+            registro.update(resultado.result() if hasattr(resultado, 'result') else resultado)
+            gravadas += 1
+        except Exception as e:
+            registro['erro'] = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Figura {arquivo} não gravada: {registro['erro']}", file=sys.stderr)
+        figuras[arquivo] = registro
+    if modo.executor is not None:
+        modo.executor.shutdown()
+    temporario = caminho + f'.{os.getpid()}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as destino:
+        json.dump({'versao': VERSAO_MANIFESTO, 'figuras': figuras}, destino, ensure_ascii=False, indent=1)
+    os.replace(temporario, caminho)
+    print(f"🖼️ {gravadas} figuras gravadas em {modo.pasta} ({', '.join(modo.formatos)})", file=sys.stderr)
+    return caminho
+
+
+atexit.register(finalizar)
+
+if os.environ.get('PROJETO_FIGURAS'):
+    # O pool é criado na primeira figura: os scripts ainda não abriram threads
+    ativar(os.environ['PROJETO_FIGURAS'],
+           os.environ.get('PROJETO_FIGURAS_FORMATOS', ','.join(FORMATOS_PADRAO)).split(','),
+           int(os.environ.get('PROJETO_FIGURAS_PROCESSOS') or 0) or None,
+           iniciar_pool=False)
@@ -0,0 +1,380 @@
+"""
+Acesso aos datasets do projeto com cache local (em disco) endereçado pelo conteúdo.
+
+Os scripts e notebooks liam os CSVs limpos e a malha de estados direto do GitHub
+(pd.read_csv(url) / gpd.read_file(url)) em toda execução: baixavam tudo de novo e
+não funcionavam sem internet. Aqui cada dataset tem um nome (FONTES) e é resolvido
+nesta ordem:
+
+1. cache local: o último arquivo usado fica em objetos/<sha256>, e o índice guarda
+   qual hash corresponde a cada nome (não usa a rede), junto com o tamanho e a data
+   de modificação da cópia local vista naquele momento;
+2. cópia local (ex.: datasets/nascidos_vivos_limpo.csv), se ela apareceu ou mudou
+   desde o registro no índice (ex.: o CSV foi regenerado pelo script de limpeza), ou
+   se o arquivo é versionado no repositório ('local_primeiro': os mapas do TabWin e a
+   malha de estados), caso em que a URL só é usada quando o arquivo não existe;
+3. download da URL, guardado no cache pelo sha256 do conteúdo;
+4. se a rede falhar: o que estiver no cache ou, sem cache, a cópia local.
+
+Além do arquivo bruto, o resultado já lido e tipado (DataFrame ou GeoDataFrame) é
+guardado em Parquet, com chave = hash do conteúdo + parâmetros de leitura. Os CSVs
+são lidos com os tipos compactos de esquemas.py (Int8 nos códigos, Int32 nos municípios). Nas
+próximas execuções a leitura é só um read_parquet, sem baixar nem reinterpretar o CSV.
+
+Uso:
+    from fontes_dados import ler_csv, ler_geojson
+    df = ler_csv('nascidos_vivos_limpo')
+    gdf = ler_geojson('br_estados', crs=5880)
+
+Variáveis de ambiente:
+- PROJETO_CACHE   pasta do cache (padrão: ~/.cache/projeto_aplicado_mackenzie)
+- PROJETO_OFFLINE com valor 1, nunca acessa a rede (só cache e cópias locais)
+
+Dependências necessárias:
+- pyarrow pip install pyarrow (opcional: sem ele só o arquivo bruto fica em cache)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+
+import pandas as pd
+
+from esquemas import VERSAO_ESQUEMA, ler_csv_tipado
+
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+PASTA_PROJETO = os.path.dirname(PASTA_SCRIPTS)
+PASTA_CACHE_PADRAO = os.path.join(os.path.expanduser('~'), '.cache', 'projeto_aplicado_mackenzie')
+
+# Muda quando o formato do cache de resultados muda (invalida os Parquet antigos)
+VERSAO_CACHE = 1
+TEMPO_LIMITE = 30
+
+_GITHUB = 'https://raw.githubusercontent.com/GrupoMackenzie/ProjetoAplicado01-DataScience-Mackenzie-2025/main'
+
+# Nome -> URL, tipo, parâmetros de leitura e cópias locais (relativas à raiz do projeto);
+# 'local_primeiro' nos arquivos versionados no repositório (a URL fica só como alternativa)
+FONTES = {
+    'nascidos_vivos_limpo': {
+        'url': f'{_GITHUB}/datasets/nascidos_vivos_limpo.csv',
+        'tipo': 'csv',
+        'esquema': 'sinasc',
+        # A primeira coluna é o índice gravado pelo to_csv do "SINASC - limpeza.py"
+        'leitura': {'encoding': 'latin1', 'index_col': 0},
+        'locais': ['datasets/nascidos_vivos_limpo.csv', 'src/nascidos_vivos_limpo.csv'],
+    },
+    'sisprenatal_limpo': {
+        'url': f'{_GITHUB}/datasets/sisprenatal_limpo.csv',
+        'tipo': 'csv',
+        'esquema': 'sisprenatal',
+        'leitura': {'encoding': 'latin1', 'low_memory': False},
+        'locais': ['datasets/sisprenatal_limpo.csv', 'src/sisprenatal_limpo.csv'],
+    },
+    'br_estados': {
+        'url': f'{_GITHUB}/src/br_estados.geojson',
+        'tipo': 'geojson',
+        'locais': ['src/br_estados.geojson', 'notebooks/br_estados.geojson'],
+        'local_primeiro': True,
+    },
+    # Malha do click_that_hood (tem o nome do estado na coluna 'name')
+    'brazil_states': {
+        'url': 'https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson',
+        'tipo': 'geojson',
+        'locais': ['src/brazil-states.geojson', 'notebooks/brazil-states.geojson'],
+    },
+}
+
+# Mapas do TabWin (DATASUS) versionados em src/Tabwin/MAPAS, no formato binário .MAP
+# (lidos por leitor_map.py): 'tabwin_br_uf', 'tabwin_sp_municip'...
+MAPAS_TABWIN = [
+    'br_uf', 'br_ufsigla', 'br_regiao', 'br_micibge', 'br_macsaud', 'br_regsaud', 'br_regmetr',
+    'br_divadm', 'br_semiarido', 'br_frontfaixa', 'br_frontzona',
+    *[f'{uf}_municip' for uf in ('ac', 'al', 'am', 'ap', 'ba', 'ce', 'df', 'es', 'go', 'ma', 'mg', 'ms', 'mt',
+                                 'pa', 'pb', 'pe', 'pi', 'pr', 'rj', 'rn', 'ro', 'rr', 'rs', 'sc', 'se', 'sp', 'to')],
+]
+FONTES.update({
+    f'tabwin_{mapa}': {
+        'url': f'{_GITHUB}/src/Tabwin/MAPAS/{mapa}.MAP',
+        'tipo': 'map',
+        'locais': [f'src/Tabwin/MAPAS/{mapa}.MAP'],
+        'local_primeiro': True,
+    }
+    for mapa in MAPAS_TABWIN
+})
+
+
+class DadosIndisponiveis(RuntimeError):
+    """O dataset não está no cache, não pôde ser baixado e não tem cópia local."""
+
+
+def pasta_cache():
+    return os.environ.get('PROJETO_CACHE') or PASTA_CACHE_PADRAO
+
+
+def _offline():
+    return os.environ.get('PROJETO_OFFLINE', '').strip() not in ('', '0')
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """sha256 do conteúdo do arquivo, lido em blocos."""
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def _caminho_objeto(conteudo_hash):
+    return os.path.join(pasta_cache(), 'objetos', conteudo_hash[:2], conteudo_hash)
+
+
+def _caminho_indice():
+    return os.path.join(pasta_cache(), 'indice.json')
+
+
+def _ler_indice():
+    try:
+        with open(_caminho_indice(), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _gravar_indice(nome, registro):
+    indice = _ler_indice()
+    indice[nome] = registro
+    os.makedirs(pasta_cache(), exist_ok=True)
+    temporario = _caminho_indice() + f'.{os.getpid()}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(indice, arquivo, ensure_ascii=False, indent=1)
+    os.replace(temporario, _caminho_indice())
+
+
+def _guardar_objeto(caminho_temporario):
+    """Move o arquivo baixado para objetos/<sha256> e devolve o hash."""
+    conteudo_hash = hash_arquivo(caminho_temporario)
+    destino = _caminho_objeto(conteudo_hash)
+    if os.path.exists(destino):
+        os.remove(caminho_temporario)
+    else:
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(caminho_temporario, destino)
+    return conteudo_hash
+
+
+def _baixar(url):
+    """Baixa a URL para um temporário dentro do cache e devolve o sha256 do conteúdo."""
+    os.makedirs(pasta_cache(), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta_cache(), suffix='.download')
+    try:
+        with os.fdopen(descritor, 'wb') as destino, urllib.request.urlopen(url, timeout=TEMPO_LIMITE) as resposta:
+            shutil.copyfileobj(resposta, destino, 1024 * 1024)
+        return _guardar_objeto(temporario)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _copia_local(fonte):
+    for relativo in fonte.get('locais', []):
+        caminho = os.path.join(PASTA_PROJETO, relativo)
+        if os.path.isfile(caminho):
+            return caminho
+    return None
+
+
+def _carimbo_local(local):
+    """Caminho, tamanho e data de modificação da cópia local (None se não houver)."""
+    if local is None:
+        return None
+    estado = os.stat(local)
+    return {'origem': os.path.relpath(local, PASTA_PROJETO), 'tamanho': estado.st_size,
+            'mtime_ns': estado.st_mtime_ns}
+
+
+def _importar_local(nome, fonte, local, carimbo):
+    """Copia a cópia local para o cache (pelo sha256) e registra no índice, como se fosse o download."""
+    os.makedirs(pasta_cache(), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=pasta_cache(), suffix='.local')
+    os.close(descritor)
+    shutil.copyfile(local, temporario)
+    conteudo_hash = _guardar_objeto(temporario)
+    _gravar_indice(nome, {'url': fonte['url'], 'hash': conteudo_hash, 'local': carimbo,
+                          'importado_em': time.time()})
+    return _caminho_objeto(conteudo_hash), conteudo_hash
+
+
+def resolver(nome, atualizar=False):
+    """(caminho, sha256) do conteúdo bruto do dataset.
+
+    Usa o cache se houver e a cópia local não tiver mudado desde então; senão usa a
+    cópia local (nova, alterada ou versionada no repositório) ou baixa. atualizar=True
+    ignora o cache: relê a cópia local dos arquivos versionados e baixa os demais (se
+    a rede falhar, fica com o que estiver no cache ou na cópia local).
+    """
+    fonte = FONTES[nome]
+    registro = _ler_indice().get(nome) or {}
+    local = _copia_local(fonte)
+    carimbo = _carimbo_local(local)
+    em_cache = (registro.get('url') == fonte['url'] and 'hash' in registro
+                and os.path.exists(_caminho_objeto(registro['hash'])))
+
+    # Sem cópia local, ou com a mesma do último registro (tamanho e data iguais), o índice vale
+    if em_cache and not atualizar and (local is None or registro.get('local') == carimbo):
+        return _caminho_objeto(registro['hash']), registro['hash']
+
+    if local is not None and (fonte.get('local_primeiro') or registro.get('local') != carimbo):
+        if not fonte.get('local_primeiro'):
+            print(f"ℹ️ {nome}: usando a cópia local {carimbo['origem']} (nova ou alterada desde o último uso)",
+                  file=sys.stderr)
+        return _importar_local(nome, fonte, local, carimbo)
+
+    erro = None
+    if not _offline():
+        try:
+            conteudo_hash = _baixar(fonte['url'])
+            _gravar_indice(nome, {'url': fonte['url'], 'hash': conteudo_hash, 'local': carimbo,
+                                  'baixado_em': time.time()})
+            return _caminho_objeto(conteudo_hash), conteudo_hash
+        except OSError as e:
+            erro = e
+
+    if em_cache:
+        print(f"⚠️ {nome}: usando a cópia em cache ({erro or 'modo offline'})", file=sys.stderr)
+        return _caminho_objeto(registro['hash']), registro['hash']
+
+    if local is not None:
+        print(f"⚠️ {nome}: usando a cópia local {carimbo['origem']} ({erro or 'modo offline'})", file=sys.stderr)
+        return _importar_local(nome, fonte, local, carimbo)
+
+    raise DadosIndisponiveis(f"{nome}: não está no cache, sem cópia local e o download falhou ({erro or 'modo offline'})")
+
+
+def chave_resultado(conteudo_hash, parametros):
+    """Nome do resultado em cache: hash do conteúdo + hash dos parâmetros (e da versão do cache)."""
+    texto = json.dumps({'versao': VERSAO_CACHE, 'parametros': parametros}, sort_keys=True, default=str)
+    return f"{conteudo_hash[:32]}-{hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _caminho_resultado(chave):
+    return os.path.join(pasta_cache(), 'tabelas', f'{chave}.parquet')
+
+
+def _ler_resultado(caminho, geo=False):
+    if not os.path.exists(caminho):
+        return None
+    try:
+        if geo:
+            import geopandas as gpd
+            return gpd.read_parquet(caminho)
+        return pd.read_parquet(caminho)
+    except ImportError:
+        return None
+    except Exception as e:
+        # Resultado corrompido (ex.: gravação interrompida): lê de novo da origem
+        print(f"⚠️ Ignorando cache inválido {os.path.basename(caminho)}: {e}", file=sys.stderr)
+        return None
+
+
+def _gravar_resultado(caminho, tabela):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + f'.{os.getpid()}.tmp'
+    try:
+        tabela.to_parquet(temporario)
+        os.replace(temporario, caminho)
+    except ImportError:
+        # Sem pyarrow: fica só o cache do arquivo bruto
+        pass
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def ler_csv(nome, atualizar=False, **kwargs):
+    """DataFrame do dataset `nome`, com os tipos do esquema; kwargs vão para pd.read_csv."""
+    fonte = FONTES[nome]
+    parametros = {**fonte.get('leitura', {}), **kwargs}
+    caminho, conteudo_hash = resolver(nome, atualizar=atualizar)
+
+    chave = {**parametros, 'esquema': fonte.get('esquema'), 'versao_esquema': VERSAO_ESQUEMA}
+    destino = _caminho_resultado(chave_resultado(conteudo_hash, chave))
+    df = _ler_resultado(destino)
+    if df is None:
+        if fonte.get('esquema'):
+            df = ler_csv_tipado(caminho, fonte['esquema'], **parametros)
+        else:
+            df = pd.read_csv(caminho, **parametros)
+        _gravar_resultado(destino, df)
+    return df
+
+
+def ler_geojson(nome, crs=None, atualizar=False):
+    """GeoDataFrame do dataset `nome`, já reprojetado para crs (ex.: 5880) se pedido."""
+    import geopandas as gpd
+
+    caminho, conteudo_hash = resolver(nome, atualizar=atualizar)
+    destino = _caminho_resultado(chave_resultado(conteudo_hash, {'crs': crs}))
+    gdf = _ler_resultado(destino, geo=True)
+    if gdf is None:
+        gdf = gpd.read_file(caminho)
+        if crs is not None:
+            gdf = gdf.to_crs(crs)
+        _gravar_resultado(destino, gdf)
+    return gdf
+
+
+def resultado_em_cache(nome, parametros, calcular, geo=False, atualizar=False):
+    """Tabela derivada do dataset `nome`, guardada em Parquet pela chave hash do conteúdo + parâmetros.
+
+    calcular() só é chamada quando não há resultado para esse conteúdo e esses
+    parâmetros (ex.: a malha de estados já simplificada, ver malha_uf.py). `nome`
+    pode ser uma lista de datasets (ex.: os 27 mapas de municípios do TabWin): a
+    chave passa a depender do conteúdo de todos.
+    """
+    if isinstance(nome, str):
+        _, conteudo_hash = resolver(nome, atualizar=atualizar)
+    else:
+        hashes = [resolver(n, atualizar=atualizar)[1] for n in nome]
+        conteudo_hash = hashlib.sha256('+'.join(hashes).encode('utf-8')).hexdigest()
+    destino = _caminho_resultado(chave_resultado(conteudo_hash, parametros))
+    tabela = _ler_resultado(destino, geo=geo)
+    if tabela is None:
+        tabela = calcular()
+        _gravar_resultado(destino, tabela)
+    return tabela
+
+
+def limpar_cache():
+    """Apaga todo o cache (arquivos baixados e resultados)."""
+    shutil.rmtree(pasta_cache(), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Baixa (ou atualiza) os datasets no cache local")
+    parser.add_argument('nomes', nargs='*', default=sorted(FONTES), help=f"datasets (padrão: todos): {', '.join(sorted(FONTES))}")
+    parser.add_argument('--atualizar', action='store_true', help="ignora o cache: baixa de novo (ou relê a cópia local dos arquivos versionados)")
+    parser.add_argument('--limpar', action='store_true', help="apaga o cache antes")
+    args = parser.parse_args()
+
+    desconhecidos = [nome for nome in args.nomes if nome not in FONTES]
+    if desconhecidos:
+        parser.error(f"datasets desconhecidos: {desconhecidos}")
+    if args.limpar:
+        limpar_cache()
+    for nome in args.nomes:
+        inicio = time.perf_counter()
+        try:
+            caminho, conteudo_hash = resolver(nome, atualizar=args.atualizar)
+        except DadosIndisponiveis as e:
+            print(f"❌ {e}")
+            continue
+        print(f"✅ {nome}: {conteudo_hash[:12]} {os.path.getsize(caminho) / 1024 ** 2:.1f} MB "
+              f"({time.perf_counter() - inicio:.2f}s)")
@@ -0,0 +1,234 @@
+"""
+Dimensão geográfica do IBGE (UF, região e município) em vetores do NumPy.
+
+Os scripts repetiam o mesmo mapeamento em dicionários diferentes (uf_siglas com chave
+texto, uf_map com chave inteira, codigo_uf_ibge com o nome do estado) e resolviam a
+região com mapear_regiao(), que percorria o dicionário de regiões linha a linha
+(.apply). Aqui cada atributo é um vetor indexado pelo próprio código do IBGE, e
+qualquer derivação código -> rótulo é um único acesso vetorizado (take):
+
+    SIGLA[33] == 'RJ'          REGIAO_DA_UF[33] == 3 (Sudeste)
+    uf_do_municipio([330455, 3304557]) -> [33, 33]
+
+As funções que devolvem rótulos devolvem pd.Categorical (1 byte por linha, com as
+categorias em ordem alfabética, como o groupby/sort_index faziam com o texto).
+
+O código do município tem 6 dígitos no DATASUS e 7 no IBGE: o 7º é um dígito
+verificador (não um "0" fixo), tabelado aqui para os 10**6 códigos de 6 dígitos
+(digitos_verificadores), então a conversão 6 -> 7 também é um único take, em int32:
+
+    codigo_municipio_7([355030, 3550308]) -> [3550308, 3550308]
+
+Uso:
+    df['UF'] = sigla_uf(uf_do_municipio(df['CODMUNRES']))
+    df['REGIAO'] = regiao_do_municipio(df['CODMUNRES'])
+    estados['Estado'] = nome_uf(estados['CO_UF_IBGE'])
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Código IBGE da UF, sigla, nome e código da região (1º dígito do código da UF)
+UFS = [
+    (11, 'RO', 'Rondônia', 1), (12, 'AC', 'Acre', 1), (13, 'AM', 'Amazonas', 1),
+    (14, 'RR', 'Roraima', 1), (15, 'PA', 'Pará', 1), (16, 'AP', 'Amapá', 1), (17, 'TO', 'Tocantins', 1),
+    (21, 'MA', 'Maranhão', 2), (22, 'PI', 'Piauí', 2), (23, 'CE', 'Ceará', 2),
+    (24, 'RN', 'Rio Grande do Norte', 2), (25, 'PB', 'Paraíba', 2), (26, 'PE', 'Pernambuco', 2),
+    (27, 'AL', 'Alagoas', 2), (28, 'SE', 'Sergipe', 2), (29, 'BA', 'Bahia', 2),
+    (31, 'MG', 'Minas Gerais', 3), (32, 'ES', 'Espírito Santo', 3), (33, 'RJ', 'Rio de Janeiro', 3),
+    (35, 'SP', 'São Paulo', 3),
+    (41, 'PR', 'Paraná', 4), (42, 'SC', 'Santa Catarina', 4), (43, 'RS', 'Rio Grande do Sul', 4),
+    (50, 'MS', 'Mato Grosso do Sul', 5), (51, 'MT', 'Mato Grosso', 5), (52, 'GO', 'Goiás', 5),
+    (53, 'DF', 'Distrito Federal', 5),
+]
+REGIOES = {1: 'Norte', 2: 'Nordeste', 3: 'Sudeste', 4: 'Sul', 5: 'Centro-Oeste'}
+REGIAO_IGNORADA = 'Ignorado'
+
+# Dicionários (para quem precisa de um mapeamento simples, ex.: nomes de arquivo)
+SIGLAS = {codigo: sigla for codigo, sigla, _, _ in UFS}
+CODIGOS_UF = {sigla: codigo for codigo, sigla, _, _ in UFS}
+NOMES = {codigo: nome for codigo, _, nome, _ in UFS}
+REGIAO_DA_SIGLA = {sigla: REGIOES[regiao] for _, sigla, _, regiao in UFS}
+
+# Vetores indexados pelo código da UF (0-99); -1 = código que não é UF
+_CODIGOS = np.array([uf[0] for uf in UFS])
+CATEGORIAS_SIGLA = sorted(SIGLAS.values())
+CATEGORIAS_NOME = sorted(NOMES.values())
+CATEGORIAS_REGIAO = sorted([*REGIOES.values(), REGIAO_IGNORADA])
+
+EH_UF = np.zeros(100, dtype=bool)
+EH_UF[_CODIGOS] = True
+SIGLA = np.full(100, None, dtype=object)
+SIGLA[_CODIGOS] = [uf[1] for uf in UFS]
+NOME = np.full(100, None, dtype=object)
+NOME[_CODIGOS] = [uf[2] for uf in UFS]
+REGIAO_DA_UF = np.zeros(100, dtype=np.int8)
+REGIAO_DA_UF[_CODIGOS] = [uf[3] for uf in UFS]
+
+# Posição de cada UF nas categorias (código do Categorical), -1 = NA
+_POSICAO_SIGLA = np.full(100, -1, dtype=np.int8)
+_POSICAO_SIGLA[_CODIGOS] = [CATEGORIAS_SIGLA.index(uf[1]) for uf in UFS]
+_POSICAO_NOME = np.full(100, -1, dtype=np.int8)
+_POSICAO_NOME[_CODIGOS] = [CATEGORIAS_NOME.index(uf[2]) for uf in UFS]
+# Região da UF já como posição nas categorias de região (UF desconhecida -> 'Ignorado')
+_POSICAO_REGIAO = np.full(100, CATEGORIAS_REGIAO.index(REGIAO_IGNORADA), dtype=np.int8)
+_POSICAO_REGIAO[_CODIGOS] = [CATEGORIAS_REGIAO.index(REGIOES[uf[3]]) for uf in UFS]
+
+# Municípios: vetores de 10**6 posições indexados pelo código de 6 dígitos
+TAMANHO_MUNICIPIOS = 10 ** 6
+SEM_MICRORREGIAO = -1
+
+# Dígito verificador do IBGE: pesos 1,2,1,2,1,2 nos 6 dígitos (somando os algarismos dos
+# produtos) e o complemento da soma para a dezena seguinte
+PESOS_DIGITO = np.array([1, 2, 1, 2, 1, 2])
+# Municípios cujo 7º dígito oficial não segue a regra (código de 6 dígitos -> dígito)
+EXCECOES_DIGITO = {220191: 9, 220225: 1, 220198: 8, 261153: 3, 311783: 6, 315213: 1, 430587: 1,
+                   520393: 9, 520396: 2}
+_microrregioes = np.full(TAMANHO_MUNICIPIOS, SEM_MICRORREGIAO, dtype=np.int32)
+
+
+@lru_cache(maxsize=None)
+def uf_dos_municipios():
+    """Vetor município (6 dígitos) -> código da UF (int8), 0 onde o código não é de uma UF."""
+    uf = (np.arange(TAMANHO_MUNICIPIOS) // 10000).astype(np.int8)
+    uf[~EH_UF[uf]] = 0
+    return uf
+
+
+def _inteiros(codigos):
+    """Códigos (Series, lista, texto...) como int64, com -1 onde não há número."""
+    if isinstance(codigos, (pd.Series, pd.Index)) and not pd.api.types.is_numeric_dtype(codigos):
+        codigos = pd.to_numeric(codigos, errors='coerce')
+    if pd.api.types.is_integer_dtype(getattr(codigos, 'dtype', None)):
+        # Int8/Int32 (com NA) ou int do NumPy: sem passar por float
+        valores = pd.array(codigos).to_numpy(dtype=np.int64, na_value=-1)
+        return np.where(valores >= 0, valores, -1)
+    valores = pd.array(codigos, dtype='Float64').to_numpy(dtype=np.float64, na_value=np.nan)
+    validos = np.isfinite(valores) & (valores >= 0)
+    return np.where(validos, valores, -1).astype(np.int64)
+
+
+def codigo_municipio_6(codigos):
+    """Código do município com 6 dígitos (int32); aceita códigos de 6 ou 7 dígitos. -1 = inválido."""
+    valores = _inteiros(codigos)
+    seis = np.where(valores >= TAMANHO_MUNICIPIOS, valores // 10, valores)
+    seis[(valores < 0) | (seis >= TAMANHO_MUNICIPIOS)] = -1
+    return seis.astype(np.int32)
+
+
+@lru_cache(maxsize=None)
+def digitos_verificadores():
+    """Vetor município (6 dígitos) -> dígito verificador do IBGE (int8)."""
+    codigos = np.arange(TAMANHO_MUNICIPIOS, dtype=np.int32)
+    soma = np.zeros(TAMANHO_MUNICIPIOS, dtype=np.int32)
+    for posicao, peso in enumerate(PESOS_DIGITO):
+        produto = (codigos // 10 ** (5 - posicao) % 10) * peso
+        soma += produto // 10 + produto % 10
+    digitos = ((10 - soma % 10) % 10).astype(np.int8)
+    digitos[list(EXCECOES_DIGITO)] = list(EXCECOES_DIGITO.values())
+    return digitos
+
+
+def codigo_municipio_7(codigos):
+    """Código do município com 7 dígitos do IBGE (int32, com o dígito verificador); aceita 6 ou 7 dígitos. -1 = inválido.
+
+    Um código de 7 dígitos tem o dígito refeito a partir dos 6 primeiros (corrige os
+    códigos montados com "0" no fim).
+    """
+    seis = codigo_municipio_6(codigos)
+    sete = seis * 10 + digitos_verificadores()[np.clip(seis, 0, None)]
+    return np.where(seis >= 0, sete, -1).astype(np.int32)
+
+
+def codigo_municipio_7_valido(codigos):
+    """True onde o código tem 7 dígitos e o 7º é o dígito verificador do IBGE."""
+    valores = _inteiros(codigos)
+    return (valores >= TAMANHO_MUNICIPIOS) & (valores < 10 * TAMANHO_MUNICIPIOS) & (codigo_municipio_7(valores) == valores)
+
+
+def uf_do_municipio(codigos):
+    """Código da UF (int8, 0 = desconhecida) de cada município (6 ou 7 dígitos)."""
+    seis = codigo_municipio_6(codigos)
+    uf = uf_dos_municipios()[np.clip(seis, 0, None)]
+    uf[seis < 0] = 0
+    return uf
+
+
+def _codigos_uf(codigos_uf):
+    valores = _inteiros(codigos_uf)
+    valores[(valores < 0) | (valores > 99)] = 0
+    return valores
+
+
+def _categorico(posicoes, categorias, indice=None):
+    rotulos = pd.Categorical.from_codes(posicoes, categories=categorias)
+    if indice is not None:
+        return pd.Series(rotulos, index=indice)
+    return rotulos
+
+
+def _indice(codigos):
+    return codigos.index if isinstance(codigos, pd.Series) else None
+
+
+def sigla_uf(codigos_uf):
+    """Sigla (Categorical) de cada código de UF; NA onde o código não é de uma UF."""
+    return _categorico(_POSICAO_SIGLA[_codigos_uf(codigos_uf)], CATEGORIAS_SIGLA, _indice(codigos_uf))
+
+
+def nome_uf(codigos_uf):
+    """Nome do estado (Categorical) de cada código de UF."""
+    return _categorico(_POSICAO_NOME[_codigos_uf(codigos_uf)], CATEGORIAS_NOME, _indice(codigos_uf))
+
+
+def regiao_uf(codigos_uf):
+    """Região (Categorical) de cada código de UF; 'Ignorado' onde a UF é desconhecida."""
+    return _categorico(_POSICAO_REGIAO[_codigos_uf(codigos_uf)], CATEGORIAS_REGIAO, _indice(codigos_uf))
+
+
+def codigo_uf_da_sigla(siglas):
+    """Código IBGE (int8, 0 = desconhecida) de cada sigla."""
+    categorias = pd.Categorical(siglas, categories=CATEGORIAS_SIGLA)
+    codigos = np.array([CODIGOS_UF[sigla] for sigla in CATEGORIAS_SIGLA] + [0], dtype=np.int8)
+    return codigos[categorias.codes]
+
+
+def _uf_com_indice(codigos):
+    uf = uf_do_municipio(codigos)
+    indice = _indice(codigos)
+    return uf if indice is None else pd.Series(uf, index=indice)
+
+
+def sigla_do_municipio(codigos):
+    """Sigla da UF (Categorical) de cada município (6 ou 7 dígitos)."""
+    return sigla_uf(_uf_com_indice(codigos))
+
+
+def regiao_do_municipio(codigos):
+    """Região (Categorical) de cada município (6 ou 7 dígitos)."""
+    return regiao_uf(_uf_com_indice(codigos))
+
+
+def registrar_microrregioes(municipios, microrregioes):
+    """Preenche o vetor município -> microrregião do IBGE (ex.: a partir de uma tabela do IBGE)."""
+    seis = codigo_municipio_6(municipios)
+    validos = seis >= 0
+    _microrregioes[seis[validos]] = np.asarray(microrregioes, dtype=np.int32)[validos]
+
+
+def microrregiao_do_municipio(codigos):
+    """Código da microrregião (Int32, NA se não registrada) de cada município."""
+    seis = codigo_municipio_6(codigos)
+    micro = _microrregioes[np.clip(seis, 0, None)]
+    vazio = (seis < 0) | (micro == SEM_MICRORREGIAO)
+    return pd.arrays.IntegerArray(np.where(vazio, 0, micro).astype(np.int32), vazio)
+
+
+def adicionar_geografia(df, coluna_municipio='CODMUNRES'):
+    """Acrescenta UF e REGIAO (Categorical) ao df a partir do município de residência."""
+    uf = _uf_com_indice(df[coluna_municipio])
+    df['UF'] = sigla_uf(uf)
+    df['REGIAO'] = regiao_uf(uf)
+    return df
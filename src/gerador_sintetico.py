@@ -0,0 +1,562 @@
+"""
+Gerador de arquivos .dbf e .dbc sintéticos no formato do SINASC e do SIM.
+
+Serve para medir o desempenho da conversão (benchmark_conversao.py) sem precisar
+baixar os arquivos reais do DATASUS, que chegam a vários GB por ano. Os campos
+seguem o layout dos arquivos DN (nascidos vivos, usados em "SINASC - limpeza.py")
+e DO (óbitos, colunas de datasets/obtos maternos.csv): todos do tipo C, com os
+códigos, datas (ddmmaaaa), municípios e valores "9 = ignorado" nas proporções
+típicas. Os valores são aleatórios, mas reproduzíveis pela semente.
+
+O .dbc é gravado com um compressor implode (PKWare) simples e vetorizado: cada
+registro é comparado com o anterior e os trechos iguais viram cópias, o resto
+vai como literal. Comprime menos que o compressor do DATASUS (os valores aleatórios
+se repetem menos que os reais), mas exercita os mesmos caminhos do descompactador.
+
+Uso:
+    python gerador_sintetico.py --sistema sinasc --linhas 1000000 --ufs RJ,SP --ano 2014 --pasta bench
+    # bench/DNRJ2014.dbf, bench/DNRJ2014.dbc, bench/DNSP2014.dbf, bench/DNSP2014.dbc
+
+Dependências necessárias:
+- numpy pip install numpy
+"""
+
+import argparse
+import datetime
+import os
+import struct
+
+import numpy as np
+
+from geografia import CODIGOS_UF
+from leitor_dbc import _BASE, _DISTLEN, _EXTRA, _LENLEN, _construir_tabela
+
+# Registros gerados (e comprimidos) por vez, para limitar a memória
+REGISTROS_POR_BLOCO = 50_000
+
+# Prefixo do nome do arquivo no DATASUS
+PREFIXOS = {'sinasc': 'DN', 'sim': 'DO'}
+
+
+# ---------------------------------------------------------------------------
+# Geradores de valores. Cada um recebe (rng, n, contexto) e devolve um array de
+# bytes (dtype S) com n valores; contexto traz a UF e o ano do arquivo.
+# ---------------------------------------------------------------------------
+
+def _digitos(numeros, largura):
+    """Inteiros não negativos como texto de largura fixa, com zeros à esquerda (S<largura>)."""
+    potencias = 10 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    matriz = (np.asarray(numeros, dtype=np.int64)[:, None] // potencias % 10 + 48).astype(np.uint8)
+    return np.ascontiguousarray(matriz).view(f'S{largura}').ravel()
+
+
+def _com_brancos(valores, rng, branco):
+    if branco:
+        valores[rng.random(len(valores)) < branco] = b''
+    return valores
+
+
+def codigo(valores, pesos=None, branco=0.0):
+    """Código sorteado de uma lista (pesos opcionais, somando 1)."""
+    opcoes = np.array(valores, dtype='S')
+
+    def gerar(rng, n, contexto):
+        return _com_brancos(rng.choice(opcoes, size=n, p=pesos), rng, branco)
+    return gerar
+
+
+def inteiro(minimo, maximo, largura, ignorado=None, p_ignorado=0.0, branco=0.0):
+    """Inteiro com zeros à esquerda; p_ignorado dos valores recebem o código de ignorado."""
+    def gerar(rng, n, contexto):
+        numeros = rng.integers(minimo, maximo + 1, size=n)
+        if ignorado is not None and p_ignorado:
+            numeros[rng.random(n) < p_ignorado] = ignorado
+        valores = _digitos(numeros, largura)
+        return _com_brancos(valores, rng, branco)
+    return gerar
+
+
+def data(deslocamento_anos=0, branco=0.0):
+    """Data ddmmaaaa dentro do ano do arquivo (deslocado, ex.: -30 para nascimento da mãe)."""
+    def gerar(rng, n, contexto):
+        inicio = np.datetime64(f"{contexto['ano'] + deslocamento_anos}-01-01")
+        dias = inicio + rng.integers(0, 365, size=n).astype('timedelta64[D]')
+        texto = np.datetime_as_string(dias, unit='D')  # aaaa-mm-dd
+        ddmmaaaa = np.char.add(np.char.add(_fatia(texto, 8, 10), _fatia(texto, 5, 7)), _fatia(texto, 0, 4))
+        return _com_brancos(ddmmaaaa.astype('S8'), rng, branco)
+    return gerar
+
+
+def _fatia(texto, inicio, fim):
+    return texto.astype('U10').view('U1').reshape(len(texto), 10)[:, inicio:fim].copy().view(f'U{fim - inicio}').ravel()
+
+
+def municipio(p_outra_uf=0.03, branco=0.0):
+    """Código de município (6 dígitos) da UF do arquivo, com uma parte de outras UFs."""
+    def gerar(rng, n, contexto):
+        uf = np.full(n, CODIGOS_UF[contexto['uf']])
+        outras = rng.random(n) < p_outra_uf
+        uf[outras] = rng.choice(list(CODIGOS_UF.values()), size=int(outras.sum()))
+        # Poucos municípios concentram a maior parte dos eventos (distribuição de Zipf)
+        sufixo = np.minimum(rng.zipf(1.3, size=n), 999) * 10
+        return _com_brancos((uf * 10000 + sufixo).astype('S6'), rng, branco)
+    return gerar
+
+
+def cid(branco=0.0):
+    """Código CID-10 de 4 posições (letra + 3 dígitos)."""
+    letras = np.array(list('ABCDEFGIJKNOPRQ'), dtype='S1')
+
+    def gerar(rng, n, contexto):
+        numeros = _digitos(rng.integers(0, 1000, size=n), 3)
+        return _com_brancos(np.char.add(rng.choice(letras, size=n), numeros), rng, branco)
+    return gerar
+
+
+def linha_atestado(branco=0.5):
+    """Linha do atestado de óbito: '*' + CID (ex.: *J189), às vezes duas causas."""
+    gerar_cid = cid()
+
+    def gerar(rng, n, contexto):
+        valores = np.char.add(b'*', gerar_cid(rng, n, contexto))
+        duas = rng.random(n) < 0.2
+        valores[duas] = np.char.add(np.char.add(valores[duas], b'*'), gerar_cid(rng, int(duas.sum()), contexto))
+        return _com_brancos(valores, rng, branco)
+    return gerar
+
+
+def hora(branco=0.0):
+    """Hora hhmm."""
+    def gerar(rng, n, contexto):
+        numeros = rng.integers(0, 24, size=n) * 100 + rng.integers(0, 60, size=n)
+        return _com_brancos(_digitos(numeros, 4), rng, branco)
+    return gerar
+
+
+def contador():
+    def gerar(rng, n, contexto):
+        inicio = contexto.get('contador', 1)
+        contexto['contador'] = inicio + n
+        return np.arange(inicio, inicio + n).astype('S8')
+    return gerar
+
+
+# Layout do SINASC (arquivos DN): (nome, largura, gerador)
+LAYOUT_SINASC = [
+    ('ORIGEM', 1, codigo(['1'])),
+    ('CODESTAB', 7, inteiro(1000000, 9999999, 7, branco=0.02)),
+    ('CODMUNNASC', 6, municipio(0.01)),
+    ('LOCNASC', 1, codigo(['1', '2', '3', '4', '9'], [0.97, 0.01, 0.015, 0.004, 0.001])),
+    ('IDADEMAE', 2, inteiro(12, 48, 2, ignorado=99, p_ignorado=0.001)),
+    ('ESTCIVMAE', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.3, 0.3, 0.01, 0.02, 0.35, 0.02])),
+    ('ESCMAE', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.01, 0.06, 0.22, 0.52, 0.17, 0.02])),
+    ('CODOCUPMAE', 6, inteiro(100000, 999999, 6, branco=0.3)),
+    ('QTDFILVIVO', 2, inteiro(0, 6, 2, ignorado=99, p_ignorado=0.05)),
+    ('QTDFILMORT', 2, inteiro(0, 2, 2, ignorado=99, p_ignorado=0.08)),
+    ('CODMUNRES', 6, municipio()),
+    ('GESTACAO', 1, codigo(['1', '2', '3', '4', '5', '6', '9'], [0.002, 0.005, 0.01, 0.08, 0.87, 0.013, 0.02])),
+    ('GRAVIDEZ', 1, codigo(['1', '2', '3', '9'], [0.977, 0.02, 0.001, 0.002])),
+    ('PARTO', 1, codigo(['1', '2', '9'], [0.44, 0.559, 0.001])),
+    ('CONSULTAS', 1, codigo(['1', '2', '3', '4', '9'], [0.02, 0.07, 0.23, 0.66, 0.02])),
+    ('DTNASC', 8, data()),
+    ('HORANASC', 4, hora()),
+    ('SEXO', 1, codigo(['1', '2', '0'], [0.51, 0.489, 0.001])),
+    ('APGAR1', 2, inteiro(0, 10, 2, ignorado=99, p_ignorado=0.01)),
+    ('APGAR5', 2, inteiro(0, 10, 2, ignorado=99, p_ignorado=0.01)),
+    ('RACACOR', 1, codigo(['1', '2', '3', '4', '5'], [0.35, 0.07, 0.005, 0.57, 0.005], branco=0.03)),
+    ('PESO', 4, inteiro(500, 5000, 4)),
+    ('IDANOMAL', 1, codigo(['1', '2', '9'], [0.008, 0.97, 0.022])),
+    ('DTCADASTRO', 8, data()),
+    ('CODANOMAL', 8, codigo(['Q690', 'Q660', 'Q549', 'Q909'], branco=0.99)),
+    ('NUMEROLOTE', 8, inteiro(20140001, 20149999, 8)),
+    ('VERSAOSIST', 7, codigo(['3.2.01', '3.2.00'])),
+    ('DTRECEBIM', 8, data()),
+    ('DIFDATA', 3, inteiro(0, 400, 3)),
+    ('DTRECORIGA', 8, data(branco=0.6)),
+    ('NATURALMAE', 3, inteiro(800, 853, 3)),
+    ('CODMUNNATU', 6, municipio(0.2)),
+    ('CODUFNATU', 2, codigo([str(c) for c in CODIGOS_UF.values()])),
+    ('ESCMAE2010', 1, codigo(['0', '1', '2', '3', '4', '5', '9'], [0.005, 0.04, 0.2, 0.2, 0.4, 0.14, 0.015])),
+    ('SERIESCMAE', 1, inteiro(1, 8, 1, branco=0.6)),
+    ('DTNASCMAE', 8, data(-27)),
+    ('RACACORMAE', 1, codigo(['1', '2', '3', '4', '5'], [0.35, 0.08, 0.005, 0.56, 0.005], branco=0.05)),
+    ('QTDGESTANT', 2, inteiro(0, 8, 2, ignorado=99, p_ignorado=0.03)),
+    ('QTDPARTNOR', 2, inteiro(0, 6, 2, ignorado=99, p_ignorado=0.05)),
+    ('QTDPARTCES', 2, inteiro(0, 4, 2, ignorado=99, p_ignorado=0.05)),
+    ('IDADEPAI', 2, inteiro(16, 60, 2, branco=0.7)),
+    ('DTULTMENST', 8, data(-1, branco=0.3)),
+    ('SEMAGESTAC', 2, inteiro(22, 42, 2, branco=0.02)),
+    ('TPMETESTIM', 1, codigo(['1', '2', '9'], [0.7, 0.25, 0.05])),
+    ('CONSPRENAT', 2, inteiro(0, 15, 2, ignorado=99, p_ignorado=0.04)),
+    ('MESPRENAT', 2, inteiro(1, 9, 2, ignorado=99, p_ignorado=0.06)),
+    ('TPAPRESENT', 1, codigo(['1', '2', '3', '9'], [0.94, 0.04, 0.005, 0.015])),
+    ('STTRABPART', 1, codigo(['1', '2', '3', '9'], [0.3, 0.25, 0.4, 0.05])),
+    ('STCESPARTO', 1, codigo(['1', '2', '3', '9'], [0.2, 0.25, 0.5, 0.05])),
+    ('TPNASCASSI', 1, codigo(['1', '2', '3', '4', '9'], [0.7, 0.25, 0.03, 0.01, 0.01])),
+    ('TPFUNCRESP', 1, codigo(['1', '2', '3', '4', '5'], [0.6, 0.1, 0.05, 0.2, 0.05])),
+    ('TPDOCRESP', 1, codigo(['1', '2', '3', '4', '5'], [0.1, 0.05, 0.05, 0.75, 0.05])),
+    ('DTDECLARAC', 8, data()),
+    ('ESCMAEAGR1', 2, inteiro(0, 12, 2, ignorado=99, p_ignorado=0.015)),
+    ('STDNEPIDEM', 1, codigo(['0', '1'], [0.9, 0.1])),
+    ('STDNNOVA', 1, codigo(['1'])),
+    ('CODPAISRES', 3, codigo(['1'])),
+    ('TPROBSON', 2, inteiro(1, 11, 2)),
+    ('PARIDADE', 1, codigo(['0', '1'], [0.4, 0.6])),
+    ('KOTELCHUCK', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.03, 0.08, 0.12, 0.45, 0.3, 0.02])),
+    ('CONTADOR', 8, contador()),
+]
+
+# Layout do SIM (arquivos DO), com as colunas de datasets/obtos maternos.csv
+LAYOUT_SIM = [
+    ('CONTADOR', 8, contador()),
+    ('ORIGEM', 1, codigo(['1'])),
+    ('TIPOBITO', 1, codigo(['1', '2'], [0.03, 0.97])),
+    ('DTOBITO', 8, data()),
+    ('HORAOBITO', 4, hora(branco=0.05)),
+    ('NATURAL', 3, inteiro(800, 853, 3, branco=0.05)),
+    ('CODMUNNATU', 6, municipio(0.2, branco=0.1)),
+    ('DTNASC', 8, data(-65, branco=0.01)),
+    ('IDADE', 3, inteiro(400, 499, 3)),
+    ('SEXO', 1, codigo(['1', '2', '0'], [0.55, 0.449, 0.001])),
+    ('RACACOR', 1, codigo(['1', '2', '3', '4', '5'], [0.45, 0.09, 0.005, 0.45, 0.005], branco=0.03)),
+    ('ESTCIV', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.3, 0.35, 0.15, 0.08, 0.05, 0.07])),
+    ('ESC', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.15, 0.3, 0.2, 0.15, 0.08, 0.12])),
+    ('ESC2010', 1, codigo(['0', '1', '2', '3', '4', '5', '9'], [0.1, 0.3, 0.15, 0.15, 0.15, 0.05, 0.1])),
+    ('SERIESCFAL', 1, inteiro(1, 8, 1, branco=0.6)),
+    ('OCUP', 6, inteiro(100000, 999999, 6, branco=0.3)),
+    ('CODMUNRES', 6, municipio()),
+    ('LOCOCOR', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.65, 0.05, 0.2, 0.05, 0.04, 0.01])),
+    ('CODESTAB', 7, inteiro(1000000, 9999999, 7, branco=0.35)),
+    ('ESTABDESCR', 60, codigo([''])),
+    ('CODMUNOCOR', 6, municipio(0.02)),
+    ('IDADEMAE', 2, inteiro(12, 48, 2, branco=0.97)),
+    ('ESCMAE', 1, codigo(['1', '2', '3', '4', '5', '9'], branco=0.97)),
+    ('ESCMAE2010', 1, codigo(['0', '1', '2', '3', '4', '5', '9'], branco=0.97)),
+    ('SERIESCMAE', 1, inteiro(1, 8, 1, branco=0.98)),
+    ('OCUPMAE', 6, inteiro(100000, 999999, 6, branco=0.98)),
+    ('QTDFILVIVO', 2, inteiro(0, 6, 2, branco=0.97)),
+    ('QTDFILMORT', 2, inteiro(0, 2, 2, branco=0.97)),
+    ('GRAVIDEZ', 1, codigo(['1', '2', '3', '9'], branco=0.97)),
+    ('SEMAGESTAC', 2, inteiro(22, 42, 2, branco=0.97)),
+    ('GESTACAO', 1, codigo(['1', '2', '3', '4', '5', '6', '9'], branco=0.97)),
+    ('PARTO', 1, codigo(['1', '2', '9'], branco=0.97)),
+    ('OBITOPARTO', 1, codigo(['1', '2', '3', '9'], branco=0.97)),
+    ('PESO', 4, inteiro(500, 5000, 4, branco=0.97)),
+    ('TPMORTEOCO', 1, codigo(['1', '2', '3', '4', '5', '8', '9'], branco=0.9)),
+    ('OBITOGRAV', 1, codigo(['1', '2', '9'], [0.01, 0.6, 0.39], branco=0.3)),
+    ('OBITOPUERP', 1, codigo(['1', '2', '3', '9'], [0.01, 0.01, 0.6, 0.38], branco=0.3)),
+    ('ASSISTMED', 1, codigo(['1', '2', '9'], [0.7, 0.1, 0.2])),
+    ('EXAME', 1, codigo(['1', '2', '9'], branco=0.8)),
+    ('CIRURGIA', 1, codigo(['1', '2', '9'], branco=0.8)),
+    ('NECROPSIA', 1, codigo(['1', '2', '9'], [0.1, 0.7, 0.2])),
+    ('LINHAA', 20, linha_atestado(0.05)),
+    ('LINHAB', 20, linha_atestado(0.4)),
+    ('LINHAC', 20, linha_atestado(0.6)),
+    ('LINHAD', 20, linha_atestado(0.8)),
+    ('LINHAII', 20, linha_atestado(0.6)),
+    ('CAUSABAS', 4, cid()),
+    ('CB_PRE', 4, cid(branco=0.5)),
+    ('CRM', 15, codigo([''])),
+    ('COMUNSVOIM', 6, municipio(0.0, branco=0.9)),
+    ('DTATESTADO', 8, data(branco=0.05)),
+    ('CIRCOBITO', 1, codigo(['1', '2', '3', '4', '9'], branco=0.85)),
+    ('ACIDTRAB', 1, codigo(['1', '2', '9'], branco=0.95)),
+    ('FONTE', 1, codigo(['1', '2', '3', '4', '9'], branco=0.95)),
+    ('NUMEROLOTE', 8, inteiro(20140001, 20149999, 8)),
+    ('TPPOS', 1, codigo(['N', 'S'], [0.9, 0.1])),
+    ('DTINVESTIG', 8, data(branco=0.8)),
+    ('CAUSABAS_O', 4, cid()),
+    ('DTCADASTRO', 8, data()),
+    ('ATESTANTE', 1, codigo(['1', '2', '3', '4', '5', '9'], [0.6, 0.1, 0.15, 0.05, 0.05, 0.05])),
+    ('STCODIFICA', 1, codigo(['S', 'N'], [0.95, 0.05])),
+    ('CODIFICADO', 1, codigo(['S', 'N'], [0.95, 0.05])),
+    ('VERSAOSIST', 7, codigo(['3.2.00', '3.2.01'])),
+    ('VERSAOSCB', 7, codigo(['3.2'])),
+    ('FONTEINV', 1, codigo(['1', '2', '3', '4', '5', '6', '7', '8', '9'], branco=0.8)),
+    ('DTRECEBIM', 8, data()),
+    ('ATESTADO', 70, codigo(['J189/I10', 'I219', 'C349/J449', 'O150*E669'])),
+    ('DTRECORIGA', 8, data(branco=0.5)),
+    ('CAUSAMAT', 4, cid(branco=0.99)),
+    ('ESCMAEAGR1', 2, inteiro(0, 12, 2, branco=0.97)),
+    ('ESCFALAGR1', 2, inteiro(0, 12, 2, ignorado=99, p_ignorado=0.1)),
+    ('STDOEPIDEM', 1, codigo(['0', '1'], [0.9, 0.1])),
+    ('STDONOVA', 1, codigo(['0', '1'], [0.1, 0.9])),
+    ('DIFDATA', 3, inteiro(0, 400, 3)),
+    ('NUDIASOBCO', 4, inteiro(0, 999, 4, branco=0.9)),
+    ('NUDIASOBIN', 4, inteiro(0, 999, 4, branco=0.9)),
+    ('DTCADINV', 8, data(branco=0.9)),
+    ('TPOBITOCOR', 1, codigo(['1', '2', '3', '4', '5', '6', '7', '8', '9'], branco=0.85)),
+    ('DTCONINV', 8, data(branco=0.9)),
+    ('FONTES', 6, codigo(['SSSXXX', 'SSSXXS', 'XXXXXX'], branco=0.9)),
+    ('TPRESGINFO', 2, inteiro(1, 3, 2, branco=0.9)),
+    ('TPNIVELINV', 1, codigo(['E', 'M', 'S'], branco=0.9)),
+    ('NUDIASINF', 4, inteiro(0, 999, 4, branco=0.95)),
+    ('DTCADINF', 8, data(branco=0.95)),
+    ('MORTEPARTO', 1, codigo(['1', '2', '3', '9'], branco=0.97)),
+    ('DTCONCASO', 8, data(branco=0.95)),
+    ('FONTESINF', 7, codigo(['XXXXXXX'], branco=0.9)),
+    ('ALTCAUSA', 1, codigo(['1', '2'], branco=0.95)),
+]
+
+LAYOUTS = {'sinasc': LAYOUT_SINASC, 'sim': LAYOUT_SIM}
+
+
+# ---------------------------------------------------------------------------
+# Registros e cabeçalho do .dbf
+# ---------------------------------------------------------------------------
+
+def tamanho_registro(layout):
+    return 1 + sum(largura for _, largura, _ in layout)  # + 1 byte da marca de apagado
+
+
+def gerar_registros(layout, n, rng, contexto):
+    """Matriz (n, tamanho_registro) de bytes com n registros prontos para o .dbf."""
+    matriz = np.full((n, tamanho_registro(layout)), ord(' '), dtype=np.uint8)
+    pos = 1
+    for _, largura, gerar in layout:
+        valores = np.char.ljust(gerar(rng, n, contexto).astype(f'S{largura}'), largura)
+        matriz[:, pos:pos + largura] = valores.view(np.uint8).reshape(n, largura)
+        pos += largura
+    return matriz
+
+
+def cabecalho_dbf(layout, num_registros, data_arquivo=None):
+    """Cabeçalho dBase III (versão 0x03) com os descritores dos campos, todos do tipo C."""
+    data_arquivo = data_arquivo or datetime.date.today()
+    tamanho_cabecalho = 32 + 32 * len(layout) + 1
+    cabecalho = bytearray(struct.pack('<BBBBIHH20x', 0x03, data_arquivo.year - 1900, data_arquivo.month,
+                                      data_arquivo.day, num_registros, tamanho_cabecalho,
+                                      tamanho_registro(layout)))
+    for nome, largura, _ in layout:
+        cabecalho += struct.pack('<11sc4xBB14x', nome.encode('ascii'), b'C', largura, 0)
+    cabecalho += b'\r'
+    return bytes(cabecalho)
+
+
+# ---------------------------------------------------------------------------
+# Compressor implode (PKWare), o inverso de leitor_dbc.descompactar_blast
+# ---------------------------------------------------------------------------
+
+# Log2 do dicionário - 6: 6 = janela de 4096 bytes
+DICIONARIO = 6
+_MAIOR_COPIA = 518
+_FIM = 519
+
+
+def _codigos(rep):
+    """Símbolo -> (código, bits), na ordem em que os bits saem no fluxo (LSB primeiro)."""
+    codigos = {}
+    for chave, entrada in enumerate(_construir_tabela(rep)):
+        simbolo, bits = entrada >> 4, entrada & 15
+        if bits and simbolo not in codigos:
+            codigos[simbolo] = (chave & ((1 << bits) - 1), bits)
+    return codigos
+
+
+_COD_LEN = _codigos(_LENLEN)
+_COD_DIST = _codigos(_DISTLEN)
+
+
+def _token_comprimento(comprimento):
+    """(valor, bits) do bit de cópia + código do comprimento + bits extras."""
+    for simbolo in range(15, -1, -1):
+        extra = comprimento - _BASE[simbolo]
+        if 0 <= extra < (1 << _EXTRA[simbolo]):
+            codigo_len, bits = _COD_LEN[simbolo]
+            valor = 1 | (codigo_len << 1) | (extra << (1 + bits))
+            return valor, 1 + bits + _EXTRA[simbolo]
+    raise ValueError(f"comprimento inválido: {comprimento}")
+
+
+_TOKENS_COMPRIMENTO = [_token_comprimento(c) if c >= 2 else (0, 0) for c in range(_FIM + 1)]
+
+
+def _token_distancia(distancia, comprimento):
+    baixos = 2 if comprimento == 2 else DICIONARIO
+    codigo_dist, bits = _COD_DIST[(distancia - 1) >> baixos]
+    return codigo_dist | (((distancia - 1) & ((1 << baixos) - 1)) << bits), bits + baixos
+
+
+def _inicio_das_sequencias(iguais):
+    """Início e tamanho de cada sequência de True em um vetor booleano."""
+    bordas = np.diff(np.concatenate(([0], iguais.astype(np.int8), [0])))
+    inicios = np.flatnonzero(bordas == 1)
+    return inicios, np.flatnonzero(bordas == -1) - inicios
+
+
+class CompactadorImplode:
+    """Comprime um fluxo de registros de tamanho fixo no formato implode, por blocos.
+
+    Cada byte igual ao byte na mesma posição do registro anterior entra numa cópia
+    (distância = tamanho do registro); sequências de 3 ou mais bytes viram cópias e o
+    restante vai como literal não codificado (9 bits). Tudo é montado com numpy.
+    """
+
+    def __init__(self, tamanho_registro):
+        self.distancia = tamanho_registro if tamanho_registro <= (64 << DICIONARIO) else None
+        self.anterior = np.empty(0, dtype=np.uint8)
+        self.sobra_valor = 0
+        self.sobra_bits = 0
+        if self.distancia:
+            self.token_distancia = _token_distancia(self.distancia, 3)
+
+    def cabecalho(self):
+        return bytes([0, DICIONARIO])  # literais sem codificação, janela de 4 KB
+
+    def _tokens(self, dados):
+        n = len(dados)
+        literais = np.ones(n, dtype=bool)
+        copias_pos = np.empty(0, dtype=np.int64)
+        copias_len = np.empty(0, dtype=np.int64)
+
+        if self.distancia:
+            referencia = np.concatenate((self.anterior, dados))[-(n + self.distancia):-self.distancia]
+            iguais = np.zeros(n, dtype=bool)
+            deslocamento = n - len(referencia)
+            iguais[deslocamento:] = dados[deslocamento:] == referencia
+            inicios, tamanhos = _inicio_das_sequencias(iguais)
+            longas = tamanhos >= 3
+            inicios, tamanhos = inicios[longas], tamanhos[longas]
+
+            # Sequências maiores que 518 bytes são quebradas em várias cópias
+            pedacos = -(-tamanhos // _MAIOR_COPIA)
+            copias_pos = np.repeat(inicios, pedacos) + _MAIOR_COPIA * (
+                np.arange(pedacos.sum()) - np.repeat(np.cumsum(pedacos) - pedacos, pedacos))
+            copias_len = np.minimum(np.repeat(inicios + tamanhos, pedacos) - copias_pos, _MAIOR_COPIA)
+            # Uma sobra de 1 ou 2 bytes no fim vai como literal
+            validas = copias_len >= 3
+            copias_pos, copias_len = copias_pos[validas], copias_len[validas]
+
+            cobertos = np.zeros(n + 1, dtype=np.int32)
+            np.add.at(cobertos, copias_pos, 1)
+            np.add.at(cobertos, copias_pos + copias_len, -1)
+            literais = np.cumsum(cobertos[:-1]) == 0
+
+        # Tokens na ordem do fluxo: um por literal e um no início de cada cópia
+        valores = dados.astype(np.uint64) << np.uint64(1)
+        bits = np.full(n, 9, dtype=np.int64)
+        valores[copias_pos] = self._valores_copias(copias_len)
+        bits[copias_pos] = self._bits_copias(copias_len)
+        inicios_tokens = literais
+        inicios_tokens[copias_pos] = True
+        return valores[inicios_tokens], bits[inicios_tokens]
+
+    def _valores_copias(self, comprimentos):
+        tabela = np.array([v for v, _ in _TOKENS_COMPRIMENTO], dtype=np.uint64)
+        bits = np.array([b for _, b in _TOKENS_COMPRIMENTO], dtype=np.uint64)
+        valor_dist = np.uint64(self.token_distancia[0]) if self.distancia else np.uint64(0)
+        return tabela[comprimentos] | (valor_dist << bits[comprimentos])
+
+    def _bits_copias(self, comprimentos):
+        bits = np.array([b for _, b in _TOKENS_COMPRIMENTO], dtype=np.int64)
+        return bits[comprimentos] + (self.token_distancia[1] if self.distancia else 0)
+
+    def _empacotar(self, valores, bits, final=False):
+        """Transforma os tokens em bytes (LSB primeiro), guardando os bits que sobram.
+
+        Cada token (até 32 bits) é posto na sua posição de bit dentro de palavras de 64
+        bits; um token pode cair em duas palavras vizinhas.
+        """
+        valores = np.concatenate(([self.sobra_valor], valores)).astype(np.uint64)
+        bits = np.concatenate(([self.sobra_bits], bits)).astype(np.int64)
+        inicio = np.cumsum(bits) - bits
+        total = int(inicio[-1] + bits[-1])
+
+        palavras = np.zeros(total // 64 + 2, dtype=np.uint64)
+        indice = inicio >> 6
+        deslocamento = (inicio & 63).astype(np.uint64)
+        np.bitwise_or.at(palavras, indice, valores << deslocamento)
+        transborda = (deslocamento + bits.astype(np.uint64)) > 64
+        np.bitwise_or.at(palavras, indice[transborda] + 1,
+                         valores[transborda] >> (np.uint64(64) - deslocamento[transborda]))
+
+        fluxo = palavras.astype('<u8').view(np.uint8)
+        inteiros = total // 8
+        if final:
+            self.sobra_valor, self.sobra_bits = 0, 0
+            return fluxo[:-(-total // 8)].tobytes()
+        # Os bits que não completam um byte voltam para o começo do próximo bloco
+        self.sobra_bits = total - inteiros * 8
+        self.sobra_valor = int(fluxo[inteiros]) & ((1 << self.sobra_bits) - 1)
+        return fluxo[:inteiros].tobytes()
+
+    def compactar(self, dados):
+        """Comprime mais um bloco de registros (bytes ou array uint8)."""
+        dados = np.frombuffer(dados, dtype=np.uint8) if isinstance(dados, (bytes, bytearray)) else dados.ravel()
+        if not len(dados):
+            return b''
+        valores, bits = self._tokens(dados)
+        if self.distancia:
+            self.anterior = dados[-self.distancia:].copy()
+        return self._empacotar(valores, bits)
+
+    def finalizar(self):
+        """Código de fim do fluxo (comprimento 519) e os últimos bits."""
+        valor, bits = _TOKENS_COMPRIMENTO[_FIM]
+        return self._empacotar(np.array([valor], dtype=np.uint64), np.array([bits]), final=True)
+
+
+# ---------------------------------------------------------------------------
+# Arquivos
+# ---------------------------------------------------------------------------
+
+def gerar_arquivo(pasta, sistema, linhas, uf, ano, formatos=('dbf', 'dbc'), semente=0):
+    """Grava DNRJ2014.dbf/.dbc (ou DO...) com `linhas` registros. Retorna os caminhos."""
+    layout = LAYOUTS[sistema]
+    os.makedirs(pasta, exist_ok=True)
+    nome = f'{PREFIXOS[sistema]}{uf}{ano}'
+    rng = np.random.default_rng([semente, CODIGOS_UF[uf], ano])
+    contexto = {'uf': uf, 'ano': ano}
+    cabecalho = cabecalho_dbf(layout, linhas)
+
+    caminhos = {formato: os.path.join(pasta, f'{nome}.{formato}') for formato in formatos}
+    saidas = {formato: open(caminho, 'wb') for formato, caminho in caminhos.items()}
+    try:
+        compactador = CompactadorImplode(tamanho_registro(layout))
+        if 'dbf' in saidas:
+            saidas['dbf'].write(cabecalho)
+        if 'dbc' in saidas:
+            # Cabeçalho sem compressão + 4 bytes de CRC (não conferidos pelos leitores)
+            saidas['dbc'].write(cabecalho + b'\0\0\0\0' + compactador.cabecalho())
+
+        for inicio in range(0, linhas, REGISTROS_POR_BLOCO):
+            registros = gerar_registros(layout, min(REGISTROS_POR_BLOCO, linhas - inicio), rng, contexto)
+            if 'dbf' in saidas:
+                saidas['dbf'].write(registros.tobytes())
+            if 'dbc' in saidas:
+                saidas['dbc'].write(compactador.compactar(registros))
+
+        if 'dbf' in saidas:
+            saidas['dbf'].write(b'\x1a')
+        if 'dbc' in saidas:
+            saidas['dbc'].write(compactador.compactar(b'\x1a') + compactador.finalizar())
+    finally:
+        for saida in saidas.values():
+            saida.close()
+    return caminhos
+
+
+def gerar_arquivos(pasta, sistema='sinasc', linhas=100_000, ufs=('RJ',), ano=2014, formatos=('dbf', 'dbc'),
+                   semente=0):
+    """Um arquivo por UF, como os do DATASUS. Retorna a lista de caminhos gravados."""
+    caminhos = []
+    for uf in ufs:
+        caminhos.extend(gerar_arquivo(pasta, sistema, linhas, uf, ano, formatos, semente).values())
+    return caminhos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera .dbf/.dbc sintéticos no formato do SINASC ou do SIM")
+    parser.add_argument('--sistema', choices=sorted(LAYOUTS), default='sinasc')
+    parser.add_argument('--linhas', type=int, default=100_000, help="registros por arquivo (padrão 100000)")
+    parser.add_argument('--ufs', default='RJ', help="UFs separadas por vírgula, um arquivo por UF (padrão RJ)")
+    parser.add_argument('--ano', type=int, default=2014)
+    parser.add_argument('--formatos', default='dbf,dbc', help="dbf, dbc ou dbf,dbc (padrão)")
+    parser.add_argument('--pasta', default='sinteticos', help="pasta de saída (padrão ./sinteticos)")
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    ufs = [uf.strip().upper() for uf in args.ufs.split(',') if uf.strip()]
+    formatos = [f.strip().lower() for f in args.formatos.split(',') if f.strip()]
+    for caminho in gerar_arquivos(args.pasta, args.sistema, args.linhas, ufs, args.ano, formatos, args.semente):
+        print(f"{caminho}: {os.path.getsize(caminho) / 1024 ** 2:.1f} MB")
@@ -0,0 +1,328 @@
+"""
+Leitor de arquivos .dbc do DATASUS em Python puro, sem precisar do TabWin.
+
+O .dbc é um .dbf comprimido: o cabeçalho do .dbf é copiado sem compressão,
+seguido de 4 bytes de CRC e dos registros comprimidos no formato "implode"
+da PKWare (o mesmo descompactado pelo blast.c do zlib). Aqui a descompressão
+é feita em fluxo, em blocos, sem nunca gravar o .dbf expandido no disco.
+
+Uso:
+    from leitor_dbc import DBC
+    df = pd.DataFrame(iter(DBC('DNSP2014.dbc', encoding='latin-1')))
+"""
+
+import datetime
+import io
+import struct
+
+# Tamanho máximo de um código de Huffman no formato implode
+MAXBITS = 13
+
+# Maior distância de cópia possível (dicionário de 4 KB)
+JANELA = 4096
+
+# Tamanho dos blocos lidos do disco e entregues pelo descompactador
+TAMANHO_BLOCO = 64 * 1024
+
+# Tabelas fixas do formato (comprimentos dos códigos em run-length, conforme blast.c)
+_LITLEN = bytes([
+    11, 124, 8, 7, 28, 7, 188, 13, 76, 4, 10, 8, 12, 10, 12, 10, 8, 23, 8,
+    9, 7, 6, 7, 8, 7, 6, 55, 8, 23, 24, 12, 11, 7, 9, 11, 12, 6, 7, 22, 5,
+    7, 24, 6, 11, 9, 6, 7, 22, 7, 11, 38, 7, 9, 8, 25, 11, 8, 11, 9, 12,
+    8, 12, 5, 38, 5, 38, 5, 11, 7, 5, 6, 21, 6, 10, 53, 8, 7, 24, 10, 27,
+    44, 253, 253, 253, 252, 252, 252, 13, 12, 45, 12, 45, 12, 61, 12, 45,
+    44, 173])
+_LENLEN = bytes([2, 35, 36, 53, 38, 23])
+_DISTLEN = bytes([2, 20, 53, 230, 247, 151, 248])
+_BASE = (3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264)
+_EXTRA = (0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8)
+
+
+def _construir_tabela(rep):
+    """Monta uma tabela de consulta direta (2^MAXBITS posições) para um código de Huffman.
+
+    Cada posição guarda (símbolo << 4) | comprimento, indexada pelos próximos
+    MAXBITS bits do fluxo. No implode os códigos são gravados invertidos e a
+    partir do bit mais significativo, por isso a inversão e o espelhamento abaixo.
+    """
+    comprimentos = []
+    for byte in rep:
+        comprimentos.extend([byte & 15] * ((byte >> 4) + 1))
+
+    tabela = [0] * (1 << MAXBITS)
+    codigo = 0
+    for tamanho in range(1, MAXBITS + 1):
+        for simbolo, comp in enumerate(comprimentos):
+            if comp != tamanho:
+                continue
+            chave = 0
+            for i in range(tamanho):
+                bit = ((codigo >> (tamanho - 1 - i)) & 1) ^ 1
+                chave |= bit << i
+            for alto in range(1 << (MAXBITS - tamanho)):
+                tabela[chave | (alto << tamanho)] = (simbolo << 4) | tamanho
+            codigo += 1
+        codigo <<= 1
+    return tabela
+
+
+_TAB_LIT = _construir_tabela(_LITLEN)
+_TAB_LEN = _construir_tabela(_LENLEN)
+_TAB_DIST = _construir_tabela(_DISTLEN)
+
+
+def descompactar_blast(ler):
+    """Descompacta um fluxo implode da PKWare, entregando blocos de bytes.
+
+    ler: função ler(n) -> bytes, como o .read de um arquivo aberto em modo binário.
+    Mantém em memória apenas a janela de 4 KB usada pelas cópias mais o bloco atual.
+    """
+    dados = ler(TAMANHO_BLOCO)
+    pos = 0
+    bitbuf = 0
+    bitcnt = 0
+    saida = bytearray()
+
+    def erro(msg):
+        return ValueError(f"Arquivo .dbc corrompido: {msg}")
+
+    # Cabeçalho do implode: literais codificados (0/1) e log2 do dicionário - 6 (4 a 6)
+    while bitcnt < 16:
+        if pos == len(dados):
+            dados, pos = ler(TAMANHO_BLOCO), 0
+            if not dados:
+                raise erro("fluxo comprimido vazio")
+        bitbuf |= dados[pos] << bitcnt
+        pos += 1
+        bitcnt += 8
+
+    literais_codificados = bitbuf & 0xFF
+    dicionario = (bitbuf >> 8) & 0xFF
+    bitbuf >>= 16
+    bitcnt -= 16
+    if literais_codificados > 1:
+        raise erro("cabeçalho do implode inválido")
+    if dicionario < 4 or dicionario > 6:
+        raise erro("tamanho de dicionário inválido")
+    mascara_dict = (1 << dicionario) - 1
+
+    while True:
+        # Garante ao menos 32 bits no buffer, suficiente para qualquer símbolo completo
+        while bitcnt < 32:
+            if pos == len(dados):
+                dados, pos = ler(TAMANHO_BLOCO), 0
+                if not dados:
+                    break
+            bitbuf |= dados[pos] << bitcnt
+            pos += 1
+            bitcnt += 8
+
+        if bitbuf & 1:
+            # Par comprimento/distância
+            entrada = _TAB_LEN[(bitbuf >> 1) & 0x1FFF]
+            tamanho_cod = entrada & 15
+            simbolo = entrada >> 4
+            bitbuf >>= 1 + tamanho_cod
+            bitcnt -= 1 + tamanho_cod
+            extra = _EXTRA[simbolo]
+            comprimento = _BASE[simbolo] + (bitbuf & ((1 << extra) - 1))
+            bitbuf >>= extra
+            bitcnt -= extra
+            if bitcnt < 0 or tamanho_cod == 0:
+                raise erro("fim inesperado do fluxo")
+            if comprimento == 519:
+                break  # código de fim
+
+            entrada = _TAB_DIST[bitbuf & 0x1FFF]
+            tamanho_cod = entrada & 15
+            bitbuf >>= tamanho_cod
+            bitcnt -= tamanho_cod
+            if comprimento == 2:
+                distancia = ((entrada >> 4) << 2) + (bitbuf & 3) + 1
+                bitbuf >>= 2
+                bitcnt -= 2
+            else:
+                distancia = ((entrada >> 4) << dicionario) + (bitbuf & mascara_dict) + 1
+                bitbuf >>= dicionario
+                bitcnt -= dicionario
+            if bitcnt < 0 or tamanho_cod == 0:
+                raise erro("fim inesperado do fluxo")
+            if distancia > len(saida):
+                raise erro("distância de cópia antes do início dos dados")
+
+            inicio = len(saida) - distancia
+            if distancia >= comprimento:
+                saida += saida[inicio:inicio + comprimento]
+            else:
+                # Cópia sobreposta: repete o padrão dos últimos 'distancia' bytes
+                padrao = saida[inicio:]
+                saida += (padrao * (comprimento // distancia + 1))[:comprimento]
+        else:
+            # Literal
+            if literais_codificados:
+                entrada = _TAB_LIT[(bitbuf >> 1) & 0x1FFF]
+                tamanho_cod = entrada & 15
+                saida.append(entrada >> 4)
+                bitbuf >>= 1 + tamanho_cod
+                bitcnt -= 1 + tamanho_cod
+            else:
+                saida.append((bitbuf >> 1) & 0xFF)
+                bitbuf >>= 9
+                bitcnt -= 9
+            if bitcnt < 0:
+                raise erro("fim inesperado do fluxo")
+
+        if len(saida) >= TAMANHO_BLOCO + JANELA:
+            yield bytes(saida[:-JANELA])
+            del saida[:-JANELA]
+
+    if saida:
+        yield bytes(saida)
+
+
+class _FluxoDBC(io.RawIOBase):
+    """Arquivo somente leitura que devolve o conteúdo do .dbf contido em um .dbc."""
+
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, 'rb')
+        inicio = self._arquivo.read(10)
+        if len(inicio) < 10:
+            self._arquivo.close()
+            raise ValueError(f"{caminho} não é um arquivo .dbc válido")
+        tamanho_cabecalho = struct.unpack('<H', inicio[8:10])[0]
+        if tamanho_cabecalho < 32:
+            self._arquivo.close()
+            raise ValueError(f"{caminho} tem cabeçalho com tamanho inválido ({tamanho_cabecalho})")
+        cabecalho = inicio + self._arquivo.read(tamanho_cabecalho - 10)
+        self._arquivo.read(4)  # CRC32, não utilizado
+        self._pendente = cabecalho
+        self._blocos = descompactar_blast(self._arquivo.read)
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        while not self._pendente:
+            try:
+                self._pendente = next(self._blocos)
+            except StopIteration:
+                return 0
+        n = min(len(destino), len(self._pendente))
+        destino[:n] = self._pendente[:n]
+        self._pendente = self._pendente[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._arquivo.close()
+        super().close()
+
+
+def abrir_dbc(caminho):
+    """Abre um .dbc e devolve um arquivo binário com o .dbf descompactado sob demanda."""
+    return io.BufferedReader(_FluxoDBC(caminho), buffer_size=TAMANHO_BLOCO)
+
+
+def ler_cabecalho_dbf(arquivo):
+    """Lê o cabeçalho e os descritores de campo de um .dbf a partir de um arquivo binário.
+
+    Retorna um dicionário com num_registros, tamanho_cabecalho, tamanho_registro,
+    driver_idioma e campos (lista de tuplas (nome, tipo, tamanho, decimais)).
+    O arquivo fica posicionado no início do primeiro registro.
+    """
+    bruto = arquivo.read(32)
+    if len(bruto) < 32:
+        raise ValueError("cabeçalho .dbf incompleto")
+    num_registros, tamanho_cabecalho, tamanho_registro = struct.unpack('<IHH', bruto[4:12])
+    driver_idioma = bruto[29]
+
+    campos = []
+    lidos = 32
+    while lidos < tamanho_cabecalho:
+        descritor = arquivo.read(1)
+        lidos += 1
+        if not descritor or descritor in (b'\r', b'\n'):
+            break
+        descritor += arquivo.read(31)
+        lidos += 31
+        nome = descritor[:11].split(b'\0')[0].decode('ascii', errors='replace').strip()
+        tipo = chr(descritor[11])
+        campos.append((nome, tipo, descritor[16], descritor[17]))
+
+    # Pula o restante do cabeçalho (terminador e bytes de preenchimento)
+    if lidos < tamanho_cabecalho:
+        arquivo.read(tamanho_cabecalho - lidos)
+
+    return {
+        'num_registros': num_registros,
+        'tamanho_cabecalho': tamanho_cabecalho,
+        'tamanho_registro': tamanho_registro,
+        'driver_idioma': driver_idioma,
+        'campos': campos,
+    }
+
+
+def _converter_valor(tipo, dados, encoding, erros):
+    """Converte o valor bruto de um campo conforme o tipo dBase (mesmas regras do dbfread)."""
+    if tipo == 'C':
+        return dados.rstrip(b'\0 ').decode(encoding, errors=erros)
+    if tipo in ('N', 'F'):
+        dados = dados.strip().strip(b'*')
+        if not dados:
+            return None
+        try:
+            return int(dados)
+        except ValueError:
+            return float(dados.replace(b',', b'.'))
+    if tipo == 'D':
+        dados = dados.strip(b'\0 ')
+        if not dados:
+            return None
+        try:
+            return datetime.date(int(dados[:4]), int(dados[4:6]), int(dados[6:8]))
+        except ValueError:
+            return None
+    if tipo == 'L':
+        if dados in b'TtYy':
+            return True
+        if dados in b'FfNn':
+            return False
+        return None
+    raise ValueError(f"Tipo de campo não suportado em .dbc: {tipo!r}")
+
+
+class DBC:
+    """Tabela de um arquivo .dbc, iterável registro a registro como o dbfread.DBF.
+
+    Cada iteração descompacta o arquivo do início, em fluxo; nada é gravado no disco.
+    """
+
+    def __init__(self, caminho, encoding='latin-1', char_decode_errors='strict'):
+        self.caminho = caminho
+        self.encoding = encoding
+        self.char_decode_errors = char_decode_errors
+        with abrir_dbc(caminho) as arquivo:
+            self.cabecalho = ler_cabecalho_dbf(arquivo)
+        self.field_names = [nome for nome, _, _, _ in self.cabecalho['campos']]
+
+    def __len__(self):
+        return self.cabecalho['num_registros']
+
+    def __iter__(self):
+        campos = self.cabecalho['campos']
+        tamanho_registro = self.cabecalho['tamanho_registro']
+        with abrir_dbc(self.caminho) as arquivo:
+            ler_cabecalho_dbf(arquivo)
+            for _ in range(self.cabecalho['num_registros']):
+                registro = arquivo.read(tamanho_registro)
+                if len(registro) < tamanho_registro or registro[:1] == b'\x1a':
+                    break
+                if registro[:1] == b'*':
+                    continue  # registro apagado
+                valores = {}
+                pos = 1
+                for nome, tipo, tamanho, _ in campos:
+                    valores[nome] = _converter_valor(tipo, registro[pos:pos + tamanho],
+                                                     self.encoding, self.char_decode_errors)
+                    pos += tamanho
+                yield valores
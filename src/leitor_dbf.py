@@ -0,0 +1,438 @@
+"""
+Leitura vetorizada de arquivos .dbf/.dbc do DATASUS com NumPy.
+
+Em vez de decodificar registro por registro (como o dbfread), o arquivo .dbf é
+mapeado em memória e a área de registros é vista como um array estruturado do
+NumPy, com um campo de largura fixa S<n> por coluna. A conversão de tipos e a
+decodificação do texto são feitas coluna a coluna, de forma vetorizada.
+Os .dbc são descompactados em fluxo (leitor_dbc.py) e decodificados do mesmo jeito.
+
+Uso:
+    from leitor_dbf import ler_dbf
+    df = ler_dbf('DNSP2014.dbf', numericas=['CODMUNRES', 'IDADEMAE', 'CONSPRENAT'])
+
+    # Só decodifica as colunas pedidas (os demais bytes do registro nem são lidos)
+    df = ler_dbf('DNSP2014.dbf', columns=['CODMUNRES', 'CONSPRENAT', 'IDADEMAE'])
+
+    # Já com os tipos compactos do esquema do SINASC (Int8, Int32, datas...; ver esquemas.py)
+    df = ler_dbf('DNSP2014.dbf', esquema='sinasc')
+
+Sem encoding, a codificação é resolvida uma única vez por arquivo (resolver_codificacao):
+pelo byte de driver de idioma do cabeçalho ou, se ele não disser nada, por uma amostra
+dos campos de texto (latin-1, cp1252, cp850 do TabWin ou utf-8). Num .dbc a amostra são
+os primeiros registros da própria leitura (TabelaDBF.lotes), que são descompactados uma
+vez só e usados tanto para a detecção quanto para o primeiro lote.
+
+Dependências necessárias:
+- numpy e pandas pip install numpy pandas
+"""
+
+import codecs
+import importlib
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from esquemas import aplicar_esquema, eh_inteiro, esquema as obter_esquema
+from leitor_dbc import abrir_dbc, ler_cabecalho_dbf
+
+# Tipos de campo dBase suportados pelo decodificador vetorizado
+TIPOS_SUPORTADOS = {'C', 'N', 'F', 'D', 'L'}
+
+# Byte de driver de idioma (posição 29 do cabeçalho) -> codificação.
+# Só os drivers ocidentais; os demais (e o 0, comum no DATASUS) caem na amostragem.
+DRIVERS_IDIOMA = {
+    0x01: 'cp437', 0x02: 'cp850', 0x03: 'cp1252',
+    0x0A: 'cp850', 0x0E: 'cp850', 0x10: 'cp850', 0x12: 'cp850', 0x14: 'cp850',
+    0x16: 'cp850', 0x1A: 'cp850', 0x1D: 'cp850', 0x24: 'cp860', 0x25: 'cp850',
+    0x37: 'cp850', 0x57: 'cp1252', 0x58: 'cp1252', 0x59: 'cp1252',
+}
+
+# Letras acentuadas do português, usadas para pontuar as codificações candidatas
+LETRAS_PORTUGUES = set('áàâãéêíóôõúüçÁÀÂÃÉÊÍÓÔÕÚÜÇªº')
+
+# Quantidade de registros amostrados para detectar a codificação
+TAMANHO_AMOSTRA = 20_000
+
+# Campos mais largos que isso podem passar do int64 (~9,2e18); o dBase aceita N de até 20 dígitos
+MAX_DIGITOS_INTEIRO = 18
+
+# Maior inteiro que o float64 representa sem perda (2**53)
+MAX_INTEIRO_EXATO = 2 ** 53
+
+# Codificação já resolvida de cada arquivo: (caminho, tamanho, mtime) -> codificação
+_codificacoes = {}
+
+
+def selecionar_campos(campos, columns=None):
+    """Filtra os descritores de campo pelas colunas pedidas, na ordem pedida.
+
+    Cada campo selecionado vem com o seu deslocamento (byte) dentro do registro,
+    calculado a partir dos descritores: (nome, tipo, tamanho, decimais, deslocamento).
+    """
+    com_deslocamento = []
+    pos = 1  # o primeiro byte do registro é o marcador de apagado
+    for nome, tipo, tamanho, decimais in campos:
+        com_deslocamento.append((nome, tipo, tamanho, decimais, pos))
+        pos += tamanho
+    if columns is None:
+        return com_deslocamento
+
+    por_nome = {campo[0]: campo for campo in com_deslocamento}
+    faltando = [c for c in columns if c not in por_nome]
+    if faltando:
+        raise ValueError(f"Colunas não encontradas no arquivo: {faltando}")
+    return [por_nome[c] for c in columns]
+
+
+def dtype_registro(campos, tamanho_registro):
+    """Monta o dtype estruturado de um registro: marcador de apagado + um S<n> por campo.
+
+    campos vem de selecionar_campos(); bytes de campos não selecionados ficam de fora
+    do dtype e por isso nunca são copiados nem decodificados.
+    """
+    nomes = ['_APAGADO']
+    formatos = ['S1']
+    deslocamentos = [0]
+    for nome, _, tamanho, _, deslocamento in campos:
+        nomes.append(nome)
+        formatos.append(f'S{tamanho}')
+        deslocamentos.append(deslocamento)
+    return np.dtype({'names': nomes, 'formats': formatos,
+                     'offsets': deslocamentos, 'itemsize': tamanho_registro})
+
+
+def _eh_um_byte(encoding):
+    """True se a codificação mapeia cada byte em exatamente um caractere (latin-1, cp850...)."""
+    nome = codecs.lookup(encoding).name
+    if nome in ('iso8859-1', 'latin-1', 'ascii'):
+        return True
+    try:
+        modulo = importlib.import_module('encodings.' + nome.replace('-', '_'))
+    except ImportError:
+        return False
+    return hasattr(modulo, 'decoding_table')
+
+
+@lru_cache(maxsize=None)
+def _tabela_caracteres(encoding):
+    """Tabela byte -> ponto de código Unicode para codificações de 1 byte, ou None (ex.: utf-8)."""
+    if not _eh_um_byte(encoding):
+        return None
+    texto = bytes(range(256)).decode(encoding, errors='replace')
+    return np.array([ord(c) for c in texto], dtype=np.uint32)
+
+
+def _matriz_bytes(coluna):
+    """Vê uma coluna S<n> como matriz (linhas x n) de uint8, sem cópia quando possível."""
+    largura = coluna.dtype.itemsize
+    return np.ascontiguousarray(coluna).view(np.uint8).reshape(-1, largura)
+
+
+def _decodificar_texto(coluna, encoding, erros):
+    """Decodifica uma coluna S<n> para texto, removendo espaços e nulos à direita."""
+    tabela = _tabela_caracteres(encoding)
+    if tabela is None:
+        # Codificação de múltiplos bytes: decodifica elemento a elemento
+        texto = np.char.decode(np.char.rstrip(coluna, b' \0'), encoding, errors=erros)
+    else:
+        largura = coluna.dtype.itemsize
+        pontos = tabela[_matriz_bytes(coluna)]
+        texto = np.ascontiguousarray(pontos).view(f'U{largura}').ravel()
+        texto = np.char.rstrip(texto, ' \0')
+    return pd.Series(texto)
+
+
+def _converter_numeros(coluna):
+    """Converte uma coluna S<n> de dígitos ASCII em números, de forma vetorizada.
+
+    Valores só com dígitos (e espaços) são montados com aritmética inteira sobre a
+    matriz de bytes; o restante (sinal, ponto decimal) cai no pd.to_numeric, assim
+    como todos os valores de campos com mais de MAX_DIGITOS_INTEIRO dígitos (que
+    estourariam o int64). Campos em branco viram NA. Retorna Int64 se todos os
+    valores forem inteiros representáveis sem perda; senão float64.
+
+    >>> _converter_numeros(np.array([b'12345678901234567890', b' ' * 20], dtype='S20')).tolist()
+    [1.2345678901234567e+19, nan]
+    """
+    matriz = _matriz_bytes(coluna)
+    eh_digito = (matriz >= 48) & (matriz <= 57)
+    eh_branco = (matriz == 32) | (matriz == 0) | (matriz == 42)  # '*' = valor estourado no dBase
+    vazio = ~eh_digito.any(axis=1)
+    valor = np.zeros(len(matriz), dtype=np.int64)
+    if matriz.shape[1] > MAX_DIGITOS_INTEIRO:
+        outros = ~eh_branco.all(axis=1)
+    else:
+        for j in range(matriz.shape[1]):
+            valor = np.where(eh_digito[:, j], valor * 10 + (matriz[:, j] - 48), valor)
+        outros = ~(eh_digito | eh_branco).all(axis=1)
+    if not outros.any():
+        return pd.Series(pd.arrays.IntegerArray(valor, vazio))
+
+    texto = pd.Series(np.char.strip(coluna[outros], b' \0*')).str.decode('ascii', errors='replace')
+    numeros = valor.astype(np.float64)
+    numeros[vazio] = np.nan
+    numeros[outros] = pd.to_numeric(texto.str.replace(',', '.', regex=False), errors='coerce')
+    presentes = numeros[~np.isnan(numeros)]
+    if np.all((np.mod(presentes, 1) == 0) & (np.abs(presentes) <= MAX_INTEIRO_EXATO)):
+        return pd.Series(pd.array(numeros, dtype='Float64').astype('Int64'))
+    return pd.Series(numeros)
+
+
+def _converter_datas(coluna):
+    texto = pd.Series(coluna).str.decode('ascii', errors='replace').str.strip()
+    return pd.to_datetime(texto, format='%Y%m%d', errors='coerce')
+
+
+def _converter_logicos(coluna):
+    primeiro = _matriz_bytes(coluna)[:, 0]
+    verdadeiro = np.isin(primeiro, np.frombuffer(b'TtYy', dtype=np.uint8))
+    falso = np.isin(primeiro, np.frombuffer(b'FfNn', dtype=np.uint8))
+    resultado = pd.array(verdadeiro, dtype='boolean')
+    resultado[~verdadeiro & ~falso] = pd.NA
+    return pd.Series(resultado)
+
+
+def decodificar_registros(registros, campos, encoding='latin-1', char_decode_errors='replace',
+                          numericas=()):
+    """Converte um array estruturado de registros em DataFrame, uma coluna de cada vez.
+
+    campos: descritores retornados por selecionar_campos(), na ordem das colunas de saída.
+    numericas: campos do tipo C (texto) que guardam códigos numéricos e devem virar
+    inteiros (Int64), como CODMUNRES, IDADEMAE e CONSPRENAT.
+    """
+    apagados = registros['_APAGADO'] == b'*'
+    if apagados.any():
+        registros = registros[~apagados]
+    numericas = set(numericas or ())
+    colunas = {}
+    for nome, tipo, _, _, _ in campos:
+        coluna = registros[nome]
+        if tipo == 'C' and nome in numericas:
+            colunas[nome] = _converter_numeros(coluna)
+        elif tipo == 'C':
+            colunas[nome] = _decodificar_texto(coluna, encoding, char_decode_errors)
+        elif tipo in ('N', 'F'):
+            colunas[nome] = _converter_numeros(coluna)
+        elif tipo == 'D':
+            colunas[nome] = _converter_datas(coluna)
+        elif tipo == 'L':
+            colunas[nome] = _converter_logicos(coluna)
+    return pd.DataFrame(colunas)
+
+
+def _amostra_registros(caminho, cabecalho, dtype, compactado, tamanho_amostra):
+    """Lê até tamanho_amostra registros espalhados pelo arquivo (.dbc: os primeiros)."""
+    tamanho_registro = cabecalho['tamanho_registro']
+    if compactado:
+        with abrir_dbc(caminho) as arquivo:
+            ler_cabecalho_dbf(arquivo)
+            quantidade = min(tamanho_amostra, cabecalho['num_registros'])
+            bruto = arquivo.read(quantidade * tamanho_registro)
+        quantidade = len(bruto) // tamanho_registro
+        return np.frombuffer(bruto[:quantidade * tamanho_registro], dtype=dtype)
+
+    inicio = cabecalho['tamanho_cabecalho']
+    disponiveis = (os.path.getsize(caminho) - inicio) // tamanho_registro
+    quantidade = min(cabecalho['num_registros'], max(disponiveis, 0))
+    if quantidade == 0:
+        return np.empty(0, dtype=dtype)
+    registros = np.memmap(caminho, dtype=dtype, mode='r', offset=inicio, shape=(quantidade,))
+    indices = np.unique(np.linspace(0, quantidade - 1, min(quantidade, tamanho_amostra)).astype(np.int64))
+    return registros[indices]
+
+
+def _campos_texto(cabecalho):
+    return [campo for campo in selecionar_campos(cabecalho['campos']) if campo[1] == 'C']
+
+
+def _codificacao_da_amostra(amostra, campos_texto):
+    """Codificação pelos valores com bytes >= 0x80 dos campos de texto da amostra de registros."""
+    valores = []
+    for nome, _, _, _, _ in campos_texto:
+        coluna = amostra[nome]
+        com_acento = (_matriz_bytes(coluna) >= 0x80).any(axis=1)
+        valores.extend(coluna[com_acento].tolist())
+    return _escolher_codificacao(valores)
+
+
+def _chave_arquivo(caminho):
+    estado = os.stat(caminho)
+    return (os.path.abspath(caminho), estado.st_size, estado.st_mtime_ns)
+
+
+def _escolher_codificacao(valores):
+    """Escolhe a codificação de uma lista de valores de texto que têm bytes >= 0x80."""
+    if not valores:
+        return 'latin-1'  # só ASCII: qualquer codificação de 1 byte dá o mesmo resultado
+
+    try:
+        for valor in valores:
+            valor.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    bruto = b'\n'.join(valores)
+    pontos = {}
+    for candidata in ('latin-1', 'cp850'):
+        texto = bruto.decode(candidata, errors='replace')
+        pontos[candidata] = sum(1 for c in texto if c in LETRAS_PORTUGUES)
+    if pontos['cp850'] > pontos['latin-1']:
+        return 'cp850'
+
+    # Bytes 0x80-0x9F são caracteres de controle no latin-1, mas imprimíveis no cp1252
+    if any(0x80 <= byte <= 0x9F for valor in valores for byte in valor):
+        return 'cp1252'
+    return 'latin-1'
+
+
+def resolver_codificacao(caminho, tamanho_amostra=TAMANHO_AMOSTRA):
+    """Descobre a codificação do texto de um .dbf/.dbc, lendo o arquivo uma única vez.
+
+    Usa o byte de driver de idioma do cabeçalho quando ele é conhecido; senão amostra
+    os campos de texto. O resultado fica em cache por (caminho, tamanho, mtime), então
+    chamadas seguintes para o mesmo arquivo não leem nada do disco.
+    """
+    chave = _chave_arquivo(caminho)
+    if chave in _codificacoes:
+        return _codificacoes[chave]
+
+    compactado = caminho.lower().endswith('.dbc')
+    abrir = abrir_dbc if compactado else (lambda c: open(c, 'rb'))
+    with abrir(caminho) as arquivo:
+        cabecalho = ler_cabecalho_dbf(arquivo)
+
+    encoding = DRIVERS_IDIOMA.get(cabecalho['driver_idioma'])
+    if encoding is None:
+        campos_texto = _campos_texto(cabecalho)
+        amostra = None
+        if campos_texto:
+            dtype = dtype_registro(campos_texto, cabecalho['tamanho_registro'])
+            amostra = _amostra_registros(caminho, cabecalho, dtype, compactado, tamanho_amostra)
+        encoding = _codificacao_da_amostra(amostra, campos_texto)
+
+    _codificacoes[chave] = encoding
+    return encoding
+
+
+class TabelaDBF:
+    """Tabela .dbf (mapeada em memória) ou .dbc (descompactada em fluxo) lida de forma vetorizada."""
+
+    def __init__(self, caminho, encoding=None, char_decode_errors='replace', numericas=(),
+                 columns=None, esquema=None):
+        self.caminho = caminho
+        self.char_decode_errors = char_decode_errors
+        self.esquema = obter_esquema(esquema) if esquema is not None else None
+        if self.esquema is not None:
+            # Os códigos do esquema são montados direto dos bytes, sem passar por texto
+            numericas = set(numericas) | {c for c, tipo in self.esquema.items() if eh_inteiro(tipo)}
+        self.numericas = numericas
+        self.compactado = caminho.lower().endswith('.dbc')
+
+        abrir = abrir_dbc if self.compactado else (lambda c: open(c, 'rb'))
+        with abrir(caminho) as arquivo:
+            self.cabecalho = ler_cabecalho_dbf(arquivo)
+
+        if encoding is None and not self.compactado:
+            encoding = resolver_codificacao(caminho)
+        elif encoding is None:
+            # .dbc sem driver de idioma conhecido: fica None até lotes() amostrar os primeiros
+            # registros da própria leitura (o arquivo não é descompactado duas vezes)
+            encoding = (_codificacoes.get(_chave_arquivo(caminho))
+                        or DRIVERS_IDIOMA.get(self.cabecalho['driver_idioma']))
+        self.encoding = encoding
+
+        self.campos = selecionar_campos(self.cabecalho['campos'], columns)
+        nao_suportados = sorted({campo[1] for campo in self.campos} - TIPOS_SUPORTADOS)
+        if nao_suportados:
+            raise ValueError(f"Tipos de campo não suportados em {caminho}: {nao_suportados}")
+        self.dtype = dtype_registro(self.campos, self.cabecalho['tamanho_registro'])
+        self.field_names = [campo[0] for campo in self.campos]
+
+    def __len__(self):
+        return self.cabecalho['num_registros']
+
+    def _decodificar(self, registros):
+        df = decodificar_registros(registros, self.campos, self.encoding,
+                                   self.char_decode_errors, self.numericas)
+        if self.esquema is not None:
+            df = aplicar_esquema(df, self.esquema, copiar=False)
+        return df
+
+    def _registros_mapeados(self):
+        """Área de registros do .dbf mapeada em memória como array estruturado."""
+        inicio = self.cabecalho['tamanho_cabecalho']
+        tamanho_registro = self.cabecalho['tamanho_registro']
+        disponiveis = (os.path.getsize(self.caminho) - inicio) // tamanho_registro
+        quantidade = min(self.cabecalho['num_registros'], max(disponiveis, 0))
+        if quantidade == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.caminho, dtype=self.dtype, mode='r', offset=inicio, shape=(quantidade,))
+
+    def _codificacao_do_prefixo(self, bruto):
+        """Codificação pelos primeiros registros já descompactados; fica no cache de resolver_codificacao."""
+        campos_texto = _campos_texto(self.cabecalho)
+        amostra = None
+        if campos_texto:
+            tamanho_registro = self.cabecalho['tamanho_registro']
+            amostra = np.frombuffer(bruto, dtype=dtype_registro(campos_texto, tamanho_registro),
+                                    count=len(bruto) // tamanho_registro)
+        encoding = _codificacao_da_amostra(amostra, campos_texto)
+        _codificacoes[_chave_arquivo(self.caminho)] = encoding
+        return encoding
+
+    def lotes(self, tamanho_lote):
+        """Gera DataFrames com no máximo tamanho_lote registros cada."""
+        if not self.compactado:
+            registros = self._registros_mapeados()
+            for inicio in range(0, len(registros), tamanho_lote):
+                yield self._decodificar(registros[inicio:inicio + tamanho_lote])
+            return
+
+        tamanho_registro = self.cabecalho['tamanho_registro']
+        restantes = self.cabecalho['num_registros']
+        with abrir_dbc(self.caminho) as arquivo:
+            ler_cabecalho_dbf(arquivo)
+            prefixo = b''
+            if self.encoding is None:
+                prefixo = arquivo.read(min(TAMANHO_AMOSTRA, restantes) * tamanho_registro)
+                self.encoding = self._codificacao_do_prefixo(prefixo)
+            while restantes > 0:
+                quantidade = min(tamanho_lote, restantes)
+                tamanho = quantidade * tamanho_registro
+                if prefixo:
+                    # Os registros da amostra já descompactados entram nos primeiros lotes
+                    bruto, prefixo = prefixo[:tamanho], prefixo[tamanho:]
+                    if len(bruto) < tamanho:
+                        bruto += arquivo.read(tamanho - len(bruto))
+                else:
+                    bruto = arquivo.read(tamanho)
+                quantidade = len(bruto) // tamanho_registro
+                if quantidade == 0:
+                    break
+                restantes -= quantidade
+                yield self._decodificar(np.frombuffer(bruto[:quantidade * tamanho_registro],
+                                                      dtype=self.dtype))
+
+    def ler(self):
+        """Lê a tabela inteira em um único DataFrame."""
+        if not self.compactado:
+            return self._decodificar(self._registros_mapeados())
+        partes = list(self.lotes(max(len(self), 1)))
+        if not partes:
+            return self._decodificar(np.empty(0, dtype=self.dtype))
+        return partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+
+
+def ler_dbf(caminho, encoding=None, char_decode_errors='replace', numericas=(), columns=None,
+            esquema=None):
+    """Lê um .dbf ou .dbc em um DataFrame usando o decodificador vetorizado.
+
+    encoding: codificação do texto (None = detectada com resolver_codificacao).
+    columns: lista de colunas a ler; as demais não são decodificadas (None = todas).
+    esquema: 'sinasc', 'sim' ou 'sisprenatal' para já devolver os tipos de esquemas.py.
+    """
+    return TabelaDBF(caminho, encoding, char_decode_errors, numericas, columns, esquema).ler()
@@ -0,0 +1,109 @@
+"""
+Leitura dos mapas do TabWin (.MAP, DATASUS) como GeoDataFrame.
+
+src/Tabwin/MAPAS traz as malhas que o TabWin usa nos mapas (municípios de cada
+UF, UFs, microrregiões, regiões de saúde...), num formato binário próprio, sem
+leitor no GeoPandas. O layout (little-endian, coordenadas em graus decimais):
+
+    cabeçalho   uint16 (100) + 4 float32: x máx., y máx., x mín., y mín.
+    registros   até o fim do arquivo, um por área:
+                uint8 tipo (1 nos mapas de municípios, 0 nos demais)
+                string Pascal de 10 caracteres: código (município com 6 dígitos, UF, microrregião...)
+                string Pascal de 25 caracteres: nome (latin-1, completado com espaços)
+                2 float32: ponto do rótulo (x, y)
+                uint16 n + n pares float32 (x, y): o contorno, fechado
+
+Uma área com mais de um anel (ilhas, enclaves) vem num contorno só: os anéis
+seguintes começam e terminam no primeiro ponto do contorno. Esses contornos são
+separados nos anéis, cada anel vira um polígono válido e o resultado é a
+diferença simétrica entre eles (regra par-ímpar: um anel dentro de outro é um
+buraco). Assim a soma das áreas dos 5.570 municípios fecha com a área das UFs.
+
+O GeoDataFrame lido (código, nome, ponto do rótulo e geometria, já no CRS pedido)
+fica no cache de fontes_dados em GeoParquet; as próximas leituras são só um
+read_parquet.
+
+Uso:
+    from leitor_map import ler_map, ler_mapa_tabwin
+    gdf = ler_map('Tabwin/MAPAS/sp_municip.MAP')
+    gdf = ler_mapa_tabwin('br_micibge', crs=5880)     # nomes em fontes_dados.MAPAS_TABWIN
+"""
+
+import struct
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from fontes_dados import resolver, resultado_em_cache
+
+# Muda quando a leitura muda (invalida os mapas já lidos no cache)
+VERSAO_LEITOR_MAP = 1
+
+# Os .MAP estão em graus decimais; o datum não vem no arquivo. SIRGAS 2000 (o do IBGE)
+# difere do SAD 69 em dezenas de metros, o que não aparece na escala dos mapas.
+CRS_TABWIN = 4674
+
+CABECALHO = struct.Struct('<H4f')
+REGISTRO = struct.Struct('<BB10sB25s2fH')
+
+
+def _registros(conteudo):
+    """(código, nome, x e y do rótulo, pontos) de cada registro do .MAP."""
+    posicao = CABECALHO.size
+    while posicao < len(conteudo):
+        _, n_codigo, codigo, n_nome, nome, x, y, n_pontos = REGISTRO.unpack_from(conteudo, posicao)
+        inicio = posicao + REGISTRO.size
+        posicao = inicio + 8 * n_pontos
+        if posicao > len(conteudo):
+            raise ValueError(f"Arquivo .MAP truncado no registro {codigo[:n_codigo]!r}")
+        pontos = np.frombuffer(conteudo, dtype='<f4', count=2 * n_pontos, offset=inicio).reshape(-1, 2)
+        yield (codigo[:n_codigo].decode('latin-1'), nome[:n_nome].decode('latin-1').rstrip(),
+               x, y, pontos.astype(np.float64))
+
+
+def _poligono_par_impar(pontos):
+    """Polígono de um contorno com vários anéis (que voltam ao primeiro ponto), pela regra par-ímpar."""
+    retornos = np.flatnonzero((pontos[1:-1] == pontos[0]).all(axis=1)) + 1
+    cortes = [0, *retornos, len(pontos) - 1]
+    aneis = [shapely.make_valid(shapely.Polygon(pontos[inicio:fim + 1]), method='structure', keep_collapsed=False)
+             for inicio, fim in zip(cortes[:-1], cortes[1:]) if fim - inicio >= 3]
+    if not aneis:
+        return shapely.Polygon()
+    resultado = aneis[0]
+    for anel in aneis[1:]:
+        resultado = resultado.symmetric_difference(anel)
+    return resultado
+
+
+def ler_map(caminho, crs=None):
+    """GeoDataFrame (codigo, nome, rotulo_x, rotulo_y, geometry) do arquivo .MAP, no crs pedido."""
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    registros = list(_registros(conteudo))
+    codigos, nomes, rotulos_x, rotulos_y, contornos = zip(*registros) if registros else ([],) * 5
+    geometrias = np.array([shapely.Polygon(pontos) if len(pontos) >= 4 else shapely.Polygon()
+                           for pontos in contornos], dtype=object)
+    # Só os contornos com mais de um anel (ou com defeito) saem inválidos daqui
+    for i in np.flatnonzero(~shapely.is_valid(geometrias)):
+        geometrias[i] = _poligono_par_impar(contornos[i])
+    gdf = gpd.GeoDataFrame({
+        'codigo': list(codigos),
+        'nome': list(nomes),
+        'rotulo_x': np.asarray(rotulos_x, dtype=np.float64),
+        'rotulo_y': np.asarray(rotulos_y, dtype=np.float64),
+    }, geometry=geometrias, crs=CRS_TABWIN)
+    if crs is not None:
+        rotulos = gpd.GeoSeries(gpd.points_from_xy(gdf['rotulo_x'], gdf['rotulo_y']), crs=CRS_TABWIN).to_crs(crs)
+        gdf = gdf.to_crs(crs)
+        gdf['rotulo_x'] = rotulos.x.to_numpy()
+        gdf['rotulo_y'] = rotulos.y.to_numpy()
+    return gdf
+
+
+def ler_mapa_tabwin(mapa, crs=None, atualizar=False):
+    """Mapa `mapa` do TabWin (ex.: 'sp_municip', 'br_micibge') lido do cache, ou lido do .MAP e guardado."""
+    nome = f'tabwin_{mapa}'
+    parametros = {'leitor_map': VERSAO_LEITOR_MAP, 'crs': crs}
+    return resultado_em_cache(nome, parametros, lambda: ler_map(resolver(nome)[0], crs=crs),
+                              geo=True, atualizar=atualizar)
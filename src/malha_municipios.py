@@ -0,0 +1,104 @@
+"""
+Malha dos municípios (mapas do TabWin) para mapas coropléticos e junções espaciais.
+
+Os mapas do Python paravam na UF, embora o CODMUNRES dê o município de cada
+nascido vivo. Aqui os 27 mapas <uf>_municip.MAP de src/Tabwin/MAPAS (lidos por
+leitor_map.py) viram uma malha só, com os 5.570 municípios:
+
+- chave CODMUN: código do IBGE com 6 dígitos (int32), o mesmo de
+  geografia.codigo_municipio_6, então a junção com o SINASC é por inteiro
+  (CODMUNRES com 6 ou 7 dígitos), sem texto nem merge por nome;
+- UF, nome e o ponto do rótulo do TabWin;
+- a geometria em CRS_MAPAS nas resoluções de malha_uf.py (simplificadas na
+  cobertura): na 'media' são ~250 mil vértices em vez de ~590 mil.
+
+A malha preparada fica no cache (GeoParquet), com chave = conteúdo dos 27 .MAP.
+Para o desenho, ver mapa_coropletico.py (o modelo é montado uma vez e cada métrica
+só repinta os municípios).
+
+localizar() resolve ponto -> área com o índice espacial (STRtree) da malha, e
+microrregioes_dos_municipios() usa isso para ligar cada município à microrregião
+do IBGE (br_micibge.MAP), preenchendo geografia.microrregiao_do_municipio.
+
+Uso:
+    malha = malha_municipios()                          # resolução 'media'
+    mapa = MapaCoropletico(malha, chave='CODMUN', siglas=False, linewidth=0.1)
+    mapa.pintar(taxa_por_municipio)                     # Series indexada pelo CODMUN
+    registrar_microrregioes_do_tabwin()
+"""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from fontes_dados import MAPAS_TABWIN, resultado_em_cache
+from geografia import codigo_municipio_6, registrar_microrregioes, sigla_do_municipio
+from leitor_map import VERSAO_LEITOR_MAP, ler_mapa_tabwin
+from malha_uf import CRS_MAPAS, RESOLUCOES, SIMPLIFICA_COBERTURA, adicionar_resolucoes, na_resolucao
+
+# Muda quando a preparação muda (invalida as malhas já preparadas)
+VERSAO_MALHA_MUNICIPIOS = 1
+
+MAPAS_MUNICIPIOS = [mapa for mapa in MAPAS_TABWIN if mapa.endswith('_municip')]
+
+
+def preparar_malha_municipios(crs=CRS_MAPAS, resolucoes=RESOLUCOES):
+    """GeoDataFrame com CODMUN, UF, nome, ponto do rótulo e uma coluna de geometria por resolução."""
+    municipios = pd.concat([ler_mapa_tabwin(mapa, crs=crs) for mapa in MAPAS_MUNICIPIOS], ignore_index=True)
+    codigos = codigo_municipio_6(municipios['codigo'])
+    malha = gpd.GeoDataFrame({
+        'CODMUN': codigos,
+        'UF': sigla_do_municipio(codigos),
+        'nome': municipios['nome'].to_numpy(),
+        'rotulo_x': municipios['rotulo_x'].to_numpy(),
+        'rotulo_y': municipios['rotulo_y'].to_numpy(),
+    }, geometry=municipios.geometry.to_numpy(), crs=municipios.crs)
+    malha = malha.sort_values('CODMUN', ignore_index=True)
+    return adicionar_resolucoes(malha, malha.geometry, resolucoes)
+
+
+def malha_municipios(resolucao='media', crs=CRS_MAPAS, atualizar=False):
+    """Malha preparada dos municípios na resolução pedida (a geometria ativa é a dessa resolução)."""
+    if resolucao not in RESOLUCOES:
+        raise ValueError(f"Resolução desconhecida: {resolucao} (disponíveis: {', '.join(RESOLUCOES)})")
+    parametros = {'malha': VERSAO_MALHA_MUNICIPIOS, 'leitor_map': VERSAO_LEITOR_MAP, 'crs': crs,
+                  'resolucoes': RESOLUCOES, 'cobertura': SIMPLIFICA_COBERTURA}
+    malha = resultado_em_cache([f'tabwin_{mapa}' for mapa in MAPAS_MUNICIPIOS], parametros,
+                               lambda: preparar_malha_municipios(crs), geo=True, atualizar=atualizar)
+    return na_resolucao(malha, resolucao)
+
+
+def localizar(malha, x, y, chave='CODMUN'):
+    """Valor de `chave` da área da malha que contém cada ponto (x, y no CRS da malha); NA fora da malha.
+
+    Usa o índice espacial da malha (malha.sindex, montado uma vez por GeoDataFrame):
+    cada ponto só é testado contra as áreas cujo retângulo o contém. Um ponto na
+    divisa entre duas áreas fica com a primeira.
+    """
+    pontos = shapely.points(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    indice_ponto, indice_area = malha.sindex.query(pontos, predicate='within')
+    primeira = np.unique(indice_ponto, return_index=True)[1]
+    posicao = np.full(len(pontos), -1, dtype=np.int64)
+    posicao[indice_ponto[primeira]] = indice_area[primeira]
+    valores = malha[chave].reset_index(drop=True).reindex(posicao)
+    return valores.set_axis(pd.RangeIndex(len(pontos)))
+
+
+def microrregioes_dos_municipios(crs=CRS_MAPAS):
+    """Series CODMUN -> código da microrregião do IBGE (int32), pela posição do município em br_micibge.MAP."""
+    municipios = malha_municipios('completa', crs=crs)
+    microrregioes = ler_mapa_tabwin('br_micibge', crs=crs)
+    microrregioes['MICRORREGIAO'] = pd.to_numeric(microrregioes['codigo'], errors='coerce').astype('Int32')
+    # Um ponto garantidamente dentro de cada município (o centroide pode cair fora)
+    dentro = municipios.geometry.representative_point()
+    micro = localizar(microrregioes, dentro.x, dentro.y, chave='MICRORREGIAO')
+    return pd.Series(micro.array, index=pd.Index(municipios['CODMUN'].to_numpy(), name='CODMUN'),
+                     name='MICRORREGIAO')
+
+
+def registrar_microrregioes_do_tabwin(crs=CRS_MAPAS):
+    """Preenche geografia.microrregiao_do_municipio com as microrregiões dos mapas do TabWin."""
+    micro = microrregioes_dos_municipios(crs).dropna()
+    registrar_microrregioes(micro.index, micro.to_numpy(dtype=np.int32))
+    return micro
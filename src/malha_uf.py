@@ -0,0 +1,111 @@
+"""
+Malha dos estados preparada para os mapas coropléticos por UF.
+
+O mapa do BL.1.1 (analise_preliminar.py) partia da malha completa (br_estados,
+~85 mil vértices), e a cada execução percorria o gdf com iterrows() calculando o
+centroide de cada estado e aplicando os deslocamentos manuais das siglas
+(siglas_config). Aqui isso é preparado uma vez e guardado em GeoParquet, no
+cache de fontes_dados, com chave = hash da malha de origem + CRS + resoluções +
+siglas, com:
+
+- a geometria já em CRS_MAPAS (SIRGAS 2000 / Policônica, metros) em várias
+  resoluções (RESOLUCOES). A simplificação é feita na cobertura inteira
+  (simplify_coverage), então as divisas entre estados vizinhos continuam
+  coincidindo, sem frestas nem sobreposições. Com shapely < 2.1 (sem
+  simplify_coverage) cada polígono é simplificado sozinho (simplify), e nas
+  resoluções simplificadas podem aparecer frestas finas entre vizinhos;
+- o ponto de cada sigla: centroide do estado (calculado na geometria completa)
+  e, para os estados pequenos de SIGLAS_CONFIG, a posição deslocada e a espessura
+  da linha até o centroide.
+
+Desenhar um mapa por UF fica só o plot: ler um Parquet pequeno e desenhar.
+
+Uso:
+    malha = malha_estados()                     # resolução 'media'
+    malha = malha_estados('completa')
+    malha[['UF', 'centro_x', 'centro_y', 'rotulo_x', 'rotulo_y', 'linha_rotulo']]
+"""
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from fontes_dados import ler_geojson, resultado_em_cache
+
+# Muda quando a preparação muda (invalida as malhas já preparadas)
+VERSAO_MALHA = 1
+
+# SIRGAS 2000 / Brazil Polyconic, em metros
+CRS_MAPAS = 5880
+
+# Tolerância da simplificação (metros) de cada resolução. Num mapa de 15x15 polegadas
+# do Brasil cada pixel cobre uns 3 km, então 'media' não muda o desenho.
+RESOLUCOES = {'completa': 0, 'media': 1000, 'baixa': 5000}
+
+# GeoSeries.simplify_coverage precisa do geopandas >= 1.1 com shapely >= 2.1
+SIMPLIFICA_COBERTURA = hasattr(gpd.GeoSeries, 'simplify_coverage') and hasattr(shapely, 'coverage_simplify')
+
+# Siglas deslocadas (metros) para fora dos estados pequenos, com a espessura da linha até o centroide
+SIGLAS_CONFIG = {
+    'DF': {'offset': (1200000, -200000), 'linewidth': 0.8},
+    'SE': {'offset': (600000, -100000), 'linewidth': 0.6},
+    'AL': {'offset': (700000, -150000), 'linewidth': 0.6},
+    'ES': {'offset': (600000, 0), 'linewidth': 0.6},
+    'RJ': {'offset': (600000, -100000), 'linewidth': 0.6},
+    'PB': {'offset': (600000, 100000), 'linewidth': 0.6},
+    'RN': {'offset': (600000, 150000), 'linewidth': 0.6}
+}
+
+
+def _coluna_geometria(resolucao):
+    return 'geometry' if resolucao == 'completa' else f'geometria_{resolucao}'
+
+
+def adicionar_resolucoes(malha, geometrias, resolucoes=RESOLUCOES):
+    """Acrescenta à malha uma coluna de geometria simplificada (na cobertura) por resolução."""
+    for resolucao, tolerancia in resolucoes.items():
+        if tolerancia > 0:
+            if SIMPLIFICA_COBERTURA:
+                simplificada = geometrias.simplify_coverage(tolerancia)
+            else:
+                simplificada = geometrias.simplify(tolerancia, preserve_topology=True)
+            malha[_coluna_geometria(resolucao)] = simplificada.set_axis(malha.index)
+    return malha
+
+
+def na_resolucao(malha, resolucao):
+    """Malha preparada com a geometria ativa na resolução pedida (as outras colunas de geometria saem)."""
+    if resolucao not in RESOLUCOES:
+        raise ValueError(f"Resolução desconhecida: {resolucao} (disponíveis: {', '.join(RESOLUCOES)})")
+    coluna = _coluna_geometria(resolucao)
+    malha = malha.set_geometry(coluna).drop(columns=[_coluna_geometria(r) for r in RESOLUCOES
+                                                     if _coluna_geometria(r) != coluna])
+    return malha if coluna == 'geometry' else malha.rename_geometry('geometry')
+
+
+def preparar_malha(gdf, resolucoes=RESOLUCOES, siglas_config=SIGLAS_CONFIG):
+    """GeoDataFrame com UF, pontos das siglas e uma coluna de geometria por resolução."""
+    uf = gdf['sigla'] if 'sigla' in gdf.columns else gdf['UF']
+    centro = gdf.geometry.centroid
+    deslocamento = np.array([siglas_config.get(sigla, {}).get('offset', (0, 0)) for sigla in uf], dtype=float)
+    malha = gpd.GeoDataFrame({
+        'UF': uf.to_numpy(),
+        'centro_x': centro.x.to_numpy(),
+        'centro_y': centro.y.to_numpy(),
+        'rotulo_x': centro.x.to_numpy() + deslocamento[:, 0],
+        'rotulo_y': centro.y.to_numpy() + deslocamento[:, 1],
+        # 0 = sigla no próprio centroide, sem linha
+        'linha_rotulo': [siglas_config.get(sigla, {}).get('linewidth', 0.0) for sigla in uf],
+    }, geometry=gdf.geometry.to_numpy(), crs=gdf.crs)
+    return adicionar_resolucoes(malha, gdf.geometry, resolucoes)
+
+
+def malha_estados(resolucao='media', nome='br_estados', crs=CRS_MAPAS, atualizar=False):
+    """Malha preparada dos estados na resolução pedida (a geometria ativa é a dessa resolução)."""
+    if resolucao not in RESOLUCOES:
+        raise ValueError(f"Resolução desconhecida: {resolucao} (disponíveis: {', '.join(RESOLUCOES)})")
+    parametros = {'malha': VERSAO_MALHA, 'crs': crs, 'resolucoes': RESOLUCOES, 'siglas': SIGLAS_CONFIG,
+                  'cobertura': SIMPLIFICA_COBERTURA}
+    malha = resultado_em_cache(nome, parametros, lambda: preparar_malha(ler_geojson(nome, crs=crs)),
+                               geo=True, atualizar=atualizar)
+    return na_resolucao(malha, resolucao)
@@ -0,0 +1,99 @@
+"""
+Manifesto da conversão incremental .dbc/.dbf -> Parquet.
+
+Guarda, para cada arquivo de origem já convertido, o tamanho, o mtime, o hash do
+conteúdo, as linhas, a codificação, as colunas pedidas e as partições gravadas.
+Na próxima conversão só os arquivos novos ou alterados são lidos de novo, e só as
+partições deles são regravadas (ex.: o DATASUS republicou só o DNRJ2014.dbc).
+
+O manifesto fica dentro da própria pasta de saída (all_parquet/_manifesto.json);
+arquivos que começam com '_' são ignorados pelo leitor de Parquet.
+
+Um arquivo é considerado sem alterações quando tamanho e mtime batem com o manifesto.
+Se só o mtime mudou (cópia, novo download do mesmo arquivo), o hash decide.
+"""
+
+import hashlib
+import json
+import os
+
+from saida_parquet import arquivos_da_origem
+
+ARQUIVO_MANIFESTO = '_manifesto.json'
+# Muda quando o conteúdo gravado muda (um manifesto de outra versão reconverte tudo).
+# 2: colunas tipadas pelo esquema do SINASC/SIM, em vez de texto.
+# 3: campos em branco das colunas category como NA, e não como a categoria ''.
+VERSAO = 3
+
+
+def calcular_hash(caminho, tamanho_bloco=1024 * 1024):
+    """Hash (blake2b) do conteúdo do arquivo, lido em blocos."""
+    resumo = hashlib.blake2b(digest_size=20)
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def assinatura(caminho):
+    """Tamanho, mtime e hash do arquivo, no formato guardado no manifesto."""
+    estado = os.stat(caminho)
+    return {'tamanho': estado.st_size, 'mtime_ns': estado.st_mtime_ns, 'hash': calcular_hash(caminho)}
+
+
+class Manifesto:
+    """Manifesto de uma pasta de saída Parquet (carregado em __init__, gravado em salvar())."""
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+        self.arquivos = {}
+        if os.path.exists(self.caminho):
+            with open(self.caminho, encoding='utf-8') as arquivo:
+                conteudo = json.load(arquivo)
+            if conteudo.get('versao') == VERSAO:
+                self.arquivos = conteudo.get('arquivos', {})
+
+    def precisa_converter(self, caminho, columns=None):
+        """True se o arquivo é novo, mudou, foi pedido com outras colunas ou perdeu partições."""
+        filename = os.path.basename(caminho)
+        registro = self.arquivos.get(filename)
+        if registro is None:
+            return True
+        if registro.get('colunas') != (list(columns) if columns else None):
+            return True
+        if len(arquivos_da_origem(self.pasta, filename)) != len(registro.get('particoes', [])):
+            return True
+
+        estado = os.stat(caminho)
+        if estado.st_size != registro['tamanho']:
+            return True
+        if estado.st_mtime_ns == registro['mtime_ns']:
+            return False
+        if calcular_hash(caminho) != registro['hash']:
+            return True
+        # Mesmo conteúdo com outro mtime: só atualiza o manifesto
+        registro['mtime_ns'] = estado.st_mtime_ns
+        return False
+
+    def registrar(self, filename, resultado, columns=None):
+        """Guarda o resultado de converter_arquivo() (que traz a assinatura do arquivo)."""
+        self.arquivos[filename] = {
+            **resultado['assinatura'],
+            'linhas': resultado['linhas'],
+            'codificacao': resultado['codificacao'],
+            'colunas': list(columns) if columns else None,
+            'particoes': [list(particao) for particao in resultado['particoes']],
+        }
+
+    def manter_apenas(self, filenames):
+        """Tira do manifesto as origens que não estão em filenames."""
+        for filename in set(self.arquivos) - set(filenames):
+            del self.arquivos[filename]
+
+    def salvar(self):
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump({'versao': VERSAO, 'arquivos': self.arquivos}, arquivo, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
@@ -0,0 +1,131 @@
+"""
+Mapa coroplético montado uma vez e só repintado a cada métrica.
+
+Cada mapa por UF (nascidos vivos no BL.1.1 do analise_preliminar.py, média de
+consultas no "SINASC - analise nascidos vivos.py" e no Sisprenatal) fazia
+merge da malha com a métrica e chamava GeoDataFrame.plot(): o geopandas converte
+de novo cada polígono do shapely em patch do matplotlib, e o script refaz a barra
+de cores e as caixas das siglas. Com várias métricas por relatório, quase todo o
+tempo ia em remontar a mesma figura.
+
+Aqui a figura é um modelo (MapaCoropletico): os polígonos da malha viram uma única
+PatchCollection, as siglas e a barra de cores são criadas uma vez. Cada mapa novo
+é só pintar(serie): a série (indexada pela chave da malha, ex.: a sigla da UF) é
+alinhada aos polígonos e vira o vetor de cores da coleção (set_array + limites da
+escala), o que leva milissegundos. Resta o desenho do arquivo em si, que o
+figuras.py faz em paralelo no modo arquivo.
+
+Serve para qualquer malha com uma coluna-chave (estados, municípios...). As
+siglas usam as colunas de malha_uf.py (rotulo_x, rotulo_y, centro_x, centro_y,
+linha_rotulo); numa malha sem elas ficam no centroide.
+
+Uso:
+    mapa = MapaCoropletico(malha_estados(), cmap='YlOrRd', legenda='extremos')
+    for nome, serie in metricas.items():        # séries indexadas pela sigla da UF
+        mapa.pintar(serie, titulo=nome)
+        mapa.mostrar(f'mapa_{nome}')            # figuras.mostrar, sem fechar o modelo
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import shapely
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import Normalize
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+
+import figuras
+
+# Formas da barra de cores: None (sem barra), 'valores' (com a escala) ou 'extremos' (só Menor/Maior)
+LEGENDAS = (None, 'valores', 'extremos')
+
+ESTILO_SIGLA = dict(ha='center', va='center', fontsize=11, color='black', weight='bold',
+                    bbox=dict(facecolor='white', alpha=0.9, edgecolor='gray',
+                              boxstyle='round,pad=0.3', linewidth=0.5))
+
+
+def _caminhos(geometrias):
+    """Um Path por polígono (com os buracos) e a linha da malha de cada um."""
+    partes, linhas = shapely.get_parts(np.asarray(geometrias), return_index=True)
+    caminhos = []
+    for poligono in partes:
+        aneis = [poligono.exterior, *poligono.interiors]
+        caminhos.append(Path.make_compound_path(*[Path(np.asarray(anel.coords)[:, :2]) for anel in aneis]))
+    return caminhos, linhas
+
+
+class MapaCoropletico:
+    def __init__(self, malha, chave='UF', cmap='YlOrRd', figsize=(15, 15), edgecolor='gray',
+                 linewidth=0.8, siglas=True, legenda='valores', rotulo_legenda=None,
+                 cor_sem_dado='none', ax=None):
+        if legenda not in LEGENDAS:
+            raise ValueError(f"Legenda desconhecida: {legenda} (disponíveis: {LEGENDAS})")
+        if ax is None:
+            self.fig, self.ax = plt.subplots(1, 1, figsize=figsize)
+        else:
+            self.fig, self.ax = ax.figure, ax
+        self.chaves = malha[chave].to_numpy()
+        caminhos, self._linha_da_parte = _caminhos(malha.geometry.to_numpy())
+        self.colecao = PatchCollection([PathPatch(caminho) for caminho in caminhos],
+                                       cmap=plt.get_cmap(cmap).with_extremes(bad=cor_sem_dado),
+                                       norm=Normalize(), edgecolor=edgecolor, linewidth=linewidth)
+        self.ax.add_collection(self.colecao)
+        self.ax.autoscale_view()
+        self.ax.set_aspect('equal')
+        self.ax.axis('off')
+        if siglas:
+            self._desenhar_siglas(malha, chave)
+        self.barra = None
+        if legenda is not None:
+            self._desenhar_legenda(legenda, rotulo_legenda)
+
+    def _desenhar_siglas(self, malha, chave):
+        if 'rotulo_x' not in malha.columns:
+            centro = malha.geometry.centroid
+            malha = malha.assign(centro_x=centro.x, centro_y=centro.y, rotulo_x=centro.x,
+                                 rotulo_y=centro.y, linha_rotulo=0.0)
+        for sigla, cx, cy, rx, ry, linha in zip(malha[chave], malha['centro_x'], malha['centro_y'],
+                                                malha['rotulo_x'], malha['rotulo_y'], malha['linha_rotulo']):
+            if linha > 0:
+                self.ax.plot([cx, rx], [cy, ry], color='gray', linestyle='--', linewidth=linha, alpha=0.7)
+            self.ax.text(rx, ry, sigla, **ESTILO_SIGLA)
+
+    def _desenhar_legenda(self, legenda, rotulo):
+        if legenda == 'valores':
+            self.barra = self.fig.colorbar(self.colecao, ax=self.ax, label=rotulo)
+            return
+        # Barra sem escala, com Menor/Maior nas pontas (como no BL.1.1)
+        self.barra = self.fig.colorbar(self.colecao, orientation="vertical", fraction=0.04, pad=0.02, ax=self.ax)
+        self.barra.set_ticks([])
+        eixo = self.barra.ax
+        for altura, texto in ((0.01, 'Menor'), (0.99, 'Maior')):
+            eixo.plot([1.05, 1.10], [altura, altura], color='black', transform=eixo.transAxes)
+            eixo.text(1.12, altura, texto, va='center', fontsize=11, weight='normal', transform=eixo.transAxes)
+        if rotulo:
+            eixo.text(-0.3, 0.5, rotulo, va='center', ha='center', rotation=90, fontsize=12,
+                      weight='normal', transform=eixo.transAxes)
+
+    def pintar(self, valores, titulo=None, vmin=None, vmax=None, **estilo_titulo):
+        """Pinta os polígonos com `valores` (Series indexada pela chave da malha; sem valor = cor_sem_dado)."""
+        por_chave = valores.reindex(self.chaves).to_numpy(dtype=float, na_value=np.nan)
+        por_parte = np.ma.masked_invalid(por_chave[self._linha_da_parte])
+        self.colecao.set_array(por_parte)
+        com_valor = por_chave[np.isfinite(por_chave)]
+        if com_valor.size:
+            menor, maior = com_valor.min(), com_valor.max()
+        else:
+            # Nenhuma chave da malha com valor: mantém a escala anterior (0 a 1 no primeiro pintar)
+            menor, maior = self.colecao.get_clim()
+            if menor is None or maior is None:
+                menor, maior = 0, 1
+        # set_clim avisa a barra de cores, que acompanha a nova escala
+        self.colecao.set_clim(menor if vmin is None else vmin, maior if vmax is None else vmax)
+        if titulo is not None:
+            self.ax.set_title(titulo, **estilo_titulo)
+        return self
+
+    def mostrar(self, nome):
+        """figuras.mostrar(nome) com esta figura; o modelo continua valendo para o próximo pintar()."""
+        # O plt.show()/modo arquivo fecham as figuras do pyplot: registra a figura de novo se preciso
+        plt.figure(self.fig)
+        figuras.mostrar(nome, self.fig)
@@ -0,0 +1,202 @@
+"""
+Execução de um script de análise como etapas de um grafo (DAG).
+
+Cada etapa é uma função registrada com as entradas que usa e as saídas que
+produz (DataFrames, o cubo de contagens...). O Pipeline resolve a ordem pelas
+dependências e guarda as saídas (memo): pedir só um bloco roda só ele e as etapas
+das quais ele depende que ainda não rodaram. No mesmo processo (notebook,
+console) a segunda chamada reaproveita o que já foi calculado.
+
+Com workers > 1 as etapas independentes rodam em paralelo (threads). As etapas
+de gráfico (grafico=True) rodam sempre na thread principal, porque o pyplot não
+é thread-safe. O texto impresso por cada etapa é guardado e mostrado na ordem
+das etapas, então a saída é a mesma da execução em sequência.
+
+Uso:
+    pipeline = Pipeline()
+
+    @pipeline.etapa('dados', saidas=['df'])
+    def carregar():
+        return {'df': ler_csv('nascidos_vivos_limpo')}
+
+    @pipeline.etapa('BL.1', entradas=['df'])
+    def total(df):
+        print(len(df))
+
+    pipeline.executar(['BL.1'], workers=4)
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Etapa:
+    def __init__(self, nome, funcao, entradas, saidas, grafico):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.saidas = list(saidas)
+        self.grafico = grafico
+
+
+class _SaidaPorThread(io.TextIOBase):
+    """sys.stdout que escreve no buffer da thread atual (se houver) ou na saída original."""
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def write(self, texto):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer if buffer is not None else self.original).write(texto)
+
+    def flush(self):
+        self.original.flush()
+
+
+class Pipeline:
+    def __init__(self):
+        self.etapas = {}
+        self.produtor = {}
+        self.memo = {}
+        self.tempos = {}
+
+    def etapa(self, nome, entradas=(), saidas=(), grafico=False):
+        """Decorador que registra a função como etapa.
+
+        As entradas precisam ser saídas de etapas já registradas, então a ordem de
+        registro é sempre uma ordem válida (e não há ciclos).
+        """
+        def registrar(funcao):
+            if nome in self.etapas:
+                raise ValueError(f"Etapa repetida: {nome}")
+            desconhecidas = [e for e in entradas if e not in self.produtor]
+            if desconhecidas:
+                raise ValueError(f"{nome}: entradas sem etapa que as produza: {desconhecidas}")
+            for saida in saidas:
+                if saida in self.produtor:
+                    raise ValueError(f"{nome}: a saída '{saida}' já é produzida por {self.produtor[saida]}")
+                self.produtor[saida] = nome
+            self.etapas[nome] = Etapa(nome, funcao, entradas, saidas, grafico)
+            return funcao
+        return registrar
+
+    def selecionar(self, blocos):
+        """Etapas pedidas pelo nome exato ou pelo prefixo do bloco ('BL.2' -> BL.2 e BL.2.1)."""
+        escolhidas = []
+        for bloco in blocos:
+            encontradas = [n for n in self.etapas if n == bloco or n.startswith(bloco + '.')]
+            if not encontradas:
+                raise KeyError(f"Bloco desconhecido: {bloco} (disponíveis: {', '.join(self.etapas)})")
+            escolhidas.extend(n for n in encontradas if n not in escolhidas)
+        return escolhidas
+
+    def plano(self, blocos=None):
+        """Etapas a rodar, na ordem de registro: as pedidas e as dependências ainda sem memo."""
+        pedidas = list(self.etapas) if blocos is None else self.selecionar(blocos)
+        necessarias = set()
+
+        def visitar(nome):
+            if nome in necessarias:
+                return
+            necessarias.add(nome)
+            for entrada in self.etapas[nome].entradas:
+                if entrada not in self.memo:
+                    visitar(self.produtor[entrada])
+
+        for nome in pedidas:
+            visitar(nome)
+        return [nome for nome in self.etapas if nome in necessarias]
+
+    def _calcular(self, nome, saida=None):
+        """Roda a etapa (sem mexer no memo); devolve as saídas e o texto impresso."""
+        etapa = self.etapas[nome]
+        argumentos = {entrada: self.memo[entrada] for entrada in etapa.entradas}
+        if saida is not None:
+            saida.local.buffer = io.StringIO()
+        inicio = time.perf_counter()
+        try:
+            resultado = etapa.funcao(**argumentos) or {}
+        finally:
+            texto = saida.local.buffer.getvalue() if saida is not None else ''
+            if saida is not None:
+                saida.local.buffer = None
+        faltando = [s for s in etapa.saidas if s not in resultado]
+        if faltando:
+            raise RuntimeError(f"A etapa {nome} não devolveu as saídas {faltando}")
+        return resultado, texto, time.perf_counter() - inicio
+
+    def _concluir(self, nome, resultado, segundos):
+        self.memo.update({saida: resultado[saida] for saida in self.etapas[nome].saidas})
+        self.tempos[nome] = segundos
+
+    def executar(self, blocos=None, workers=1, recalcular=False):
+        """Roda os blocos pedidos (None = todos) e as dependências; devolve o plano executado."""
+        if recalcular:
+            self.memo.clear()
+        plano = self.plano(blocos)
+        if workers <= 1:
+            for nome in plano:
+                resultado, _, segundos = self._calcular(nome)
+                self._concluir(nome, resultado, segundos)
+        else:
+            self._executar_em_paralelo(plano, workers)
+        return plano
+
+    def _executar_em_paralelo(self, plano, workers):
+        original = sys.stdout
+        saida = _SaidaPorThread(original)
+        pendentes = list(plano)
+        textos = {}
+        proxima = 0
+        sys.stdout = saida
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                em_andamento = {}
+                while pendentes or em_andamento:
+                    prontas = [n for n in pendentes if all(e in self.memo for e in self.etapas[n].entradas)]
+                    for nome in prontas:
+                        pendentes.remove(nome)
+                        if not self.etapas[nome].grafico:
+                            em_andamento[executor.submit(self._calcular, nome, saida)] = nome
+                    # Gráficos na thread principal, enquanto as outras etapas calculam
+                    graficos = [n for n in prontas if self.etapas[n].grafico]
+                    for nome in graficos:
+                        resultado, textos[nome], segundos = self._calcular(nome, saida)
+                        self._concluir(nome, resultado, segundos)
+                    if em_andamento and not graficos:
+                        feitas, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+                        for futuro in feitas:
+                            nome = em_andamento.pop(futuro)
+                            resultado, textos[nome], segundos = futuro.result()
+                            self._concluir(nome, resultado, segundos)
+                    elif not em_andamento and not prontas and pendentes:
+                        raise RuntimeError(f"Etapas sem como rodar: {pendentes}")
+                    # Mostra o texto das etapas concluídas, na ordem do plano
+                    while proxima < len(plano) and plano[proxima] in textos:
+                        original.write(textos.pop(plano[proxima]))
+                        proxima += 1
+        finally:
+            sys.stdout = original
+            for nome in plano[proxima:]:
+                if nome in textos:
+                    original.write(textos.pop(nome))
+
+    def imprimir_tempos(self, arquivo=sys.stderr):
+        largura = max((len(nome) for nome in self.tempos), default=0)
+        for nome, segundos in self.tempos.items():
+            print(f"{nome:<{largura}} {segundos:>8.2f} s", file=arquivo)
+
+    def listar(self, arquivo=sys.stdout):
+        # Colunas na largura do maior nome e da maior lista de entradas
+        linhas = [(etapa.nome, 'gráfico' if etapa.grafico else 'tabela',
+                   ', '.join(etapa.entradas) or '-', ', '.join(etapa.saidas) or '-')
+                  for etapa in self.etapas.values()]
+        largura_nome = max((len(nome) for nome, _, _, _ in linhas), default=0)
+        largura_entradas = max((len(entradas) for _, _, entradas, _ in linhas), default=0)
+        for nome, tipo, entradas, saidas in linhas:
+            print(f"{nome:<{largura_nome}}  {tipo:<7}  entradas: {entradas:<{largura_entradas}}  saídas: {saidas}",
+                  file=arquivo)
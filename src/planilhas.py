@@ -0,0 +1,295 @@
+"""
+Tabelas dos scripts gravadas em planilha (xlsx) em fluxo, ou num pacote CSV/Parquet.
+
+O Sisprenatal gravava resultados_analise_prenatal.xlsx com o pd.ExcelWriter padrão
+(openpyxl), que monta a pasta de trabalho inteira em memória e só grava no fim, e
+o analise_preliminar.py só imprimia as tabelas dos blocos. Aqui:
+
+- gravar_xlsx(caminho, tabelas): grava as abas uma a uma, linha a linha, no modo de
+  memória constante do xlsxwriter (cada linha vai para o arquivo temporário da aba
+  assim que a seguinte começa). Sem o xlsxwriter usa o modo write_only do openpyxl,
+  que também grava em fluxo. `tabelas` pode ser um gerador: cada aba é montada (ex.:
+  uma fatia do cubo de contagens), gravada e descartada. A primeira aba ('Índice')
+  lista as tabelas com o nome completo, as linhas e as colunas;
+- gravar_pacote(caminho, tabelas, formato): um .zip com um arquivo por tabela (CSV
+  comprimido no zip, ou Parquet com zstd) e um _manifesto.json; mais rápido de gravar
+  e de ler por outro programa do que a planilha;
+- nos scripts: guardar('BL.4 Faixa etária por UF', tabela) ao lado do print. Com a
+  exportação ativa (ativar(caminho)), finalizar() grava as tabelas guardadas, na
+  ordem dos blocos, e as abas extras (ex.: uma por UF). Sem ativar, guardar() não faz nada.
+
+O formato sai da extensão: .xlsx, .csv.zip ou .parquet.zip.
+
+Uso:
+    python analise_preliminar.py --tabelas saida/tabelas.xlsx      # ou saida/tabelas.parquet.zip
+
+    from planilhas import gravar
+    gravar('resultados.xlsx', {'Taxas por UF': tabela_taxas, 'Zero Consultas': estado_zeros}, indice=False)
+
+Dependências necessárias:
+- xlsxwriter pip install xlsxwriter (opcional: sem ele a planilha sai pelo openpyxl)
+- pyarrow pip install pyarrow (só para o pacote em Parquet)
+"""
+
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zipfile
+
+import pandas as pd
+
+# Extensão -> formato
+FORMATOS = {'.xlsx': 'xlsx', '.csv.zip': 'csv', '.parquet.zip': 'parquet'}
+ARQUIVO_MANIFESTO = '_manifesto.json'
+VERSAO_MANIFESTO = 1
+ABA_INDICE = 'Índice'
+
+# Limites do Excel para o nome da aba
+TAMANHO_NOME_ABA = 31
+CARACTERES_PROIBIDOS_ABA = re.compile(r'[\[\]:*?/\\]')
+
+
+def formato_do_caminho(caminho):
+    for extensao, formato in FORMATOS.items():
+        if caminho.lower().endswith(extensao):
+            return formato
+    raise ValueError(f"Extensão não suportada: {caminho} (use {', '.join(FORMATOS)})")
+
+
+def _como_tabela(tabela):
+    """DataFrame plano: índice com nome vira coluna, colunas com vários níveis viram um nome só.
+
+    Um índice sem nome é só a posição das linhas (ex.: depois de um sort_values) e fica de
+    fora, como no to_excel(index=False); para exportá-lo, dê um nome (rename_axis).
+    """
+    if isinstance(tabela, pd.Series):
+        tabela = tabela.to_frame()
+    if any(nome is not None for nome in tabela.index.names):
+        tabela = tabela.reset_index()
+    if isinstance(tabela.columns, pd.MultiIndex):
+        colunas = [' | '.join(str(nivel) for nivel in coluna if str(nivel) != '') for coluna in tabela.columns]
+    else:
+        colunas = [str(coluna) for coluna in tabela.columns]
+    return tabela.set_axis(colunas, axis=1)
+
+
+def _valores(serie):
+    """Valores da coluna como tipos do Python (None nos ausentes), o que os gravadores aceitam."""
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _linhas(tabela):
+    return zip(*[_valores(tabela[coluna]) for coluna in tabela.columns])
+
+
+def _nome_aba(nome, usados):
+    """Nome válido e único (sem diferenciar maiúsculas, como o Excel) para a aba."""
+    base = CARACTERES_PROIBIDOS_ABA.sub('_', nome).strip("' ") or 'Tabela'
+    aba, n = base[:TAMANHO_NOME_ABA], 1
+    while aba.lower() in usados:
+        n += 1
+        sufixo = f' ({n})'
+        aba = base[:TAMANHO_NOME_ABA - len(sufixo)] + sufixo
+    usados.add(aba.lower())
+    return aba
+
+
+class _PlanilhaXlsxwriter:
+    def __init__(self, caminho):
+        import xlsxwriter
+        self.livro = xlsxwriter.Workbook(caminho, {'constant_memory': True, 'nan_inf_to_errors': True})
+        self.negrito = self.livro.add_format({'bold': True})
+
+    def nova_aba(self, nome, cabecalho):
+        aba = self.livro.add_worksheet(nome)
+        aba.write_row(0, 0, cabecalho, self.negrito)
+        aba.freeze_panes(1, 0)
+        linha = 1
+
+        def escrever(valores):
+            nonlocal linha
+            aba.write_row(linha, 0, valores)
+            linha += 1
+        return escrever
+
+    def fechar(self):
+        self.livro.close()
+
+
+class _PlanilhaOpenpyxl:
+    def __init__(self, caminho):
+        from openpyxl import Workbook
+        self.caminho = caminho
+        self.livro = Workbook(write_only=True)
+
+    def nova_aba(self, nome, cabecalho):
+        aba = self.livro.create_sheet(nome)
+        aba.freeze_panes = 'A2'
+        aba.append(cabecalho)
+        return aba.append
+
+    def fechar(self):
+        self.livro.save(self.caminho)
+
+
+def _abrir_planilha(caminho):
+    try:
+        return _PlanilhaXlsxwriter(caminho)
+    except ImportError:
+        return _PlanilhaOpenpyxl(caminho)
+
+
+def _itens(tabelas):
+    return tabelas.items() if isinstance(tabelas, dict) else tabelas
+
+
+def _gravar_temporario(caminho, gravar):
+    """Grava em caminho.<pid>.tmp e troca no fim (um arquivo interrompido não substitui o anterior)."""
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = caminho + f'.{os.getpid()}.tmp'
+    try:
+        resultado = gravar(temporario)
+        os.replace(temporario, caminho)
+        return resultado
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def gravar_xlsx(caminho, tabelas, indice=True):
+    """Grava as tabelas (dict ou iterável de (nome, DataFrame)) em abas do xlsx, em fluxo; devolve o índice.
+
+    Com indice=False não há a aba 'Índice' (as abas ficam só as das tabelas).
+    """
+    def gravar(temporario):
+        planilha = _abrir_planilha(temporario)
+        usados = set()
+        if indice:
+            usados.add(ABA_INDICE.lower())
+            escrever_indice = planilha.nova_aba(ABA_INDICE, ['Aba', 'Tabela', 'Linhas', 'Colunas'])
+        gravadas = []
+        try:
+            for nome, tabela in _itens(tabelas):
+                tabela = _como_tabela(tabela)
+                aba = _nome_aba(nome, usados)
+                escrever = planilha.nova_aba(aba, list(tabela.columns))
+                for valores in _linhas(tabela):
+                    escrever(valores)
+                registro = [aba, nome, len(tabela), tabela.shape[1]]
+                if indice:
+                    escrever_indice(registro)
+                gravadas.append(dict(zip(['aba', 'tabela', 'linhas', 'colunas'], registro)))
+        finally:
+            planilha.fechar()
+        return gravadas
+    return _gravar_temporario(caminho, gravar)
+
+
+def _nome_arquivo(nome, usados, extensao):
+    base = re.sub(r'[^\w.\-]+', '_', nome).strip('_') or 'tabela'
+    arquivo, n = f'{base}{extensao}', 1
+    while arquivo in usados:
+        n += 1
+        arquivo = f'{base}_{n}{extensao}'
+    usados.add(arquivo)
+    return arquivo
+
+
+def gravar_pacote(caminho, tabelas, formato='parquet'):
+    """Grava as tabelas num .zip, um arquivo por tabela (csv ou parquet) e o manifesto; devolve o índice."""
+    if formato not in ('csv', 'parquet'):
+        raise ValueError(f"Formato de pacote desconhecido: {formato}")
+
+    def gravar(temporario):
+        usados = {ARQUIVO_MANIFESTO}
+        indice = []
+        with zipfile.ZipFile(temporario, 'w') as pacote:
+            for nome, tabela in _itens(tabelas):
+                tabela = _como_tabela(tabela)
+                arquivo = _nome_arquivo(nome, usados, f'.{formato}')
+                if formato == 'csv':
+                    conteudo = tabela.to_csv(index=False).encode('utf-8')
+                    pacote.writestr(arquivo, conteudo, compress_type=zipfile.ZIP_DEFLATED)
+                else:
+                    # O Parquet já vem comprimido (zstd): entra no zip sem recomprimir
+                    buffer = io.BytesIO()
+                    tabela.to_parquet(buffer, index=False, compression='zstd')
+                    pacote.writestr(arquivo, buffer.getvalue(), compress_type=zipfile.ZIP_STORED)
+                indice.append({'arquivo': arquivo, 'tabela': nome, 'linhas': len(tabela),
+                               'colunas': list(tabela.columns)})
+            manifesto = {'versao': VERSAO_MANIFESTO, 'formato': formato,
+                         'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'), 'tabelas': indice}
+            pacote.writestr(ARQUIVO_MANIFESTO, json.dumps(manifesto, ensure_ascii=False, indent=1),
+                            compress_type=zipfile.ZIP_DEFLATED)
+        return indice
+    return _gravar_temporario(caminho, gravar)
+
+
+def gravar(caminho, tabelas, indice=True):
+    """Grava as tabelas no formato da extensão do caminho (.xlsx, .csv.zip ou .parquet.zip)."""
+    formato = formato_do_caminho(caminho)
+    if formato == 'xlsx':
+        return gravar_xlsx(caminho, tabelas, indice)
+    return gravar_pacote(caminho, tabelas, formato)
+
+
+class _Exportacao:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.tabelas = []   # (nome, tabela), na ordem em que foram guardadas
+        self.trava = threading.Lock()
+
+
+_exportacao = None
+
+
+def ativar(caminho):
+    """Passa a guardar as tabelas dos blocos para gravar em `caminho` no finalizar()."""
+    global _exportacao
+    formato_do_caminho(caminho)
+    _exportacao = _Exportacao(caminho)
+
+
+def ativa():
+    return _exportacao is not None
+
+
+def guardar(nome, tabela):
+    """Guarda a tabela de um bloco para a exportação (sem exportação ativa, não faz nada)."""
+    if _exportacao is None:
+        return
+    with _exportacao.trava:
+        _exportacao.tabelas.append((nome, tabela))
+
+
+def _ordem_bloco(item):
+    # 'BL.2.1 ...' -> (2, 1): BL.10 depois de BL.9; fora dos blocos, no fim
+    bloco = re.match(r'BL\.(\d+(?:\.\d+)*)', item[0])
+    return tuple(int(n) for n in bloco.group(1).split('.')) if bloco else (float('inf'),)
+
+
+def finalizar(extras=()):
+    """Grava as tabelas guardadas (na ordem dos blocos) e as `extras`; devolve o caminho gravado."""
+    global _exportacao
+    if _exportacao is None:
+        return None
+    exportacao, _exportacao = _exportacao, None
+    # sorted é estável: as tabelas de um mesmo bloco ficam na ordem em que foram guardadas
+    tabelas = sorted(exportacao.tabelas, key=_ordem_bloco)
+    inicio = time.perf_counter()
+    indice = gravar(exportacao.caminho, _encadear(tabelas, _itens(extras)))
+    print(f"📑 {len(indice)} tabelas gravadas em {exportacao.caminho} "
+          f"({time.perf_counter() - inicio:.2f} s)", file=sys.stderr)
+    return exportacao.caminho
+
+
+def _encadear(tabelas, extras):
+    # As extras podem ser um gerador: cada aba só é montada quando chega a vez dela
+    yield from tabelas
+    yield from extras
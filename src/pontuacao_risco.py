@@ -0,0 +1,83 @@
+"""
+Escore de risco das gestantes (BL.21 do analise_preliminar.py) calculado de forma vetorizada.
+
+O escore é a soma dos pesos dos critérios de vulnerabilidade que a gestante
+atende. Antes era calculado com df.apply(calcular_pontuacao, axis=1), uma
+chamada Python (e uma Series) por linha. Aqui:
+
+1. marcar_criterios() avalia cada critério uma vez para o df inteiro e guarda
+   o resultado como bits de um vetor uint8 (bit i = critério i atendido);
+2. pontuar() transforma os bits em escore por uma tabela com as 2**k somas
+   possíveis (um único take), então trocar os pesos não refaz as máscaras;
+3. escore_medio_por_grupo() conta uma vez as combinações de bits por grupo
+   (np.bincount) e dá o escore médio de cada grupo para vários conjuntos de
+   pesos, para análise de sensibilidade, sem voltar às linhas.
+
+Uso:
+    marcas = marcar_criterios(df)
+    df['PONTUACAO_RISCO'] = pontuar(marcas, index=df.index)
+    escore_medio_por_grupo(marcas, df['UF'], {'padrão': PESOS_PADRAO, 'iguais': PESOS_IGUAIS})
+"""
+
+import numpy as np
+import pandas as pd
+
+# Critério -> (coluna, valores que contam ponto). A ordem define o bit de cada critério.
+CRITERIOS = {
+    'baixa_escolaridade': ('ESCMAE_LABEL', ['0 anos', '1-3 anos', '4-7 anos']),
+    'ate_18_anos': ('FAIXA_ETARIA', ['<=13', '14-18']),
+    'pretas_pardas_indigenas': ('GRUPO_RACIAL', ['Indígenas', 'Pretos e Pardos']),
+    'solteira': ('GRUPO_ESTCIVIL', ['Solo']),
+}
+
+# Pesos usados no BL.21
+PESOS_PADRAO = {'baixa_escolaridade': 4, 'ate_18_anos': 3, 'pretas_pardas_indigenas': 2, 'solteira': 1}
+# Alternativa para sensibilidade: todos os critérios com o mesmo peso
+PESOS_IGUAIS = {criterio: 1 for criterio in CRITERIOS}
+
+# Máximo de critérios guardados em um vetor uint8
+MAX_CRITERIOS = 8
+
+
+def marcar_criterios(df, criterios=CRITERIOS):
+    """Vetor uint8 com um bit por critério atendido (na ordem de criterios)."""
+    if len(criterios) > MAX_CRITERIOS:
+        raise ValueError(f"No máximo {MAX_CRITERIOS} critérios (recebidos {len(criterios)})")
+    marcas = np.zeros(len(df), dtype=np.uint8)
+    for bit, (coluna, valores) in enumerate(criterios.values()):
+        marcas |= df[coluna].isin(valores).to_numpy(dtype=bool).astype(np.uint8) << bit
+    return marcas
+
+
+def tabela_pontos(pesos=PESOS_PADRAO, criterios=CRITERIOS):
+    """Escore de cada uma das 2**k combinações de critérios."""
+    desconhecidos = set(pesos) - set(criterios)
+    if desconhecidos:
+        raise ValueError(f"Pesos para critérios desconhecidos: {sorted(desconhecidos)}")
+    combinacoes = np.arange(2 ** len(criterios))
+    tabela = np.zeros(len(combinacoes))
+    for bit, criterio in enumerate(criterios):
+        tabela += ((combinacoes >> bit) & 1) * pesos.get(criterio, 0)
+    # Pesos inteiros continuam inteiros (o escore padrão vai de 0 a 10)
+    if all(float(peso).is_integer() for peso in pesos.values()):
+        tabela = tabela.astype(np.int16)
+    return tabela
+
+
+def pontuar(marcas, pesos=PESOS_PADRAO, criterios=CRITERIOS, index=None):
+    """Escore de risco de cada linha a partir das marcas de marcar_criterios()."""
+    pontos = tabela_pontos(pesos, criterios)[marcas]
+    return pontos if index is None else pd.Series(pontos, index=index)
+
+
+def escore_medio_por_grupo(marcas, grupos, cenarios, criterios=CRITERIOS):
+    """Escore médio por grupo (ex.: UF) para cada conjunto de pesos: DataFrame grupo x cenário."""
+    codigos, rotulos = pd.factorize(grupos, sort=True)
+    validos = codigos >= 0
+    combinacoes = 2 ** len(criterios)
+    # Quantas gestantes de cada grupo têm cada combinação de critérios
+    contagem = np.bincount(codigos[validos].astype(np.int64) * combinacoes + marcas[validos],
+                           minlength=len(rotulos) * combinacoes).reshape(len(rotulos), combinacoes)
+    totais = contagem.sum(axis=1)
+    medias = {nome: contagem @ tabela_pontos(pesos, criterios) / totais for nome, pesos in cenarios.items()}
+    return pd.DataFrame(medias, index=pd.Index(rotulos, name=getattr(grupos, 'name', None)))
@@ -0,0 +1,228 @@
+"""
+Gravação da conversão .dbc/.dbf em Parquet particionado por UF e ano.
+
+Cada arquivo de origem vira um arquivo Parquet (compactado com zstd e já tipado:
+inteiros, datas e texto) dentro da partição da sua UF e do seu ano, no formato
+de pastas hive que o pandas/pyarrow entendem:
+
+    all_parquet/UF=RJ/ANO=2014/DNRJ2014.parquet
+    all_parquet/UF=SP/ANO=2014/DNSP2014.parquet
+
+A UF e o ano vêm do nome do arquivo do DATASUS (DNRJ2014, DOSP2019...). Se o nome
+não seguir esse padrão (ex.: DNBR2014), cada registro vai para a partição da UF do
+seu município de residência (CODMUNRES) e do ano da data do evento (DTNASC/DTOBITO).
+
+Uso:
+    # Só as partições e as colunas pedidas são lidas do disco
+    df = ler_parquet('all_parquet', columns=['CODMUNRES', 'CONSPRENAT'], ufs=['RJ', 'SP'], anos=[2014])
+
+Dependências necessárias:
+- pyarrow pip install pyarrow
+"""
+
+import glob
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from esquemas import DATA, eh_inteiro, esquema as obter_esquema
+from geografia import SIGLAS, sigla_do_municipio
+
+COMPRESSAO = 'zstd'
+
+# Nome usado pelo pyarrow para partições sem valor (UF ou ano desconhecidos)
+PARTICAO_VAZIA = '__HIVE_DEFAULT_PARTITION__'
+
+# Nomes do DATASUS: sigla do sistema + UF + ano (DNRJ2014, DOSP2019, DNRJ14)
+_NOME_DATASUS = re.compile(r'^[A-Z]{2,4}?([A-Z]{2})(\d{4}|\d{2})$', re.IGNORECASE)
+
+# Código IBGE da UF (2 primeiros dígitos do município) -> sigla
+SIGLAS_IBGE = SIGLAS
+_SIGLAS_VALIDAS = set(SIGLAS_IBGE.values()) | {'BR'}
+
+# Colunas usadas para particionar os registros quando o nome do arquivo não ajuda
+COLUNAS_MUNICIPIO = ('CODMUNRES', 'CODMUNNASC', 'CODMUNOCOR')
+COLUNAS_DATA = ('DTNASC', 'DTOBITO')
+
+
+def particao_do_nome(filename):
+    """(UF, ano) do nome de um arquivo do DATASUS, ou None se o nome não seguir o padrão."""
+    nome = os.path.splitext(os.path.basename(filename))[0]
+    encontrado = _NOME_DATASUS.match(nome)
+    if not encontrado:
+        return None
+    uf, ano = encontrado.group(1).upper(), int(encontrado.group(2))
+    if uf not in _SIGLAS_VALIDAS or uf == 'BR':
+        return None
+    return uf, ano + 2000 if ano < 100 else ano
+
+
+def _tipo_arrow_do_esquema(tipo):
+    if eh_inteiro(tipo):
+        return getattr(pa, tipo.lower())()
+    if tipo == DATA:
+        return pa.timestamp('us')
+    if tipo == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    return None
+
+
+def esquema_arrow(campos, esquema=None):
+    """Esquema Arrow dos campos (nome, tipo, tamanho, decimais, ...) + ARQUIVO_ORIGEM.
+
+    O tipo vem do esquema de esquemas.py ('sinasc', 'sim': Int8/Int16/Int32, datas,
+    category) e, para as colunas fora dele, do descritor do campo. Não vem dos
+    valores, para que todos os lotes (e todos os arquivos) tenham o mesmo esquema.
+    Os arquivos do DATASUS declaram quase todos os campos como C (texto): sem o
+    esquema, o Parquet sairia só com texto.
+    """
+    tipos_esquema = obter_esquema(esquema) if esquema is not None else {}
+    tipos = []
+    for nome, tipo, _, decimais, *_ in campos:
+        tipo_arrow = _tipo_arrow_do_esquema(tipos_esquema[nome]) if nome in tipos_esquema else None
+        if tipo_arrow is not None:
+            tipos.append((nome, tipo_arrow))
+        elif tipo in ('N', 'F'):
+            tipos.append((nome, pa.float64() if decimais else pa.int64()))
+        elif tipo == 'D':
+            tipos.append((nome, pa.timestamp('us')))
+        elif tipo == 'L':
+            tipos.append((nome, pa.bool_()))
+        else:
+            tipos.append((nome, pa.string()))
+    tipos.append(('ARQUIVO_ORIGEM', pa.string()))
+    return pa.schema(tipos)
+
+
+def _primeira_coluna(lote, nomes):
+    for nome in nomes:
+        if nome in lote.columns:
+            return lote[nome]
+    return None
+
+
+def particoes_dos_registros(lote):
+    """Séries (UF, ANO) de cada registro, a partir do município e da data do evento."""
+    municipio = _primeira_coluna(lote, COLUNAS_MUNICIPIO)
+    if municipio is None:
+        uf = pd.Series(PARTICAO_VAZIA, index=lote.index)
+    else:
+        uf = sigla_do_municipio(municipio).astype(object).fillna(PARTICAO_VAZIA)
+
+    data = _primeira_coluna(lote, COLUNAS_DATA)
+    if data is None:
+        ano = pd.Series(PARTICAO_VAZIA, index=lote.index)
+    else:
+        if not pd.api.types.is_datetime64_any_dtype(data):
+            data = pd.to_datetime(data.astype(str), format='%d%m%Y', errors='coerce')
+        ano = data.dt.year.astype('Int64').astype(str).replace('<NA>', PARTICAO_VAZIA)
+    return uf, ano
+
+
+def pasta_particao(pasta, uf, ano):
+    return os.path.join(pasta, f'UF={uf}', f'ANO={ano}')
+
+
+def arquivos_da_origem(pasta, filename):
+    """Arquivos Parquet já gravados para um arquivo de origem, em qualquer partição."""
+    nome = os.path.splitext(os.path.basename(filename))[0]
+    return glob.glob(os.path.join(glob.escape(pasta), 'UF=*', 'ANO=*', f'{glob.escape(nome)}.parquet'))
+
+
+class GravadorParquet:
+    """Grava os lotes de um arquivo de origem nas partições UF=../ANO=.. de pasta.
+
+    Os arquivos são gravados com nome oculto (.DNRJ2014.parquet, ignorado pelo leitor)
+    e só trocam de nome em fechar(); se a conversão falhar, abortar() apaga o que foi
+    gravado e as partições anteriores desse arquivo ficam como estavam.
+    """
+
+    def __init__(self, pasta, filename, campos, esquema=None):
+        self.pasta = pasta
+        self.filename = filename
+        self.nome = os.path.splitext(os.path.basename(filename))[0]
+        self.esquema = esquema_arrow(campos, esquema)
+        self.particao_fixa = particao_do_nome(filename)
+        self.particoes = set()
+        self._escritores = {}
+
+    def _caminho_temporario(self, particao):
+        return os.path.join(pasta_particao(self.pasta, *particao), f'.{self.nome}.parquet')
+
+    def _escrever(self, particao, lote):
+        escritor = self._escritores.get(particao)
+        if escritor is None:
+            os.makedirs(pasta_particao(self.pasta, *particao), exist_ok=True)
+            escritor = pq.ParquetWriter(self._caminho_temporario(particao), self.esquema,
+                                        compression=COMPRESSAO)
+            self._escritores[particao] = escritor
+        tabela = pa.Table.from_pandas(lote, schema=self.esquema, preserve_index=False)
+        escritor.write_table(tabela)
+        self.particoes.add(particao)
+
+    def gravar(self, lote):
+        lote = lote.reindex(columns=self.esquema.names)
+        if self.particao_fixa is not None:
+            self._escrever(self.particao_fixa, lote)
+            return
+        uf, ano = particoes_dos_registros(lote)
+        for (uf_grupo, ano_grupo), indices in lote.groupby([uf, ano], sort=True).indices.items():
+            self._escrever((uf_grupo, ano_grupo), lote.iloc[indices])
+
+    def _fechar_escritores(self):
+        for escritor in self._escritores.values():
+            escritor.close()
+        self._escritores = {}
+
+    def fechar(self):
+        """Publica os arquivos gravados, substituindo os anteriores desse arquivo de origem."""
+        self._fechar_escritores()
+        novos = {os.path.join(pasta_particao(self.pasta, *p), f'{self.nome}.parquet') for p in self.particoes}
+        for antigo in arquivos_da_origem(self.pasta, self.filename):
+            if antigo not in novos:
+                os.remove(antigo)
+        for particao in self.particoes:
+            temporario = self._caminho_temporario(particao)
+            os.replace(temporario, os.path.join(os.path.dirname(temporario), f'{self.nome}.parquet'))
+        return sorted(self.particoes)
+
+    def abortar(self):
+        abertas = self.particoes | set(self._escritores)
+        self._fechar_escritores()
+        for particao in abertas:
+            temporario = self._caminho_temporario(particao)
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        self.particoes = set()
+
+
+def remover_origens_ausentes(pasta, filenames):
+    """Apaga da pasta os arquivos Parquet de origens que não estão mais em filenames."""
+    nomes = {os.path.splitext(os.path.basename(f))[0] for f in filenames}
+    removidos = []
+    for caminho in glob.glob(os.path.join(glob.escape(pasta), 'UF=*', 'ANO=*', '*.parquet')):
+        if os.path.splitext(os.path.basename(caminho))[0] not in nomes:
+            os.remove(caminho)
+            removidos.append(caminho)
+
+    # Partições que ficaram vazias (origem removida ou que mudou de partição)
+    for raiz, _, _ in sorted(os.walk(pasta), reverse=True):
+        if raiz != pasta and not os.listdir(raiz):
+            os.rmdir(raiz)
+    return removidos
+
+
+def ler_parquet(pasta, columns=None, ufs=None, anos=None):
+    """Lê a pasta particionada, só com as colunas e as partições (UF/ano) pedidas.
+
+    Os inteiros voltam como Int8/Int16/Int32 (com NA), como no esquemas.py, e não como float.
+    """
+    filtros = []
+    if ufs is not None:
+        filtros.append(('UF', 'in', list(ufs)))
+    if anos is not None:
+        filtros.append(('ANO', 'in', [int(ano) for ano in anos]))
+    return pd.read_parquet(pasta, columns=columns, filters=filtros or None, dtype_backend='numpy_nullable')
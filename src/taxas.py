@@ -0,0 +1,90 @@
+"""
+Contagens, proporções e taxas (por 100 mil, por 10 mil, %) em tabelas longas.
+
+No "Sisprenatal - Script de Analise final.py" a tabela resumo saía de um
+groupby('UF').agg() com lambdas que filtravam a coluna COBERTURA inteira dentro de
+cada grupo (custo de grupos x linhas), e o gráfico de proporção por estado usava
+estimator=lambda x: sum(x)/len(cobertura_uf)*100, que divide pelo número de linhas
+da tabela, não pelo total da UF. Aqui:
+
+- contar(df, grupos): número de linhas de cada combinação dos grupos (um groupby);
+- taxas(contagens, totais, por): junta cada contagem ao total do seu grupo (os níveis
+  do índice de `totais`, ex.: a UF) e calcula contagem / total * por, tudo de uma vez
+  em vetores. O numerador e o denominador podem vir de recortes diferentes (ex.:
+  gestantes com pré-natal por UF e cobertura sobre o total de gestantes da UF);
+- proporcao(contagens, grupos): o mesmo, com o total tirado das próprias contagens
+  (a soma dentro de cada grupo), em % por padrão;
+- pivotar() e ranquear(): a tabela longa vira a tabela larga (UF x categoria) e o
+  ranking, prontas para imprimir ou gravar (ver planilhas.py).
+
+A tabela longa tem uma linha por combinação: as colunas dos grupos, a contagem, o
+total e a taxa, com os nomes das Series (ex.: 'qtd', 'total_gestantes') e o nome
+pedido para a taxa.
+
+Uso:
+    contagens = contar(df_com_prenatal, ['CO_UF_IBGE', 'COBERTURA'])
+    totais = contar(df, 'CO_UF_IBGE', nome='total_gestantes')
+    tabela = taxas(contagens, totais, por=POR_100_MIL, casas=1, nome='taxa_por_100mil')
+    percentuais = proporcao(contagens, 'CO_UF_IBGE')            # % de cada cobertura na UF
+    largura = pivotar(tabela, 'CO_UF_IBGE', 'COBERTURA', 'taxa_por_100mil')
+    ranking = ranquear(largura.reset_index(), 'Alta cobertura', 'Ranking')
+"""
+
+import numpy as np
+
+POR_100_MIL = 100_000
+POR_10_MIL = 10_000
+PERCENTUAL = 100
+
+
+def _lista(grupos):
+    return [grupos] if isinstance(grupos, str) else list(grupos)
+
+
+def contar(df, grupos, nome='qtd'):
+    """Series com o número de linhas de cada combinação de `grupos` que aparece no df."""
+    return df.groupby(_lista(grupos), observed=True).size().rename(nome)
+
+
+def _total_de_cada_linha(contagens, totais):
+    """Total do grupo de cada contagem (pelos níveis do índice de `totais`); NaN sem total (e aí vira float)."""
+    niveis = list(totais.index.names)
+    faltando = [nivel for nivel in niveis if nivel not in contagens.index.names]
+    if faltando:
+        raise KeyError(f"Níveis do denominador fora do numerador: {faltando}")
+    chave = contagens.index.droplevel([n for n in contagens.index.names if n not in niveis]) \
+        if contagens.index.nlevels > len(niveis) else contagens.index
+    if chave.nlevels > 1:
+        chave = chave.reorder_levels(niveis)
+    return totais.reindex(chave).to_numpy()
+
+
+def taxas(contagens, totais, por=POR_100_MIL, casas=None, nome='taxa'):
+    """Tabela longa: grupos, contagem, total do grupo e taxa = contagem / total * por.
+
+    `contagens` é indexada pelos grupos do numerador (ex.: UF e cobertura) e `totais`
+    por parte deles (ex.: UF). Contagens sem total no denominador ficam com taxa NaN.
+    """
+    total = _total_de_cada_linha(contagens, totais)
+    taxa = contagens.to_numpy(dtype=np.float64) / total.astype(np.float64) * por
+    if casas is not None:
+        taxa = np.round(taxa, casas)
+    return contagens.reset_index().assign(**{totais.name or 'total': total, nome: taxa})
+
+
+def proporcao(contagens, grupos, por=PERCENTUAL, casas=None, nome='proporcao'):
+    """Tabela longa com a fração de cada contagem no total do seu grupo (soma das contagens do grupo) * por."""
+    totais = contagens.groupby(level=_lista(grupos), observed=True).sum().rename('total')
+    return taxas(contagens, totais, por=por, casas=casas, nome=nome)
+
+
+def pivotar(tabela, linhas, colunas, valores, preencher=0):
+    """Tabela larga (linhas x colunas) de uma coluna da tabela longa; combinações sem valor = `preencher`."""
+    return tabela.pivot_table(index=linhas, columns=colunas, values=valores, aggfunc='first',
+                              observed=True).fillna(preencher)
+
+
+def ranquear(tabela, coluna, nome='ranking', ascending=False):
+    """Acrescenta a posição de cada linha por `coluna` (empates com a melhor posição) e ordena por ela."""
+    posicao = tabela[coluna].rank(ascending=ascending, method='min')
+    return tabela.assign(**{nome: posicao}).sort_values(coluna, ascending=ascending)